@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""Benchmark FAISS index types: recall@k against exact search and query latency.
+
+Corpora are synthetic clustered vectors (embeddings of similar chunks bunch
+together), and queries are noisy copies of corpus vectors, so every index type
+sees the same data. Example:
+
+    python scripts/bench_ann_index.py --sizes 10000 100000 1000000 --metric cosine
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services import settings
+from src.services.ann_index import (
+    INDEX_TYPES,
+    METRICS,
+    IndexSpec,
+    create_index,
+    describe,
+    prepare,
+    search,
+)
+
+
+def synthetic_corpus(size: int, dimension: int, rng: np.random.Generator) -> np.ndarray:
+    """Overlapping clusters of ~100 vectors, like sections of similar manuals.
+
+    The spread within a cluster is close to the distance between clusters, so
+    approximate indexes miss some true neighbours and their parameters matter.
+    """
+    centers = rng.standard_normal((max(1, size // 100), dimension), dtype=np.float32)
+    vectors = np.empty((size, dimension), dtype=np.float32)
+    for start in range(0, size, 100000):  # Bounded temporaries for 1M+ corpora
+        stop = min(size, start + 100000)
+        labels = rng.integers(len(centers), size=stop - start)
+        noise = rng.standard_normal((stop - start, dimension), dtype=np.float32)
+        vectors[start:stop] = centers[labels] + 3.0 * noise
+    return vectors
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def build(spec: IndexSpec, corpus: np.ndarray):
+    """Build an index of the corpus under ids 0..n-1, as EmbedderService.add_chunks() does."""
+    index = create_index(corpus.shape[1], spec)
+    vectors = prepare(index, corpus)
+    if not index.is_trained:
+        index = create_index(corpus.shape[1], spec, training=vectors)
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+    return index
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Measure ANN index recall@k and latency percentiles"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 100000],
+        help="Corpus sizes (default: 10000 100000)",
+    )
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--metric", choices=METRICS, default=settings.index_metric)
+    parser.add_argument(
+        "--dimension", type=int, default=384, help="Vector dimension (default: 384, MiniLM)"
+    )
+    parser.add_argument(
+        "--queries", type=int, default=500, help="Queries to time per index (default: 500)"
+    )
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--hnsw-m", type=int, default=settings.hnsw_m)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=settings.hnsw_ef_construction)
+    parser.add_argument("--hnsw-ef-search", type=int, default=settings.hnsw_ef_search)
+    parser.add_argument("--ivf-nlist", type=int, default=settings.ivf_nlist)
+    parser.add_argument("--ivf-nprobe", type=int, default=settings.ivf_nprobe)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    recall_header = f"recall@{args.k}"
+    print(
+        f"{'size':>9} {'type':>5} {'build_s':>8} {recall_header:>9} "
+        f"{'p50_ms':>8} {'p99_ms':>8}  params"
+    )
+
+    for size in args.sizes:
+        corpus = synthetic_corpus(size, args.dimension, rng)
+        picks = rng.integers(size, size=args.queries)
+        noise = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+        queries = corpus[picks] + 2.0 * noise
+
+        truth = None
+        for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+            spec = IndexSpec(
+                type=index_type,
+                metric=args.metric,
+                hnsw_m=args.hnsw_m,
+                hnsw_ef_construction=args.hnsw_ef_construction,
+                hnsw_ef_search=args.hnsw_ef_search,
+                ivf_nlist=args.ivf_nlist,
+                ivf_nprobe=args.ivf_nprobe,
+            )
+            start = time.perf_counter()
+            index = build(spec, corpus)
+            build_seconds = time.perf_counter() - start
+
+            # Batched search for recall; exact search defines the true neighbours
+            _, ids = search(index, queries, args.k)
+            if truth is None:
+                truth = ids
+            recall = np.mean(
+                [len(set(found) & set(expected)) / args.k for found, expected in zip(ids, truth)]
+            )
+
+            # One query at a time, as /recommend-carriers issues them
+            for query in queries[:20]:  # Warm-up
+                search(index, query, args.k)
+            timings = []
+            for query in queries:
+                start = time.perf_counter_ns()
+                search(index, query, args.k)
+                timings.append(time.perf_counter_ns() - start)
+            timings.sort()
+
+            if index_type in args.types:
+                built = describe(index)
+                params = {k: v for k, v in built.items() if k not in ("type", "metric")}
+                p50, p99 = (percentile(timings, f) / 1e6 for f in (0.50, 0.99))
+                print(
+                    f"{size:>9} {index_type:>5} {build_seconds:>8.2f} {recall:>9.3f} "
+                    f"{p50:>8.3f} {p99:>8.3f}  {params}"
+                )
+            del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Benchmark /autocomplete lookups on a large synthetic vocabulary."""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.autocomplete import AutocompleteIndex, vocabulary
+from src.ai.medication_reference import default_medication_reference
+from src.ai.ruleset import RuleSet
+
+SYLLABLES = [
+    "a", "ab", "al", "am", "ar", "ba", "ce", "cil", "da", "de", "dol", "em", "en", "fa",
+    "fen", "ga", "in", "ix", "la", "lin", "lo", "ma", "mi", "mox", "na", "ne", "ol", "pam",
+    "pra", "pril", "ra", "ri", "sar", "se", "sta", "tan", "te", "ti", "tin", "to", "va",
+    "vir", "xa", "zam", "ze", "zine", "zol",
+]
+
+
+def synthetic_terms(count: int, rng: random.Random):
+    """Drug-like names and two-word condition phrases."""
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).capitalize()
+        if i % 4 == 0:
+            yield f"Controlled {name.lower()} syndrome", "accepted"
+        else:
+            yield name, "medication"
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Apply one substitution, deletion or transposition."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(("substitute", "delete", "transpose"))
+    if edit == "substitute":
+        return word[:i] + rng.choice("aeiou") + word[i + 1:]
+    if edit == "delete":
+        return word[:i] + word[i + 1:]
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description="Measure autocomplete latency percentiles")
+    parser.add_argument(
+        "--terms", type=int, default=50000, help="Synthetic terms to add (default: 50000)"
+    )
+    parser.add_argument(
+        "--queries", type=int, default=20000, help="Queries to time (default: 20000)"
+    )
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions per query (default: 10)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=1.0, help="p99 budget in ms (default: 1.0)"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = list(vocabulary(default_medication_reference(), RuleSet.load()))
+    terms.extend(synthetic_terms(args.terms, rng))
+
+    start = time.perf_counter()
+    index = AutocompleteIndex(terms)
+    print(f"Built index of {len(index)} terms in {time.perf_counter() - start:.2f}s")
+
+    # Keep the long-lived index out of garbage collection scans
+    gc.collect()
+    gc.freeze()
+
+    # Keystroke prefixes of real terms, half of them with a typo
+    queries = []
+    while len(queries) < args.queries:
+        text = rng.choice(terms)[0].lower()
+        typed = text[: rng.randint(1, len(text))]
+        queries.append(misspell(typed, rng) if rng.random() < 0.5 else typed)
+
+    for query in queries[:1000]:  # Warm-up
+        index.suggest(query, args.limit)
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter_ns()
+        index.suggest(query, args.limit)
+        timings.append(time.perf_counter_ns() - start)
+    timings.sort()
+
+    p50, p95, p99 = (percentile(timings, f) / 1e6 for f in (0.50, 0.95, 0.99))
+    worst = timings[-1] / 1e6
+    print(
+        f"{len(queries)} queries: p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms "
+        f"max={worst:.3f}ms"
+    )
+
+    if p99 > args.budget_ms:
+        print(f"p99 exceeds budget of {args.budget_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""CLI script to build the binary snapshots of the compiled rule catalog and carriers.yaml."""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.ruleset import DEFAULT_CARRIERS_DIR, RuleSet, content_version, read_sources
+from src.ai.snapshot import (
+    DEFAULT_CONFIG_SNAPSHOT_PATH,
+    DEFAULT_SNAPSHOT_PATH,
+    read_config_snapshot,
+    read_snapshot,
+    write_config_snapshot,
+    write_snapshot,
+)
+from src.ai.yaml_loader import SafeLoader
+
+logger = logging.getLogger("carrier_predictor")
+
+DEFAULT_CARRIERS_YAML = Path(__file__).parent.parent / "src" / "config" / "carriers.yaml"
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description="Compile carriers/ YAML rules into a fast-loading binary snapshot"
+    )
+    parser.add_argument(
+        "--carriers-dir",
+        type=str,
+        default=str(DEFAULT_CARRIERS_DIR),
+        help="Directory containing product YAML files (default: carriers)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(DEFAULT_SNAPSHOT_PATH),
+        help="Snapshot file to write (default: data/index/rules_snapshot.pkl)",
+    )
+    parser.add_argument(
+        "--carriers-yaml",
+        type=str,
+        default=str(DEFAULT_CARRIERS_YAML),
+        help="Carrier table read by the rules engine (default: src/config/carriers.yaml)",
+    )
+    parser.add_argument(
+        "--config-output",
+        type=str,
+        default=str(DEFAULT_CONFIG_SNAPSHOT_PATH),
+        help="carriers.yaml snapshot to write (default: data/index/carriers_config_snapshot.pkl)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report whether the existing snapshot is up to date (exit 1 if stale)",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    carriers_dir = Path(args.carriers_dir)
+    if not carriers_dir.is_dir():
+        logger.error(f"Directory not found: {args.carriers_dir}")
+        sys.exit(1)
+
+    sources = read_sources(carriers_dir)
+    version = content_version(sources)
+    carriers_yaml = Path(args.carriers_yaml)
+    config = carriers_yaml.read_bytes() if carriers_yaml.exists() else None
+
+    if args.check:
+        stale = False
+        if read_snapshot(Path(args.output), version) is None:
+            logger.info(f"Snapshot {args.output} is missing or stale (rules {version})")
+            stale = True
+        else:
+            logger.info(f"Snapshot {args.output} is up to date (rules {version})")
+        if config is not None and read_config_snapshot(config, Path(args.config_output)) is None:
+            logger.info(f"Snapshot {args.config_output} is missing or stale")
+            stale = True
+        if stale:
+            sys.exit(1)
+        return
+
+    start = time.perf_counter()
+    rule_set = RuleSet.from_sources(sources)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    path = write_snapshot(rule_set, Path(args.output))
+    if config is not None:
+        config_path = write_config_snapshot(config, Path(args.config_output))
+
+    start = time.perf_counter()
+    read_snapshot(path, version)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    logger.info("✓ Rule snapshot built successfully!")
+    logger.info(f"  Products: {len(rule_set)} from {len(sources)} files")
+    logger.info(f"  Rule set version: {version}")
+    logger.info(f"  YAML loader: {SafeLoader.__name__}")
+    logger.info(f"  Parse + compile: {compile_ms:.1f} ms, snapshot load: {load_ms:.1f} ms")
+    logger.info(f"  Snapshot location: {path}")
+    if config is not None:
+        logger.info(f"  carriers.yaml snapshot: {config_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""CLI script reporting how many products survive each eligibility stage."""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai.ruleset import DEFAULT_CARRIERS_DIR, RuleSet
+
+logger = logging.getLogger("carrier_predictor")
+
+
+def read_profiles(path: Path) -> list:
+    """Profiles from a JSON list, or one JSON object per line."""
+    text = path.read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Report per-stage candidate survival (state, age band, face band, ...) "
+            "over sample profiles"
+        )
+    )
+    parser.add_argument("profiles", type=str, help="JSON list or JSONL file of client profiles")
+    parser.add_argument(
+        "--carriers-dir",
+        type=str,
+        default=str(DEFAULT_CARRIERS_DIR),
+        help="Directory containing product YAML files (default: carriers)",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    path = Path(args.profiles)
+    if not path.is_file():
+        logger.error(f"File not found: {args.profiles}")
+        sys.exit(1)
+
+    profiles = read_profiles(path)
+    if not profiles:
+        logger.error(f"No profiles in {args.profiles}")
+        sys.exit(1)
+
+    catalog = RuleSet.load(Path(args.carriers_dir)).catalog
+    totals = {}
+    for profile in profiles:
+        for stage, count in catalog.survival(profile):
+            totals.setdefault(stage, []).append(count)
+
+    logger.info(f"Candidate survival over {len(profiles)} profiles ({catalog.size} products)")
+    logger.info(
+        f"  {'stage':<24}{'profiles':>9}{'mean':>9}{'min':>6}{'max':>6}{'% of catalog':>14}"
+    )
+    for stage, counts in totals.items():
+        mean = sum(counts) / len(counts)
+        share = 100 * mean / catalog.size if catalog.size else 0.0
+        logger.info(
+            f"  {stage:<24}{len(counts):>9}{mean:>9.1f}"
+            f"{min(counts):>6}{max(counts):>6}{share:>13.1f}%"
+        )
+    logger.info(f"  Memoized leaves: {len(catalog.candidate_index)}")
+
+
+if __name__ == "__main__":
+    main()
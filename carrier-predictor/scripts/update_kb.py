@@ -8,7 +8,7 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.services import embedder_service, kb_loader, logger
+from src.services import embedder_service, kb_ingestor, logger
 
 
 def main():
@@ -25,7 +25,7 @@ def main():
     parser.add_argument(
         "--rebuild",
         action="store_true",
-        help="Force rebuild even if index exists",
+        help="Re-index every file instead of only new, changed and removed ones",
     )
 
     args = parser.parse_args()
@@ -41,40 +41,24 @@ def main():
         sys.exit(1)
 
     try:
-        # Check if index exists
-        if embedder_service.index_exists() and not args.rebuild:
-            logger.info("Index already exists. Use --rebuild to force rebuild.")
-            response = input("Rebuild anyway? (y/N): ")
-            if response.lower() not in ["y", "yes"]:
-                logger.info("Aborting.")
-                sys.exit(0)
-
-        # Load documents
-        logger.info(f"Loading documents from {args.path}...")
-        chunks = kb_loader.load_documents(str(path))
-
-        if not chunks:
-            logger.error("No documents found or no text extracted.")
-            logger.error("Ensure directory contains .pdf, .html, or .txt files.")
-            sys.exit(1)
-
-        # Count unique files
-        unique_files = set(chunk.source_path for chunk in chunks)
-        logger.info(f"Loaded {len(unique_files)} files with {len(chunks)} chunks")
-
-        # Build index
-        logger.info("Building FAISS index (this may take a minute)...")
-        embedder_service.build_index(chunks)
-
-        # Save index
-        logger.info("Saving index...")
-        embedder_service.save_index()
+        # Only new, changed and removed files are re-embedded unless --rebuild
+        logger.info(f"Ingesting documents from {args.path}...")
+        report = kb_ingestor.ingest(str(path), rebuild=args.rebuild)
 
         logger.info("✓ Knowledge base updated successfully!")
-        logger.info(f"  Files indexed: {len(unique_files)}")
-        logger.info(f"  Total chunks: {len(chunks)}")
+        logger.info(f"  Files indexed: {report.total_files}")
+        logger.info(
+            f"  Added/changed/removed/unchanged: {report.files_added}/{report.files_changed}/"
+            f"{report.files_removed}/{report.files_unchanged}"
+        )
+        logger.info(f"  Chunks embedded: {report.chunks_embedded} (reused {report.chunks_reused})")
+        logger.info(f"  Total chunks: {report.total_chunks}")
         logger.info(f"  Index location: {embedder_service.index_dir}")
 
+    except ValueError as e:
+        # Nothing to index; the existing index is left as it was
+        logger.error(str(e))
+        sys.exit(1)
     except KeyboardInterrupt:
         logger.info("\nInterrupted by user")
         sys.exit(1)
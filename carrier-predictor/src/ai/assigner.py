@@ -6,11 +6,28 @@ product matching based on client profile.
 """
 
 import glob
-import yaml
+import heapq
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, FrozenSet, Iterable, Optional, Tuple, Union
 from dataclasses import dataclass
+from .build_chart import BuildChart, compile_build_chart
 from .carrier_portals import get_portal_info
+from .codegen import compile_predicate
+from .catalog import CompiledCatalog
+from .intervals import build_duration_index, build_face_index
+from .medications import default_medication_aliases
+from .profile import ProfileContext, normalize_state
+from .trace import trace_eligibility
+from .yaml_loader import safe_load
+
+# Rule predicates and score() take a raw profile dict or a prebuilt ProfileContext
+ProfileInput = Union[Dict[str, Any], ProfileContext]
+
+# Sizes of the sections assign() returns
+RECOMMENDATION_LIMIT = 3
+BUDGET_OPTION_LIMIT = 2
+ALTERNATIVE_LIMIT = 2
 
 
 @dataclass
@@ -37,6 +54,79 @@ class CarrierRule:
     riders: List[str] = None  # Available riders/living benefits
     am_best_rating: str = None  # A.M. Best financial strength rating
     typical_premium_tier: str = None  # "low", "medium", "high" for budget comparison
+    source_hash: str = None  # Content hash of the product YAML (keys compiled predicates)
+
+    def __post_init__(self):
+        # Band tables are compiled once at load so age/face checks are a bisect
+        self._duration_index = build_duration_index(self.issue_ages or {})
+        self._face_index = build_face_index(
+            self.face_amount or {}, f"{self.carrier} {self.product}"
+        )
+        self._compile_score_components()
+        self._compile_medications()
+        self._compile_build_chart()
+
+        # State availability: optional 'states' allowlist minus the 'except' list.
+        # 'all_states: false' without an allowlist still means "all except", which is
+        # how the catalog uses it (e.g. UHL: all_states false, except NY/CA/AK/HI).
+        availability = self.state_availability if isinstance(self.state_availability, dict) else {}
+        allowed = availability.get('states')
+        self._allowed_states = frozenset(s.upper() for s in allowed) if allowed else None
+        self._excluded_states = frozenset(s.upper() for s in availability.get('except') or [])
+
+    def _compile_build_chart(self) -> None:
+        """Resolve the build block into BMI caps by gender and weight ranges by total inches."""
+        eligibility = self.eligibility or {}
+        if 'build' in eligibility:
+            self._build_chart = compile_build_chart(eligibility['build'] or {})
+        else:
+            self._build_chart = None
+
+    @property
+    def build_chart(self) -> Optional[BuildChart]:
+        """Compiled build limits, or None when the product has no build rules."""
+        return self._build_chart
+
+    def _compile_medications(self) -> None:
+        """Compile rejected/required medication lists into frozensets of canonical names."""
+        aliases = default_medication_aliases()
+        medication_rules = (self.eligibility or {}).get('medications') or {}
+
+        self._rejected_medications = aliases.canonicalize(medication_rules.get('rejected', []))
+        self._required_medications = tuple(
+            (condition, aliases.canonicalize(required_meds))
+            for condition, required_meds in (medication_rules.get('required_for') or {}).items()
+            if required_meds
+        )
+
+    @property
+    def rejected_medications(self) -> FrozenSet[str]:
+        """Canonical names of medications that decline this product."""
+        return self._rejected_medications
+
+    @property
+    def required_medications(self) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+        """(condition, canonical medication names) pairs: one of the names is required."""
+        return self._required_medications
+
+    @property
+    def allowed_states(self) -> Optional[FrozenSet[str]]:
+        """States the product is limited to, or None when sold in all states."""
+        return self._allowed_states
+
+    @property
+    def excluded_states(self) -> FrozenSet[str]:
+        """States the product is not sold in."""
+        return self._excluded_states
+
+    def available_in_state(self, state: Optional[str]) -> bool:
+        """Check if the product is sold in a state (no state given = no restriction)."""
+        state = normalize_state(state)
+        if state is None:
+            return True
+        if self._allowed_states is not None and state not in self._allowed_states:
+            return False
+        return state not in self._excluded_states
 
     def supports_age(self, age: int) -> bool:
         """Check if age is within eligible range."""
@@ -47,45 +137,94 @@ class CarrierRule:
         max_age = self.issue_ages.get('max', 120)
 
         # Handle age-by-duration rules (e.g., term products)
-        if 'by_duration' in self.issue_ages:
-            # If we have duration-specific rules, check if ANY duration supports this age
-            # Format: {10_year: [18, 60], 15_year: [18, 60], ...}
-            for duration_data in self.issue_ages['by_duration'].values():
-                if isinstance(duration_data, list) and len(duration_data) == 2:
-                    if duration_data[0] <= age <= duration_data[1]:
-                        return True
-            return False
+        # Format: {10_year: [18, 60], 15_year: [18, 60], ...}
+        # If we have duration-specific rules, ANY duration supporting this age is enough
+        if self._duration_index is not None:
+            return bool(self._duration_index.lookup(age))
 
         return min_age <= age <= max_age
 
+    @property
+    def has_term_durations(self) -> bool:
+        """True when issue ages are defined per term duration (by_duration)."""
+        return self._duration_index is not None
+
+    def eligible_terms(self, age: int) -> Tuple[Any, ...]:
+        """Return the term lengths (years) this age can be issued, from by_duration rules."""
+        if self._duration_index is None or not age:
+            return ()
+        return self._duration_index.lookup(age)
+
+    def supports_term(self, term_length: int, age: int) -> bool:
+        """Check a requested term length against by_duration issue ages.
+
+        Products without duration-specific rules don't restrict the term length.
+        """
+        if self._duration_index is None:
+            return True
+        return term_length in self.eligible_terms(age)
+
+    def face_limits(self, age: int = None) -> Optional[Tuple[float, float]]:
+        """Return the (min, max) face amount allowed at an issue age, or None if none is."""
+        # Handle face amount by age (common in term products)
+        # Format: {"18_45": [50000, 400000], "46_55": [50000, 300000], ...}
+        if self._face_index is not None:
+            if not age:
+                return None
+            return self._face_index.first(age)
+
+        # Standard min/max
+        return self.face_amount.get('min', 0), self.face_amount.get('max', float('inf'))
+
     def supports_face(self, face: int, age: int = None) -> bool:
         """Check if face amount is within eligible range."""
         if not face:
             return False
 
-        # Handle face amount by age (common in term products)
-        # Format: {18_45: [50000, 400000], 46_55: [50000, 300000], ...}
-        if 'by_age' in self.face_amount:
-            if not age:
-                return False
-            for age_range_key, face_range in self.face_amount['by_age'].items():
-                # Parse age range from key like "18_45"
-                if '_' in str(age_range_key):
-                    parts = str(age_range_key).split('_')
-                    if len(parts) == 2:
-                        min_age = int(parts[0])
-                        max_age = int(parts[1])
-                        if min_age <= age <= max_age:
-                            if isinstance(face_range, list) and len(face_range) == 2:
-                                return face_range[0] <= face <= face_range[1]
+        limits = self.face_limits(age)
+        if limits is None:
             return False
+        return limits[0] <= face <= limits[1]
 
-        # Standard min/max
-        min_face = self.face_amount.get('min', 0)
-        max_face = self.face_amount.get('max', float('inf'))
-        return min_face <= face <= max_face
+    def is_eligible_interpreted(self, profile: ProfileInput) -> bool:
+        """Full eligibility for this product, evaluated from the rule dicts.
+
+        State, prior decline, age, face, term, knockouts and health, exactly as
+        CompiledCatalog.eligible_indices() screens the catalog.
+        """
+        context = ProfileContext.ensure(profile)
+        if not self.available_in_state(context.state):
+            return False
+        prior_decline_carrier = context.prior_decline_carrier
+        if prior_decline_carrier and prior_decline_carrier in self.carrier.lower():
+            return False
+        full_medical = 'Full Medical' in self.underwriting_type
+        if context.prior_decline and full_medical and not self.tier_structure:
+            return False
 
-    def passes_knockouts(self, profile: Dict[str, Any]) -> bool:
+        age = context.age
+        return (
+            self.supports_age(age)
+            and self.supports_face(context.desired_coverage, age)
+            and (not context.term_length or self.supports_term(context.term_length, age))
+            and self.passes_knockouts(context)
+            and self.passes_health(context)
+        )
+
+    def is_eligible(self, profile: ProfileInput) -> bool:
+        """Full eligibility for this product, using its compiled predicate."""
+        predicate = self.__dict__.get('_predicate')
+        if predicate is None:
+            predicate = self._predicate = compile_predicate(self)
+        return predicate(ProfileContext.ensure(profile))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled predicates are process-local; snapshots recompile them on demand
+        state = dict(self.__dict__)
+        state.pop('_predicate', None)
+        return state
+
+    def passes_knockouts(self, profile: ProfileInput) -> bool:
         """
         Check if profile passes knockout questions (strict disqualifiers).
 
@@ -111,7 +250,7 @@ class CarrierRule:
 
         return True
 
-    def passes_health(self, profile: Dict[str, Any]) -> bool:
+    def passes_health(self, profile: ProfileInput) -> bool:
         """
         Check if profile meets health, driving, and felony requirements.
 
@@ -120,70 +259,27 @@ class CarrierRule:
         if not self.eligibility:
             return True
 
-        # Build chart (height/weight/BMI validation)
-        if 'build' in self.eligibility:
-            build_rules = self.eligibility['build']
-
-            # Calculate BMI if height and weight provided
-            height_ft = profile.get('height_ft')
-            height_in = profile.get('height_in')
-            weight = profile.get('weight')
-            gender = profile.get('gender', 'M')
-
-            if height_ft and height_in and weight:
-                # Convert to metric for BMI calculation
-                total_inches = (height_ft * 12) + height_in
-                height_meters = total_inches * 0.0254
-                weight_kg = weight * 0.453592
-                bmi = weight_kg / (height_meters ** 2)
-
-                # Check against max BMI thresholds
-                if 'max_bmi' in build_rules:
-                    max_bmi = build_rules['max_bmi']
-
-                    # Handle gender-specific BMI limits
-                    if isinstance(max_bmi, dict):
-                        if gender in max_bmi:
-                            if bmi > max_bmi[gender]:
-                                return False
-                        elif 'standard' in max_bmi:
-                            if bmi > max_bmi['standard']:
-                                return False
-                    elif isinstance(max_bmi, (int, float)):
-                        if bmi > max_bmi:
-                            return False
-
-                # Check against min/max weight by height if specified
-                if 'weight_by_height' in build_rules:
-                    height_key = f"{height_ft}_{height_in}"
-                    if height_key in build_rules['weight_by_height']:
-                        weight_range = build_rules['weight_by_height'][height_key]
-                        if isinstance(weight_range, list) and len(weight_range) == 2:
-                            if not (weight_range[0] <= weight <= weight_range[1]):
-                                return False
-
-        # Medication-specific acceptance
+        context = ProfileContext.ensure(profile)
+
+        # Build chart (BMI caps by gender, weight ranges by total inches; compiled at load)
+        if self._build_chart is not None and self._build_chart.rejects(
+            context.gender, context.bmi, context.height_inches, context.weight
+        ):
+            return False
+
+        # Medication-specific acceptance (canonical names, compiled at load)
         if 'medications' in self.eligibility:
-            medication_rules = self.eligibility['medications']
-            profile_meds = profile.get('medications', [])
+            profile_meds = context.medications_canonical
 
             # Check if any medications are explicitly rejected
-            if 'rejected' in medication_rules:
-                for med in profile_meds:
-                    if med.lower() in [m.lower() for m in medication_rules['rejected']]:
-                        return False
+            if self._rejected_medications & profile_meds:
+                return False
 
             # Check if required medications are missing (for certain conditions)
-            if 'required_for' in medication_rules:
-                for condition, required_meds in medication_rules['required_for'].items():
-                    # If condition is present, check medications
-                    if profile.get(condition, False):
-                        has_required = any(
-                            med.lower() in [m.lower() for m in profile_meds]
-                            for med in required_meds
-                        )
-                        if required_meds and not has_required:
-                            return False
+            for condition, required_meds in self._required_medications:
+                # If condition is present, check medications
+                if context.get(condition, False) and not required_meds & profile_meds:
+                    return False
 
         # Driving record
         if 'driving' in self.eligibility:
@@ -192,39 +288,111 @@ class CarrierRule:
             # DUI lookback
             if 'dui_years_lookback' in driving_rules:
                 lookback = driving_rules['dui_years_lookback']
-                recent_duis = profile.get('dui_count_recent', 0)
+                recent_duis = context.dui_count_recent
                 if recent_duis > driving_rules.get('max_dui_total', 0):
                     return False
 
             # Major violations
             if 'max_major_violations' in driving_rules:
-                if profile.get('major_violations', 0) > driving_rules['max_major_violations']:
+                if context.major_violations > driving_rules['max_major_violations']:
                     return False
 
         # Felony lookback
         if 'felony_lookback_years' in self.eligibility:
-            if profile.get('felony_within_lookback', False):
+            if context.felony_within_lookback:
                 return False
 
         # Hazardous avocation
         if not self.eligibility.get('avocation_hazardous', True):
-            if profile.get('hazardous_avocation', False):
+            if context.hazardous_avocation:
                 return False
 
         # Aviation
         if not self.eligibility.get('aviation', True):
-            if profile.get('aviation_activity', False):
+            if context.aviation_activity:
                 return False
 
         # Nicotine/non-tobacco check
         if not self.eligibility.get('nicotine_non_tobacco_allowed', True):
-            if profile.get('nicotine_use') and not profile.get('tobacco_use'):
+            if context.nicotine_without_tobacco:
                 # Using nicotine but not tobacco (e.g., vaping) - not allowed
                 return False
 
         return True
 
-    def score(self, profile: Dict[str, Any]) -> float:
+    def _compile_score_components(self) -> None:
+        """Precompute the parts of score() that don't depend on the client."""
+        # Build/BMI fit: the cap a client's BMI is compared against (None = no BMI restriction)
+        self._score_max_bmi = None
+        if 'build' in self.eligibility and 'max_bmi' in self.eligibility['build']:
+            max_bmi = self.eligibility['build']['max_bmi']
+            if isinstance(max_bmi, dict):
+                max_bmi = max_bmi.get('standard', 40)
+            self._score_max_bmi = max_bmi
+
+        # Health conditions acceptance: (points with conditions, points without)
+        if 'Guaranteed Issue' in self.underwriting_type:
+            self._score_health = (10, 6)
+        elif 'Simplified' in self.underwriting_type:
+            self._score_health = (9, 9)
+        elif 'Full Medical' in self.underwriting_type:
+            self._score_health = (7, 10)
+        else:
+            self._score_health = (0, 0)
+
+        tobacco_classes = [tc.lower() for tc in self.tobacco_classes]
+        self._score_offers_tobacco = any('tobacco' in tc for tc in tobacco_classes)
+        self._score_offers_non_tobacco = any(
+            'nontobacco' in tc or 'non-tobacco' in tc for tc in tobacco_classes
+        )
+        self._score_medications = 3 if 'medications' in self.eligibility else 5
+
+        # Product type/term fit
+        self._score_type_lower = self.type.lower()
+        self._score_is_final_expense = 'final expense' in self._score_type_lower
+        self._score_term_bonus = (
+            5 if 'term' in self._score_type_lower and 'by_duration' in self.issue_ages else 0
+        )
+
+        # Riders: lowered names for preference matching, and the score without preferences
+        self._score_riders_lower = [r.lower() for r in self.riders] if self.riders else []
+        self._score_riders_default = min(20, len(self.riders) * 4) if self.riders else 10
+
+        # Face amount centrality
+        min_face = self.face_amount.get('min', 0)
+        max_face = self.face_amount.get('max', float('inf'))
+        if isinstance(max_face, dict):
+            max_face = float('inf')
+        self._score_face_range = (min_face, max_face)
+        self._score_face_midpoint = (min_face + max_face) / 2
+        self._score_face_max_distance = (max_face - min_face) / 2
+
+        # Premium tier consideration (5 points); high tier gets 0 bonus
+        self._score_premium_tier = {'low': 5, 'medium': 3}.get(self.typical_premium_tier, 0)
+
+        # A.M. Best rating (5 points) and multi-tier flexibility (3 points)
+        if self.am_best_rating:
+            rating = self.am_best_rating.upper()
+            if 'A++' in rating or 'A+' in rating:
+                rating_score = 5
+            elif 'A' in rating:
+                rating_score = 4
+            elif 'B++' in rating or 'B+' in rating:
+                rating_score = 3
+            else:
+                rating_score = 2
+        else:
+            rating_score = 3  # Unknown rating
+        self._score_quality = rating_score + (3 if self.tier_structure else 0)
+
+        # Age fit centrality
+        min_age = self.issue_ages.get('min', 0)
+        max_age = self.issue_ages.get('max', 120)
+        self._score_age_range = (min_age, max_age)
+        self._score_age_midpoint = (min_age + max_age) / 2
+        self._score_age_max_distance = (max_age - min_age) / 2
+
+    def score(self, profile: ProfileInput) -> float:
         """
         Calculate deterministic score for this product given the profile.
 
@@ -237,186 +405,167 @@ class CarrierRule:
         - 20% Riders/Living Benefits Match
         - 15% Face Amount/Budget Alignment
         - 10% Carrier Quality & Multi-tier Flexibility
+
+        Client-independent components are precomputed at load by
+        _compile_score_components(); only the client-dependent parts run here,
+        reading the per-request ProfileContext.
         """
+        context = ProfileContext.ensure(profile)
+        score = self.score_client_fit(context)
+
+        # === 4. FACE AMOUNT/BUDGET ALIGNMENT (15 points) ===
+        budget_score = 0.0
+        requested_face = context.desired_coverage
+
+        if requested_face:
+            min_face, max_face = self._score_face_range
+
+            if min_face <= requested_face <= max_face:
+                # Centrality scoring (prefer mid-range)
+                distance_from_mid = abs(requested_face - self._score_face_midpoint)
+                max_distance = self._score_face_max_distance
+
+                if max_distance > 0:
+                    centrality = 1 - (distance_from_mid / max_distance)
+                    budget_score += 10 * centrality
+                else:
+                    budget_score += 10
+
+        # Premium tier consideration (5 points)
+        budget_score += self._score_premium_tier
+
+        score += budget_score
+
+        # === 5. CARRIER QUALITY & FLEXIBILITY (10 points) ===
+        # A.M. Best rating (5 points) + multi-tier flexibility (3 points)
+        quality_score = 0.0 + self._score_quality
+
+        # Age fit bonus (2 points) - prefer products targeting client's age range
+        age = context.age
+        if age:
+            min_age, max_age = self._score_age_range
+
+            if min_age <= age <= max_age:
+                distance_from_mid = abs(age - self._score_age_midpoint)
+                max_distance = self._score_age_max_distance
+
+                if max_distance > 0:
+                    centrality = 1 - (distance_from_mid / max_distance)
+                    quality_score += 2 * centrality
+
+        score += quality_score
+
+        return score
+
+    def score_client_fit(self, profile: ProfileInput) -> float:
+        """Underwriting, product type and rider points of score().
+
+        These sections don't depend on the client's age or face amount, so
+        what-if grids score them once per product and vectorize the rest
+        (CompiledCatalog.grid_scores).
+        """
+        context = ProfileContext.ensure(profile)
         score = 0.0
 
         # === 1. UNDERWRITING FIT (30 points) ===
         uw_fit_score = 0.0
 
         # Build/BMI fit (10 points)
-        height_ft = profile.get('height_ft')
-        height_in = profile.get('height_in')
-        weight = profile.get('weight')
-
-        if height_ft and height_in and weight:
-            total_inches = (height_ft * 12) + height_in
-            height_meters = total_inches * 0.0254
-            weight_kg = weight * 0.453592
-            bmi = weight_kg / (height_meters ** 2)
-
-            # Reward products with lenient build requirements
-            if 'build' in self.eligibility and 'max_bmi' in self.eligibility['build']:
-                max_bmi = self.eligibility['build']['max_bmi']
-                if isinstance(max_bmi, dict):
-                    max_bmi = max_bmi.get('standard', 40)
-
-                # More lenient = higher score
-                if bmi <= max_bmi * 0.85:  # Well within limits
-                    uw_fit_score += 10
-                elif bmi <= max_bmi:  # Within limits
-                    uw_fit_score += 7
-            else:
-                uw_fit_score += 10  # No BMI restriction = best
-
+        bmi = context.bmi
+
+        if bmi is not None and self._score_max_bmi is not None:
+            # More lenient = higher score
+            max_bmi = self._score_max_bmi
+            if bmi <= max_bmi * 0.85:  # Well within limits
+                uw_fit_score += 10
+            elif bmi <= max_bmi:  # Within limits
+                uw_fit_score += 7
         else:
-            uw_fit_score += 10  # No data provided, assume acceptable
+            uw_fit_score += 10  # No BMI restriction or no data provided
 
         # Health conditions acceptance (10 points)
-        medical_conditions = profile.get('medical_conditions', {})
-        has_conditions = any(medical_conditions.values()) if isinstance(medical_conditions, dict) else bool(medical_conditions)
-
-        if 'Guaranteed Issue' in self.underwriting_type:
-            uw_fit_score += 10 if has_conditions else 6
-        elif 'Simplified' in self.underwriting_type:
-            uw_fit_score += 9
-        elif 'Full Medical' in self.underwriting_type:
-            uw_fit_score += 10 if not has_conditions else 7
+        uw_fit_score += self._score_health[0] if context.has_conditions else self._score_health[1]
 
         # Tobacco fit (5 points)
-        tobacco_status = profile.get('tobacco_status', 'non-tobacco' if not profile.get('smoker') else 'tobacco')
-        tobacco_classes = [tc.lower() for tc in self.tobacco_classes]
+        tobacco_status = context.tobacco_status
 
-        if tobacco_status == 'tobacco' and any('tobacco' in tc for tc in tobacco_classes):
+        if tobacco_status == 'tobacco' and self._score_offers_tobacco:
             uw_fit_score += 5
-        elif tobacco_status in ['non-tobacco', 'former'] and any('nontobacco' in tc or 'non-tobacco' in tc for tc in tobacco_classes):
+        elif tobacco_status in ['non-tobacco', 'former'] and self._score_offers_non_tobacco:
             uw_fit_score += 5
 
         # Medication acceptance (5 points)
-        if 'medications' in self.eligibility:
-            uw_fit_score += 3  # Has specific medication rules (more refined)
-        else:
-            uw_fit_score += 5  # No medication restrictions
+        uw_fit_score += self._score_medications
 
         score += uw_fit_score
 
         # === 2. PRODUCT TYPE/TERM FIT (25 points) ===
         type_score = 0.0
-        desired_type = profile.get('coverage_type', '')
+        desired_type = context.coverage_type
 
         # Exact type match
-        if desired_type.lower() in self.type.lower():
+        if desired_type in self._score_type_lower:
             type_score += 20
-        elif 'final expense' in self.type.lower() and desired_type.lower() in ['whole life', 'wl']:
+        elif self._score_is_final_expense and desired_type in ['whole life', 'wl']:
             type_score += 18
 
-        # Term duration match (if applicable)
-        if 'term' in self.type.lower() and 'term' in desired_type.lower():
-            # Check if we have duration-specific rules
-            if 'by_duration' in self.issue_ages:
-                type_score += 5  # Bonus for multiple duration options
+        # Term duration match: bonus for multiple duration options
+        if 'term' in desired_type:
+            type_score += self._score_term_bonus
 
         score += type_score
 
         # === 3. RIDERS/LIVING BENEFITS (20 points) ===
         rider_score = 0.0
-        desired_riders = profile.get('rider_preferences', [])
-
-        if self.riders:
-            available_riders_lower = [r.lower() for r in self.riders]
+        desired_riders = context.rider_preferences_lower
 
-            if desired_riders:
-                # Check how many desired riders are available
-                matches = sum(1 for r in desired_riders if any(r.lower() in ar for ar in available_riders_lower))
-                if len(desired_riders) > 0:
-                    rider_score += 20 * (matches / len(desired_riders))
-            else:
-                # No specific preferences, reward having many riders
-                rider_score += min(20, len(self.riders) * 4)
+        if self._score_riders_lower and desired_riders:
+            # Check how many desired riders are available
+            available = self._score_riders_lower
+            matches = sum(1 for r in desired_riders if any(r in ar for ar in available))
+            rider_score += 20 * (matches / len(desired_riders))
         else:
-            # No rider data in YAML, give neutral score
-            rider_score += 10
+            # No preferences: reward having many riders (neutral score without rider data)
+            rider_score += self._score_riders_default
 
         score += rider_score
 
-        # === 4. FACE AMOUNT/BUDGET ALIGNMENT (15 points) ===
-        budget_score = 0.0
-        requested_face = profile.get('desired_coverage', 0)
-
-        if requested_face:
-            min_face = self.face_amount.get('min', 0)
-            max_face = self.face_amount.get('max', float('inf'))
-
-            if isinstance(max_face, dict):
-                max_face = float('inf')
-
-            if min_face <= requested_face <= max_face:
-                # Centrality scoring (prefer mid-range)
-                midpoint = (min_face + max_face) / 2
-                distance_from_mid = abs(requested_face - midpoint)
-                max_distance = (max_face - min_face) / 2
-
-                if max_distance > 0:
-                    centrality = 1 - (distance_from_mid / max_distance)
-                    budget_score += 10 * centrality
-                else:
-                    budget_score += 10
-
-        # Premium tier consideration (5 points)
-        if self.typical_premium_tier:
-            if self.typical_premium_tier == 'low':
-                budget_score += 5
-            elif self.typical_premium_tier == 'medium':
-                budget_score += 3
-            # High tier gets 0 bonus
-
-        score += budget_score
-
-        # === 5. CARRIER QUALITY & FLEXIBILITY (10 points) ===
-        quality_score = 0.0
-
-        # A.M. Best rating (5 points)
-        if self.am_best_rating:
-            rating = self.am_best_rating.upper()
-            if 'A++' in rating or 'A+' in rating:
-                quality_score += 5
-            elif 'A' in rating:
-                quality_score += 4
-            elif 'B++' in rating or 'B+' in rating:
-                quality_score += 3
-            else:
-                quality_score += 2
-        else:
-            quality_score += 3  # Unknown rating
-
-        # Multi-tier flexibility (3 points)
-        if self.tier_structure:
-            quality_score += 3
-
-        # Age fit bonus (2 points) - prefer products targeting client's age range
-        age = profile.get('age', 0)
-        if age:
-            min_age = self.issue_ages.get('min', 0)
-            max_age = self.issue_ages.get('max', 120)
-
-            if min_age <= age <= max_age:
-                midpoint = (min_age + max_age) / 2
-                distance_from_mid = abs(age - midpoint)
-                max_distance = (max_age - min_age) / 2
-
-                if max_distance > 0:
-                    centrality = 1 - (distance_from_mid / max_distance)
-                    quality_score += 2 * centrality
+        return score
 
-        score += quality_score
 
-        return score
+def rule_from_dict(data: Dict[str, Any], source_hash: Optional[str] = None) -> CarrierRule:
+    """Build a CarrierRule from a parsed product YAML document (and its content hash)."""
+    return CarrierRule(
+        carrier=data.get('carrier', ''),
+        product=data.get('product', ''),
+        type=data.get('type', ''),
+        synopsis=data.get('synopsis', ''),
+        face_amount=data.get('face_amount', {}),
+        issue_ages=data.get('issue_ages', {}),
+        tobacco_classes=data.get('tobacco_classes', []),
+        underwriting_type=data.get('underwriting_type', ''),
+        knockouts=data.get('knockouts', {}),
+        eligibility=data.get('eligibility', {}),
+        accepted=data.get('accepted'),
+        unique_advantages=data.get('unique_advantages'),
+        limitations=data.get('limitations'),
+        tier_structure=data.get('tier_structure'),
+        notes=data.get('notes'),
+        sources=data.get('sources'),
+        state_availability=data.get('state_availability'),
+        riders=data.get('riders'),
+        am_best_rating=data.get('am_best_rating'),
+        typical_premium_tier=data.get('typical_premium_tier'),
+        source_hash=source_hash,
+    )
 
 
 def load_rules(carriers_dir: str = "carriers") -> List[CarrierRule]:
     """
     Load all YAML product rules from carriers directory.
 
-    Returns list of CarrierRule objects.
+    Returns list of CarrierRule objects. Request handlers should use the shared,
+    versioned RuleSet from ``ruleset.rule_set_cache`` instead of calling this per request.
     """
     rules = []
 
@@ -429,45 +578,75 @@ def load_rules(carriers_dir: str = "carriers") -> List[CarrierRule]:
     for yaml_file in yaml_files:
         try:
             with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
+                data = safe_load(f)
 
                 if data:  # Skip empty files
-                    rule = CarrierRule(
-                        carrier=data.get('carrier', ''),
-                        product=data.get('product', ''),
-                        type=data.get('type', ''),
-                        synopsis=data.get('synopsis', ''),
-                        face_amount=data.get('face_amount', {}),
-                        issue_ages=data.get('issue_ages', {}),
-                        tobacco_classes=data.get('tobacco_classes', []),
-                        underwriting_type=data.get('underwriting_type', ''),
-                        knockouts=data.get('knockouts', {}),
-                        eligibility=data.get('eligibility', {}),
-                        accepted=data.get('accepted'),
-                        unique_advantages=data.get('unique_advantages'),
-                        limitations=data.get('limitations'),
-                        tier_structure=data.get('tier_structure'),
-                        notes=data.get('notes'),
-                        sources=data.get('sources'),
-                        state_availability=data.get('state_availability'),
-                        riders=data.get('riders'),
-                        am_best_rating=data.get('am_best_rating'),
-                        typical_premium_tier=data.get('typical_premium_tier')
-                    )
-                    rules.append(rule)
+                    rules.append(rule_from_dict(data))
         except Exception as e:
             print(f"Warning: Failed to load {yaml_file}: {e}")
 
     return rules
 
 
-def assign(profile: Dict[str, Any], rules: Optional[List[CarrierRule]] = None) -> Dict[str, Any]:
+def _product_info(rule: CarrierRule, score: float) -> Dict[str, Any]:
+    """Build the response dict for a scored product."""
+    # Build rationale
+    rationale = f"{rule.synopsis}"
+    if rule.unique_advantages:
+        rationale += f" • {rule.unique_advantages[0]}"
+
+    # Get portal information for carrier
+    portal_info = get_portal_info(rule.carrier)
+
+    return {
+        'carrier': rule.carrier,
+        'product': rule.product,
+        'type': rule.type,
+        'score': score,
+        'rationale': rationale,
+        'underwriting_type': rule.underwriting_type,
+        'face_amount_range': (
+            f"${rule.face_amount.get('min', 0):,} - ${rule.face_amount.get('max', 0):,}"
+        ),
+        'issue_ages': f"{rule.issue_ages.get('min', 0)}-{rule.issue_ages.get('max', 0)}",
+        'notes': rule.notes,
+        'riders': rule.riders,
+        'am_best_rating': rule.am_best_rating,
+        'premium_tier': rule.typical_premium_tier,
+        'tier_structure': rule.tier_structure,
+        'portal_url': portal_info['portal_url'],
+        'eapp_url': portal_info['eapp_url'],
+        'phone': portal_info['phone'],
+        'logo_filename': portal_info['logo_filename']
+    }
+
+
+def _keep_top(heap: List[Tuple[float, int]], entry: Tuple[float, int], limit: int) -> None:
+    """Push entry onto a bounded min-heap, dropping the lowest-ranked entry past limit."""
+    if len(heap) < limit:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def _ranked(heap: List[Tuple[float, int]]) -> List[int]:
+    """Catalog indexes in a bounded heap, best first."""
+    return [-negated_index for _, negated_index in sorted(heap, reverse=True)]
+
+
+def assign(
+    profile: ProfileInput, rules: Optional[Iterable[CarrierRule]] = None, trace: bool = False
+) -> Dict[str, Any]:
     """
     Assign carrier products to a client profile using deterministic rules.
 
     Args:
         profile: Client profile dict with keys like age, desired_coverage, medical_conditions, etc.
-        rules: List of CarrierRule objects (if None, will load from carriers/)
+            (or a ProfileContext already built from one)
+        rules: RuleSet or list of CarrierRule objects (if None, uses the shared RuleSet).
+            A plain list is compiled on every call; pass a RuleSet for repeated use.
+        trace: Screen stage by stage and report each rejected product's first
+            failing predicate and the time per stage (see trace.trace_eligibility)
 
     Returns:
         Dict with:
@@ -475,94 +654,66 @@ def assign(profile: Dict[str, Any], rules: Optional[List[CarrierRule]] = None) -
             - best_match: Highest scoring product
             - budget_options: Products with low premium tier
             - alternatives: Simplified/GI fallback options
+            - trace: Rejections and stage timings (only when trace is set)
     """
     if rules is None:
-        rules = load_rules()
-
-    # Prior decline handling - filter out full underwriting if declined before
-    prior_decline = profile.get('prior_decline', False)
-    prior_decline_carrier = profile.get('prior_decline_carrier', '').lower()
-
-    eligible = []
-    all_scored = []  # Keep all products for categorization
-
-    for rule in rules:
-        # Skip carrier that previously declined (if specified)
-        if prior_decline_carrier and prior_decline_carrier in rule.carrier.lower():
-            continue
-
-        # Skip full underwriting if prior decline (unless multi-tier)
-        if prior_decline and 'Full Medical' in rule.underwriting_type and not rule.tier_structure:
-            continue
-
-        # Check eligibility filters
-        if not rule.supports_age(profile.get('age', 0)):
-            continue
-
-        if not rule.supports_face(profile.get('desired_coverage', 0), profile.get('age', 0)):
-            continue
-
-        if not rule.passes_knockouts(profile):
-            continue
-
-        if not rule.passes_health(profile):
-            continue
-
-        # Calculate score
-        score = rule.score(profile)
-
-        # Build rationale
-        rationale = f"{rule.synopsis}"
-        if rule.unique_advantages:
-            rationale += f" • {rule.unique_advantages[0]}"
-
-        # Get portal information for carrier
-        portal_info = get_portal_info(rule.carrier)
-
-        product_info = {
-            'carrier': rule.carrier,
-            'product': rule.product,
-            'type': rule.type,
-            'score': score,
-            'rationale': rationale,
-            'underwriting_type': rule.underwriting_type,
-            'face_amount_range': f"${rule.face_amount.get('min', 0):,} - ${rule.face_amount.get('max', 0):,}",
-            'issue_ages': f"{rule.issue_ages.get('min', 0)}-{rule.issue_ages.get('max', 0)}",
-            'notes': rule.notes,
-            'riders': rule.riders,
-            'am_best_rating': rule.am_best_rating,
-            'premium_tier': rule.typical_premium_tier,
-            'tier_structure': rule.tier_structure,
-            'portal_url': portal_info['portal_url'],
-            'eapp_url': portal_info['eapp_url'],
-            'phone': portal_info['phone'],
-            'logo_filename': portal_info['logo_filename']
-        }
-
-        all_scored.append(product_info)
-        eligible.append(product_info)
-
-    # Sort by score descending
-    eligible.sort(key=lambda x: x['score'], reverse=True)
-
-    # Categorize recommendations (GPT brain style)
-    best_match = eligible[0] if eligible else None
-
-    # Budget options: low premium tier products
-    budget_options = [p for p in eligible if p.get('premium_tier') == 'low'][:2]
-
-    # Alternatives: Simplified/GI products (fallback options)
-    alternatives = [
-        p for p in eligible
-        if 'Simplified' in p['underwriting_type'] or 'Guaranteed Issue' in p['underwriting_type']
-    ][:2]
-
-    return {
-        'recommendations': eligible[:3],
-        'best_match': best_match,
-        'budget_options': budget_options,
-        'alternatives': alternatives
+        # Imported here: ruleset builds on CarrierRule from this module
+        from .ruleset import rule_set_cache
+        rules = rule_set_cache.get()
+
+    # Vectorized eligibility over the candidate index leaf (state, age, face, prior decline,
+    # knockouts, build, medications, driving, felony, avocation, aviation, nicotine)
+    catalog = getattr(rules, 'catalog', None) or CompiledCatalog(list(rules))
+
+    # Derived profile values (BMI, tobacco status, lowercased lists) are computed once
+    context = ProfileContext.ensure(profile)
+    if trace:
+        eligibility_trace = trace_eligibility(catalog, context)
+        eligible = np.flatnonzero(eligibility_trace.eligible_mask)
+    else:
+        eligible = catalog.eligible_indices(context)
+
+    # One scoring pass keeps bounded heaps of (score, -index): highest score first,
+    # ties in catalog order, exactly as a stable sort by score would rank them
+    top_overall: List[Tuple[float, int]] = []
+    top_budget: List[Tuple[float, int]] = []
+    top_alternatives: List[Tuple[float, int]] = []
+    scores: Dict[int, float] = {}
+
+    for index in eligible.tolist():
+        score = catalog.rules[index].score(context)
+        scores[index] = score
+        entry = (score, -index)
+
+        _keep_top(top_overall, entry, RECOMMENDATION_LIMIT)
+        # Budget options: low premium tier products
+        if catalog.low_premium_tier[index]:
+            _keep_top(top_budget, entry, BUDGET_OPTION_LIMIT)
+        # Alternatives: Simplified/GI products (fallback options)
+        if catalog.simplified_or_guaranteed[index]:
+            _keep_top(top_alternatives, entry, ALTERNATIVE_LIMIT)
+
+    # Response dicts are built only for products that appear in the response,
+    # once each, so a product listed in several sections is the same object
+    products: Dict[int, Dict[str, Any]] = {}
+
+    def materialize(indexes: List[int]) -> List[Dict[str, Any]]:
+        for index in indexes:
+            if index not in products:
+                products[index] = _product_info(catalog.rules[index], scores[index])
+        return [products[index] for index in indexes]
+
+    recommendations = materialize(_ranked(top_overall))
+
+    result = {
+        'recommendations': recommendations,
+        'best_match': recommendations[0] if recommendations else None,
+        'budget_options': materialize(_ranked(top_budget)),
+        'alternatives': materialize(_ranked(top_alternatives))
     }
+    if trace:
+        result['trace'] = eligibility_trace.to_dict()
+    return result
 
 
 def render_response(profile: Dict[str, Any], result: Dict[str, Any]) -> str:
@@ -576,12 +727,37 @@ def render_response(profile: Dict[str, Any], result: Dict[str, Any]) -> str:
     Returns:
         Formatted string response
     """
+    return render_greeting(profile, result) + render_response_body(result)
+
+
+def render_greeting(profile: Dict[str, Any], result: Dict[str, Any]) -> str:
+    """
+    Personalized opening line of the response (empty when nothing matched).
+
+    Kept apart from render_response_body() so a cached body can be shared by
+    profiles that differ only in name.
+    """
+    if not result.get('recommendations'):
+        return ""
+    return f"Based on {profile.get('first_name', 'the client')}'s profile:\n\n"
+
+
+def render_response_body(result: Dict[str, Any]) -> str:
+    """
+    Format the profile-independent part of the response.
+
+    Args:
+        result: Dict from assign() with recommendations, best_match, budget_options, alternatives
+
+    Returns:
+        Formatted string response, without the greeting line
+    """
     recommendations = result.get('recommendations', [])
 
     if not recommendations:
         return "Based on the provided information, we were unable to identify an eligible carrier product at this time. Please review the client's profile or contact underwriting for manual review."
 
-    response = f"Based on {profile.get('first_name', 'the client')}'s profile:\n\n"
+    response = ""
 
     # Best Match section
     best_match = result.get('best_match')
@@ -0,0 +1,256 @@
+"""
+Typo-tolerant autocomplete over medication and condition names.
+
+Agents type drug names ("metforman", "lisinipril", "Eliquis") into the health
+questionnaire and need suggestions on every keystroke. AutocompleteIndex is
+built once from the medication reference guide and the carrier YAML
+``accepted`` lists and answers two ways:
+
+- Prefix: every word start of every term is a key in one sorted array, so the
+  matches for a prefix are a contiguous range found with bisect (a flattened
+  trie). The best few terms for every prefix of up to PRECOMPUTED_PREFIX_LENGTH
+  characters are precomputed, since those ranges are the largest.
+- Fuzzy: when prefix matches don't fill the limit, terms are ranked by how many
+  of the query's word-start-padded trigrams they share, read from an inverted
+  trigram index. Trigrams shared by more than MAX_TRIGRAM_POSTINGS terms carry
+  little signal and are not indexed, which bounds the work per query.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .medication_reference import MedicationReference, default_medication_reference
+
+if TYPE_CHECKING:
+    from .ruleset import RuleSet
+
+# Prefixes this short get their suggestions precomputed at build time
+PRECOMPUTED_PREFIX_LENGTH = 3
+
+# Suggestions kept per precomputed prefix (the largest supported limit)
+MAX_SUGGESTIONS = 25
+
+# Trigrams more common than this are ignored by fuzzy matching
+MAX_TRIGRAM_POSTINGS = 1000
+
+# Queries shorter than this only get prefix matches
+MIN_FUZZY_LENGTH = 4
+
+# Fraction of the query's trigrams a fuzzy match must share
+MIN_TRIGRAM_OVERLAP = 0.5
+
+# Term kinds, best first: ties in prefix ranking favor medications
+KIND_WEIGHTS = {'medication': 3.0, 'condition': 2.0, 'accepted': 1.0}
+
+
+def normalize_term(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in text.lower()).split())
+
+
+def trigrams(key: str) -> List[str]:
+    """Trigrams of each word, padded at the word start so prefixes carry weight."""
+    grams = []
+    for word in key.split():
+        padded = '  ' + word
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """One autocomplete suggestion."""
+
+    term: str  # Display text
+    kind: str  # "medication", "condition" or "accepted"
+    match: str  # "prefix" or "fuzzy"
+    score: float  # 1.0 for prefix matches, trigram overlap for fuzzy ones
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serializable suggestion for API responses."""
+        return {
+            'term': self.term,
+            'kind': self.kind,
+            'match': self.match,
+            'score': round(self.score, 3),
+        }
+
+
+class AutocompleteIndex:
+    """Prefix array plus trigram index over a fixed vocabulary."""
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        """Build the index.
+
+        Args:
+            terms: (display text, kind) pairs; kind is a KIND_WEIGHTS key.
+                Duplicates (after normalization) keep their best kind.
+        """
+        best: Dict[str, Tuple[str, str]] = {}
+        for text, kind in terms:
+            text = ' '.join(text.split())
+            key = normalize_term(text)
+            if not key:
+                continue
+            current = best.get(key)
+            if current is None or KIND_WEIGHTS.get(kind, 0.0) > KIND_WEIGHTS.get(current[1], 0.0):
+                best[key] = (text, kind)
+
+        # Term ids are assigned in ranking order: best kind, then shortest, then alphabetical
+        ordered = sorted(
+            best.items(),
+            key=lambda item: (-KIND_WEIGHTS.get(item[1][1], 0.0), len(item[0]), item[0]),
+        )
+        self._terms: List[Tuple[str, str]] = [value for _, value in ordered]
+
+        # Flattened trie: (word-start suffix, term id) sorted by suffix
+        suffixes = []
+        postings: Dict[str, List[int]] = {}
+        for term_id, (key, _) in enumerate(ordered):
+            words = key.split(' ')
+            for i in range(len(words)):
+                suffixes.append((' '.join(words[i:]), term_id))
+            for gram in set(trigrams(key)):
+                postings.setdefault(gram, []).append(term_id)
+        suffixes.sort()
+        self._keys: List[str] = [suffix for suffix, _ in suffixes]
+        self._ids = np.array([term_id for _, term_id in suffixes], dtype=np.int32)
+        self._postings: Dict[str, np.ndarray] = {
+            gram: np.array(ids, dtype=np.int32)
+            for gram, ids in postings.items()
+            if len(ids) <= MAX_TRIGRAM_POSTINGS
+        }
+        self._common_grams = frozenset(
+            gram for gram, ids in postings.items() if len(ids) > MAX_TRIGRAM_POSTINGS
+        )
+
+        # Best term ids for every short prefix: ids are ranks, so visiting terms in
+        # id order keeps the first MAX_SUGGESTIONS distinct ids seen per prefix
+        top: Dict[str, List[int]] = {}
+        for term_id, (key, _) in enumerate(ordered):
+            for word_start in (0, *(i + 1 for i, c in enumerate(key) if c == ' ')):
+                last = min(len(key), word_start + PRECOMPUTED_PREFIX_LENGTH)
+                for end in range(word_start + 1, last + 1):
+                    ids = top.setdefault(key[word_start:end], [])
+                    if len(ids) < MAX_SUGGESTIONS and (not ids or ids[-1] != term_id):
+                        ids.append(term_id)
+        self._top: Dict[str, Tuple[int, ...]] = {prefix: tuple(ids) for prefix, ids in top.items()}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _prefix_ids(self, key: str, limit: int) -> List[int]:
+        """Best term ids having a word that starts with key."""
+        if len(key) <= PRECOMPUTED_PREFIX_LENGTH:
+            return list(self._top.get(key, ())[:limit])
+
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + '\uffff', lo)
+        ids = self._ids[lo:hi]
+        if len(ids) > 2 * limit:
+            # Smallest ids (best ranks) without sorting the range; a term shows
+            # up once per matching word, so keep some slack for duplicates
+            ids = np.partition(ids, 2 * limit)[:2 * limit + 1]
+            if len(np.unique(ids)) < limit:
+                ids = self._ids[lo:hi]
+        return [int(term_id) for term_id in np.unique(ids)[:limit]]
+
+    def _fuzzy_ids(self, key: str, limit: int, exclude: Iterable[int]) -> List[Tuple[float, int]]:
+        """(overlap, term id) for the terms sharing the most trigrams with key.
+
+        Overlap is measured over the query's informative trigrams: those too
+        common to be indexed count neither for nor against a term.
+        """
+        grams = set(trigrams(key)) - self._common_grams
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+
+        counts = np.bincount(np.concatenate(postings), minlength=len(self._terms))
+        counts[list(exclude)] = 0
+
+        needed = max(2, math.ceil(MIN_TRIGRAM_OVERLAP * len(grams)))
+        candidates = np.flatnonzero(counts >= needed)
+        if len(candidates) > limit:
+            # Ids are ranks, so sorting by (-count, id) keeps ties in ranking order
+            candidates = candidates[np.lexsort((candidates, -counts[candidates]))[:limit]]
+        else:
+            candidates = candidates[np.argsort(-counts[candidates], kind='stable')]
+        return [(float(counts[term_id]) / len(grams), int(term_id)) for term_id in candidates]
+
+    def suggest(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Suggestion]:
+        """Ranked suggestions for a partial, possibly misspelled, query.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum suggestions (at most MAX_SUGGESTIONS)
+            kind: Only return terms of this kind
+
+        Returns:
+            Prefix matches first, then fuzzy matches, best first
+        """
+        key = normalize_term(query)
+        limit = max(0, min(limit, MAX_SUGGESTIONS))
+        if not key or not limit:
+            return []
+
+        # Filtering by kind can discard candidates, so over-fetch a little
+        fetch = limit if kind is None else MAX_SUGGESTIONS
+        suggestions = []
+        seen = set()
+        for term_id in self._prefix_ids(key, fetch):
+            text, term_kind = self._terms[term_id]
+            if kind is None or term_kind == kind:
+                suggestions.append(Suggestion(text, term_kind, 'prefix', 1.0))
+            seen.add(term_id)
+
+        if len(suggestions) < limit and len(key) >= MIN_FUZZY_LENGTH:
+            for overlap, term_id in self._fuzzy_ids(key, fetch, seen):
+                text, term_kind = self._terms[term_id]
+                if kind is None or term_kind == kind:
+                    suggestions.append(Suggestion(text, term_kind, 'fuzzy', overlap))
+
+        return suggestions[:limit]
+
+
+def vocabulary(
+    reference: MedicationReference, rule_set: Optional["RuleSet"] = None
+) -> Iterable[Tuple[str, str]]:
+    """(text, kind) terms from the medication reference and carrier accepted lists."""
+    for condition in reference.conditions.values():
+        yield condition.name, 'condition'
+        for term in condition.medical_terms:
+            yield term, 'condition'
+        for medication in condition.medications:
+            for name, _ in medication.names():
+                yield name, 'medication'
+    for name in reference.lookup_index_names:
+        yield name, 'medication'
+
+    for rule in rule_set or ():
+        for accepted in rule.accepted or ():
+            if isinstance(accepted, str):
+                yield accepted, 'accepted'
+
+
+_index_lock = threading.Lock()
+_index: Optional[Tuple[str, AutocompleteIndex]] = None
+
+
+def autocomplete_index(rule_set: "RuleSet") -> AutocompleteIndex:
+    """Shared index for a rule set version (rebuilt when the rule set changes)."""
+    global _index
+    cached = _index
+    if cached is not None and cached[0] == rule_set.version:
+        return cached[1]
+
+    with _index_lock:
+        if _index is None or _index[0] != rule_set.version:
+            terms = vocabulary(default_medication_reference(), rule_set)
+            _index = (rule_set.version, AutocompleteIndex(terms))
+        return _index[1]
@@ -0,0 +1,111 @@
+"""
+Streaming parsers for batch re-screening uploads.
+
+Uploads (JSONL or CSV) are spooled to a temporary file and turned into client
+profiles one record at a time, so memory stays flat no matter how large the
+book of business is.
+"""
+
+import csv
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# CSV columns that must stay strings even when they look numeric/boolean
+CSV_STRING_FIELDS = {
+    'state', 'coverage_type', 'first_name', 'last_name', 'gender',
+    'tobacco_status', 'prior_decline_carrier',
+}
+
+# CSV columns holding ';'-separated lists
+CSV_LIST_FIELDS = {'medications', 'rider_preferences'}
+
+# CSV columns named "medical_conditions.<name>" become medical_conditions[<name>]
+CSV_NESTED_PREFIX = 'medical_conditions.'
+
+_TRUE_VALUES = {'true', 'yes', 'y'}
+_FALSE_VALUES = {'false', 'no', 'n'}
+
+
+def coerce_csv_value(field: str, value: str) -> Any:
+    """Convert a CSV cell into the type /recommend expects for that field."""
+    if field in CSV_STRING_FIELDS:
+        return value
+    if field in CSV_LIST_FIELDS:
+        return [item.strip() for item in value.split(';') if item.strip()]
+
+    lowered = value.lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def csv_row_to_profile(header: List[str], row: List[str]) -> Dict[str, Any]:
+    """Build a client profile dict from a CSV header and row; empty cells are omitted."""
+    if len(row) > len(header):
+        raise ValueError(f"Row has {len(row)} fields but header has {len(header)}")
+
+    profile: Dict[str, Any] = {}
+    for field, raw in zip(header, row):
+        value = raw.strip()
+        if not field or not value:
+            continue
+        if field.startswith(CSV_NESTED_PREFIX):
+            condition = field[len(CSV_NESTED_PREFIX):]
+            profile.setdefault('medical_conditions', {})[condition] = coerce_csv_value(
+                condition, value
+            )
+        else:
+            profile[field] = coerce_csv_value(field, value)
+    return profile
+
+
+def parse_jsonl_profile(line: str) -> Dict[str, Any]:
+    """Parse one JSONL line into a client profile dict."""
+    profile = json.loads(line)
+    if not isinstance(profile, dict):
+        raise ValueError("Each JSONL line must be a JSON object")
+    return profile
+
+
+def iter_profiles(
+    upload: BinaryIO, input_format: str
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (line number, profile, error) for every record in a JSONL or CSV upload.
+
+    The upload is read lazily, one record at a time. A record that can't be parsed
+    yields ``profile=None`` with an error message, so a single bad row doesn't
+    abort the batch.
+    """
+    text = (line.decode("utf-8-sig", errors="replace") for line in upload)
+
+    if input_format == 'csv':
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [column.strip() for column in header]
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                yield reader.line_num, csv_row_to_profile(header, row), None
+            except ValueError as e:
+                yield reader.line_num, None, str(e)
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, parse_jsonl_profile(line), None
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
@@ -0,0 +1,34 @@
+"""
+Product bitsets for the compiled catalog.
+
+A bitset is a plain Python int where bit i stands for the i-th product of a
+CompiledCatalog. Sparse indexes (knockouts, states, ...) store one bitset per
+key, so combining them is an integer OR/AND regardless of catalog size, and
+the result is expanded into a NumPy mask only when it is non-empty.
+"""
+
+from typing import Iterator
+
+import numpy as np
+
+
+def mask_to_bits(mask: np.ndarray) -> int:
+    """Pack a boolean product mask into a bitset."""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    return int.from_bytes(packed.tobytes(), 'little')
+
+
+def bits_to_mask(bits: int, size: int) -> np.ndarray:
+    """Expand a bitset into a boolean mask over ``size`` products."""
+    if not bits:
+        return np.zeros(size, dtype=bool)
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, count=size, bitorder='little').astype(bool)
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the product indexes set in a bitset, in ascending order."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
@@ -0,0 +1,101 @@
+"""
+Compiled build charts (height/weight limits) for product rules.
+
+A product's ``eligibility.build`` block caps BMI, optionally per gender
+(``max_bmi: {M: 40, F: 38, standard: 42}`` or a single number), and may give a
+weight range per height keyed ``"ft_in"`` (``weight_by_height: {"5_10": [120,
+260]}``). compile_build_chart() resolves both once at load: caps into a
+gender -> cap map and heights into total inches, so checking a client never
+formats a height key. CompiledCatalog stacks the charts of every product into
+dense tables indexed by total inches.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+INF = float('inf')
+
+# Stands in for a gender no max_bmi table names, so only 'standard'/scalar caps apply
+_UNLISTED_GENDER = object()
+
+# weight_by_height keys: "5_10" (also "5'10")
+_HEIGHT_KEY = re.compile(r"^\s*(?P<ft>\d+)\s*['_]\s*(?P<inches>\d+)\s*\"?\s*$")
+
+
+def parse_height_key(key: Any) -> Optional[int]:
+    """Total inches for a ``"ft_in"`` weight_by_height key, or None if it isn't one."""
+    if not isinstance(key, str):
+        return None
+    match = _HEIGHT_KEY.match(key)
+    if match is None:
+        return None
+    return int(match.group('ft')) * 12 + int(match.group('inches'))
+
+
+def total_height_inches(height_ft: Any, height_in: Any) -> Optional[int]:
+    """Total inches for integer feet/inches (None for missing or fractional heights)."""
+    if type(height_ft) is not int or type(height_in) is not int:
+        return None
+    return height_ft * 12 + height_in
+
+
+def bmi_cap(max_bmi: Any, gender: Any) -> float:
+    """Return the BMI cap a build rule applies to a gender (inf when uncapped)."""
+    if isinstance(max_bmi, dict):
+        if gender in max_bmi:
+            return max_bmi[gender]
+        if 'standard' in max_bmi:
+            return max_bmi['standard']
+        return INF
+    if isinstance(max_bmi, (int, float)):
+        return max_bmi
+    return INF
+
+
+@dataclass(frozen=True)
+class BuildChart:
+    """One product's build limits, resolved for lookup by gender and total inches."""
+
+    cap_default: float = INF  # Cap for genders max_bmi doesn't name
+    cap_by_gender: Mapping[Any, float] = field(default_factory=dict)
+    weight_by_inches: Mapping[int, Tuple[float, float]] = field(default_factory=dict)
+
+    def bmi_cap(self, gender: Any) -> float:
+        """BMI cap for a gender (inf when uncapped)."""
+        return self.cap_by_gender.get(gender, self.cap_default)
+
+    def rejects(
+        self, gender: Any, bmi: Optional[float], height_inches: Optional[int], weight: Any
+    ) -> bool:
+        """Whether the chart rejects a build (always False when BMI is unknown)."""
+        if bmi is None:
+            return False
+        if bmi > self.bmi_cap(gender):
+            return True
+        weight_range = self.weight_by_inches.get(height_inches)
+        return weight_range is not None and not (weight_range[0] <= weight <= weight_range[1])
+
+
+def compile_build_chart(build: Mapping[str, Any]) -> BuildChart:
+    """Compile an ``eligibility.build`` block.
+
+    Weight ranges that aren't ``[min, max]`` pairs, and height keys that aren't
+    ``"ft_in"`` strings, are ignored.
+    """
+    max_bmi = build.get('max_bmi')
+    cap_by_gender: Dict[Any, float] = {}
+    if isinstance(max_bmi, dict):
+        cap_by_gender = {gender: cap for gender, cap in max_bmi.items() if gender != 'standard'}
+
+    weight_by_inches: Dict[int, Tuple[float, float]] = {}
+    for key, weight_range in (build.get('weight_by_height') or {}).items():
+        inches = parse_height_key(key)
+        if inches is not None and isinstance(weight_range, list) and len(weight_range) == 2:
+            weight_by_inches[inches] = (weight_range[0], weight_range[1])
+
+    return BuildChart(
+        cap_default=bmi_cap(max_bmi, _UNLISTED_GENDER),
+        cap_by_gender=cap_by_gender,
+        weight_by_inches=weight_by_inches,
+    )
@@ -0,0 +1,149 @@
+"""
+Decision-tree index over the profile attributes that gate eligibility.
+
+Most of a profile's eligibility is decided by a few coarse attributes: the
+state, which issue-age band the age falls in, which face-amount band the
+requested coverage falls in, the requested term length and whether the client
+was previously declined (which rules out single-tier full medical products).
+CandidateIndex walks those levels in that order and memoizes, at each leaf,
+the indices of the products that survive them. Repeat profiles with the same
+coarse attributes skip straight to that (usually short) candidate list, and
+CompiledCatalog.eligible_indices() runs the knockout and health checks on those
+candidates only, so a warm request costs the tree depth plus the candidate
+count rather than the catalog size. Building a leaf on a miss still scans the
+catalog once.
+
+Bands are exact, not approximate: two ages share a band when every product
+treats them identically (same issue-age, face-limit and term-length columns),
+and two face amounts share a band when they sit on the same side of every
+product's face limits. Coverage type and tobacco status only change scores,
+never eligibility, so they are not levels.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .profile import ProfileContext
+
+if TYPE_CHECKING:
+    from .catalog import CompiledCatalog
+
+# Memoized leaves kept (least recently used evicted; bounds memory on odd inputs)
+MAX_LEAVES = 16384
+
+# Tree levels, root first, as reported by CandidateIndex.survival()
+LEVELS = ('state', 'age_band', 'face_band', 'term', 'underwriting')
+
+LeafKey = Tuple[Optional[str], int, Optional[int], Hashable, bool]
+
+
+class CandidateIndex:
+    """Memoized state -> age band -> face band -> term -> underwriting tree."""
+
+    def __init__(self, catalog: "CompiledCatalog"):
+        """Derive the age and face bands from a compiled catalog.
+
+        Args:
+            catalog: Catalog whose dense age tables define the bands
+        """
+        self.catalog = catalog
+
+        # Ages whose issue-age, face-limit and term columns match share a band
+        rows = [catalog.age_ok, catalog.face_min, catalog.face_max]
+        rows.extend(catalog.term_ok[term] for term in sorted(catalog.term_ok, key=repr))
+        band_of: Dict[bytes, int] = {}
+        self.age_band: List[int] = []
+        for age in range(len(catalog.age_ok)):
+            signature = b''.join(np.ascontiguousarray(table[age]).tobytes() for table in rows)
+            self.age_band.append(band_of.setdefault(signature, len(band_of)))
+        self.age_band_count = len(band_of)
+
+        # Every finite face limit is a breakpoint: amounts strictly between two
+        # breakpoints (or equal to one) compare the same way to every limit
+        limits = np.concatenate([catalog.face_min.ravel(), catalog.face_max.ravel()])
+        self.face_breakpoints: List[float] = np.unique(limits[np.isfinite(limits)]).tolist()
+
+        self._leaves: "OrderedDict[LeafKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Leaves are a warm-up cache: don't persist them into rule set snapshots
+        state = self.__dict__.copy()
+        state['_leaves'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def face_band(self, face: Any) -> Optional[int]:
+        """Band id for a face amount: 2i+1 at breakpoint i, 2i just below it (None if falsy)."""
+        if not face:
+            return None
+        i = bisect_left(self.face_breakpoints, face)
+        if i < len(self.face_breakpoints) and self.face_breakpoints[i] == face:
+            return 2 * i + 1
+        return 2 * i
+
+    def leaf_key(self, context: ProfileContext) -> LeafKey:
+        """Path through the tree for a profile with an integer in-table age."""
+        return (
+            context.state,
+            self.age_band[context.age],
+            self.face_band(context.desired_coverage),
+            context.term_length or None,
+            bool(context.prior_decline),
+        )
+
+    def _level_masks(self, context: ProfileContext) -> List[np.ndarray]:
+        """Surviving products after each level, in LEVELS order."""
+        catalog = self.catalog
+        age = context.age
+        masks = [catalog.state_mask(context.state)]
+        masks.append(masks[-1] & catalog.age_ok[age])
+        face = context.desired_coverage
+        if face:
+            in_band = (catalog.face_min[age] <= face) & (face <= catalog.face_max[age])
+            masks.append(masks[-1] & in_band)
+        else:
+            masks.append(np.zeros(catalog.size, dtype=bool))
+        term_length = context.term_length
+        masks.append(masks[-1] & catalog.term_mask(term_length, age) if term_length else masks[-1])
+        masks.append(
+            masks[-1] & ~catalog.full_medical_single_tier if context.prior_decline else masks[-1]
+        )
+        return masks
+
+    def candidates(self, context: ProfileContext) -> np.ndarray:
+        """Indices of the products passing every tree level, ascending.
+
+        The array is shared by every profile on the same leaf and is read-only.
+        The profile's age must be an integer in the catalog's age table.
+        """
+        key = self.leaf_key(context)
+        with self._lock:
+            leaf = self._leaves.get(key)
+            if leaf is not None:
+                self._leaves.move_to_end(key)
+                return leaf
+
+        leaf = np.flatnonzero(self._level_masks(context)[-1])
+        leaf.setflags(write=False)
+        with self._lock:
+            leaf = self._leaves.setdefault(key, leaf)
+            while len(self._leaves) > MAX_LEAVES:
+                self._leaves.popitem(last=False)
+        return leaf
+
+    def survival(self, context: ProfileContext) -> List[Tuple[str, int]]:
+        """(level, products surviving it) for a profile, root first."""
+        return [(level, int(mask.sum())) for level, mask in zip(LEVELS, self._level_masks(context))]
+
+    def __len__(self) -> int:
+        """Number of memoized leaves."""
+        return len(self._leaves)
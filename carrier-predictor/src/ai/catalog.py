@@ -0,0 +1,660 @@
+"""
+Columnar, NumPy-compiled form of the product rule catalog.
+
+CompiledCatalog turns a sequence of CarrierRule objects into arrays (age, face and
+term-length eligibility by issue age, state availability, BMI caps, DUI/violation limits,
+boolean restriction flags) plus reverse indexes for knockouts (as product bitsets) and
+medications. Eligibility for a profile starts from the CandidateIndex leaf for its
+state, age, face amount, term and prior decline, then gathers the knockout and health
+columns of those candidates only. It gives exactly the same answer as the per-rule
+CarrierRule predicates.
+"""
+
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .bitset import bits_to_mask
+from .candidate_index import CandidateIndex
+from .profile import ProfileContext
+
+ProfileInput = Union[Mapping[str, Any], ProfileContext]
+
+# Integer issue ages 0..120 get dense lookup rows; anything else uses compiled rule predicates
+AGE_TABLE_SIZE = 121
+
+# Knockout groups consulted by CarrierRule.passes_knockouts
+KNOCKOUT_GROUPS = ('any', 'premier_plus', 'standard_graded')
+
+INF = float('inf')
+
+# Profile fields read by eligibility and scoring for every product. Knockout and
+# required-medication condition names come from the rules themselves (see
+# CompiledCatalog.profile_fields); anything else (names, contact details) can't
+# change the result.
+PROFILE_FIELDS = frozenset({
+    'state', 'age', 'desired_coverage', 'term_length', 'coverage_type', 'rider_preferences',
+    'gender', 'height_ft', 'height_in', 'weight', 'medical_conditions', 'medications',
+    'smoker', 'tobacco_status', 'tobacco_use', 'nicotine_use',
+    'dui_count_recent', 'major_violations', 'felony_within_lookback',
+    'hazardous_avocation', 'aviation_activity', 'prior_decline', 'prior_decline_carrier',
+})
+
+
+class CompiledCatalog:
+    """Vectorized eligibility engine over a fixed sequence of rules."""
+
+    def __init__(self, rules: Sequence[Any]):
+        """Compile rules into columnar arrays.
+
+        Args:
+            rules: CarrierRule objects, in the order results should be reported
+        """
+        self.rules = tuple(rules)
+        n = len(self.rules)
+        self.size = n
+
+        # Prior decline handling; carrier_ids index carrier_names (lowercased, distinct)
+        self.carrier_lower = [rule.carrier.lower() for rule in self.rules]
+        carrier_of: Dict[str, int] = {}
+        self.carrier_ids = np.array(
+            [carrier_of.setdefault(carrier, len(carrier_of)) for carrier in self.carrier_lower],
+            dtype=np.intp,
+        )
+        self.carrier_names = list(carrier_of)
+        self.full_medical_single_tier = np.array(
+            [
+                'Full Medical' in rule.underwriting_type and not rule.tier_structure
+                for rule in self.rules
+            ],
+            dtype=bool,
+        )
+
+        # Response sections assign() fills besides the overall top picks
+        self.low_premium_tier = [rule.typical_premium_tier == 'low' for rule in self.rules]
+        self.simplified_or_guaranteed = [
+            'Simplified' in rule.underwriting_type or 'Guaranteed Issue' in rule.underwriting_type
+            for rule in self.rules
+        ]
+
+        # Issue age and face amount, one row per integer age; (inf, -inf) allows no face
+        self.age_ok = np.zeros((AGE_TABLE_SIZE, n), dtype=bool)
+        self.face_min = np.full((AGE_TABLE_SIZE, n), INF, dtype=np.float64)
+        self.face_max = np.full((AGE_TABLE_SIZE, n), -INF, dtype=np.float64)
+        for i, rule in enumerate(self.rules):
+            for age in range(AGE_TABLE_SIZE):
+                self.age_ok[age, i] = rule.supports_age(age)
+                limits = rule.face_limits(age)
+                if limits is not None:
+                    self.face_min[age, i], self.face_max[age, i] = limits
+
+        # Term lengths by issue age; products without by_duration rules accept any term
+        self.any_term = np.array([not rule.has_term_durations for rule in self.rules], dtype=bool)
+        self.term_ok: Dict[Any, np.ndarray] = {}
+        for i, rule in enumerate(self.rules):
+            for age in range(AGE_TABLE_SIZE):
+                for term_length in rule.eligible_terms(age):
+                    if term_length not in self.term_ok:
+                        self.term_ok[term_length] = np.tile(self.any_term, (AGE_TABLE_SIZE, 1))
+                    self.term_ok[term_length][age, i] = True
+
+        self._compile_states()
+        self._compile_knockouts()
+        self._compile_health()
+
+        self.profile_fields: FrozenSet[str] = (
+            PROFILE_FIELDS
+            | frozenset(self.knockouts)
+            | frozenset(condition for condition, _, _ in self.required_medications)
+        )
+
+        # State/age/face/term/underwriting decision tree over the tables above
+        self.candidate_index = CandidateIndex(self)
+
+        # Face amount and age centrality terms of CarrierRule.score(), for what-if grids
+        def score_column(attribute: str, position: Optional[int] = None) -> np.ndarray:
+            values = [getattr(rule, attribute) for rule in self.rules]
+            if position is not None:
+                values = [value[position] for value in values]
+            return np.array(values, dtype=np.float64)
+
+        self.score_face_min = score_column('_score_face_range', 0)
+        self.score_face_max = score_column('_score_face_range', 1)
+        self.score_face_midpoint = score_column('_score_face_midpoint')
+        self.score_face_max_distance = score_column('_score_face_max_distance')
+        self.score_premium_tier = score_column('_score_premium_tier')
+        self.score_quality = score_column('_score_quality')
+        self.score_age_min = score_column('_score_age_range', 0)
+        self.score_age_max = score_column('_score_age_range', 1)
+        self.score_age_midpoint = score_column('_score_age_midpoint')
+        self.score_age_max_distance = score_column('_score_age_max_distance')
+
+    def _compile_states(self) -> None:
+        """Precompute the eligible-product mask for every state a rule names.
+
+        Products without an allowlist are sold everywhere outside their 'except'
+        list, so any state no rule mentions gets ``state_default_mask``.
+        """
+        unrestricted = 0
+        allowed: Dict[str, int] = {}
+        excluded: Dict[str, int] = {}
+        for i, rule in enumerate(self.rules):
+            if rule.allowed_states is None:
+                unrestricted |= 1 << i
+            else:
+                for state in rule.allowed_states:
+                    allowed[state] = allowed.get(state, 0) | (1 << i)
+            for state in rule.excluded_states:
+                excluded[state] = excluded.get(state, 0) | (1 << i)
+
+        self.state_default_mask = bits_to_mask(unrestricted, self.size)
+        self.state_masks: Dict[str, np.ndarray] = {
+            state: bits_to_mask(
+                (unrestricted | allowed.get(state, 0)) & ~excluded.get(state, 0), self.size
+            )
+            for state in set(allowed) | set(excluded)
+        }
+
+    def state_mask(self, state: Optional[str]) -> np.ndarray:
+        """Products sold in a normalized state abbreviation (all products when None)."""
+        if state is None:
+            return np.ones(self.size, dtype=bool)
+        return self.state_masks.get(state, self.state_default_mask).copy()
+
+    def _compile_knockouts(self) -> None:
+        """Reverse-index knockout conditions to bitsets of the products they disqualify.
+
+        ``knockouts[condition]`` lists (required_value, bitset) pairs: a profile whose
+        answer for condition equals required_value is knocked out of every product
+        in the bitset. Conditions whose required value is None also match a missing
+        answer, so they are checked separately on every request.
+        """
+        knockouts: Dict[str, List[List[Any]]] = {}
+        for i, rule in enumerate(self.rules):
+            if not rule.knockouts:
+                continue
+            for key, value in rule.knockouts.items():
+                if key not in KNOCKOUT_GROUPS or not isinstance(value, list):
+                    continue
+                for knockout in value:
+                    if not isinstance(knockout, dict):
+                        continue
+                    for condition, required_value in knockout.items():
+                        entries = knockouts.setdefault(condition, [])
+                        for entry in entries:
+                            if entry[0] == required_value:
+                                entry[1] |= 1 << i
+                                break
+                        else:
+                            entries.append([required_value, 1 << i])
+
+        self.knockouts: Dict[str, List[Tuple[Any, int]]] = {
+            condition: [(required_value, bits) for required_value, bits in entries]
+            for condition, entries in knockouts.items()
+        }
+        self.knockouts_on_missing: List[Tuple[str, int]] = [
+            (condition, bits)
+            for condition, entries in knockouts.items()
+            for required_value, bits in entries
+            if required_value is None
+        ]
+
+        # The same indexes as dense masks, so candidates' columns can be gathered
+        self.knockout_masks: Dict[str, List[Tuple[Any, np.ndarray]]] = {
+            condition: [
+                (required_value, bits_to_mask(bits, self.size)) for required_value, bits in entries
+            ]
+            for condition, entries in self.knockouts.items()
+        }
+        self.knockout_masks_on_missing: List[Tuple[str, np.ndarray]] = [
+            (condition, bits_to_mask(bits, self.size))
+            for condition, bits in self.knockouts_on_missing
+        ]
+
+    def _compile_health(self) -> None:
+        """Compile build, medication, driving and lifestyle restrictions."""
+        n = self.size
+        eligibilities = [rule.eligibility or {} for rule in self.rules]
+
+        # Build chart: a BMI cap table with one row per gender any rule names (the
+        # last row serves every other gender), and weight ranges in dense rows
+        # indexed by total inches from build_height_base
+        charts = [rule.build_chart for rule in self.rules]
+        self.has_build = np.array([chart is not None for chart in charts], dtype=bool)
+
+        genders: Dict[Any, int] = {}
+        for chart in charts:
+            if chart is not None:
+                for gender in chart.cap_by_gender:
+                    genders.setdefault(gender, len(genders))
+        self.bmi_cap_rows = genders
+        self.bmi_caps = np.array(
+            [[chart.bmi_cap(gender) if chart else INF for chart in charts] for gender in genders]
+            + [[chart.cap_default if chart else INF for chart in charts]],
+            dtype=np.float64,
+        )
+
+        heights = {inches for chart in charts if chart for inches in chart.weight_by_inches}
+        self.build_height_base = min(heights) if heights else 0
+        rows = max(heights) - self.build_height_base + 1 if heights else 0
+        self.build_weight_low = np.full((rows, n), -INF, dtype=np.float64)
+        self.build_weight_high = np.full((rows, n), INF, dtype=np.float64)
+        for i, chart in enumerate(charts):
+            for inches, (low, high) in (chart.weight_by_inches.items() if chart else ()):
+                row = inches - self.build_height_base
+                self.build_weight_low[row, i] = low
+                self.build_weight_high[row, i] = high
+
+        # Medications (canonical names): rejected name -> product bitset, and
+        # per-condition required sets
+        self.rejected_medications: Dict[str, int] = {}
+        self.required_medications: List[Tuple[str, FrozenSet[str], int]] = []
+        for i, (rule, eligibility) in enumerate(zip(self.rules, eligibilities)):
+            if 'medications' not in eligibility:
+                continue
+            for med in rule.rejected_medications:
+                self.rejected_medications[med] = self.rejected_medications.get(med, 0) | (1 << i)
+            for condition, required_meds in rule.required_medications:
+                self.required_medications.append((condition, required_meds, i))
+        self.rejected_medication_masks: Dict[str, np.ndarray] = {
+            med: bits_to_mask(bits, n) for med, bits in self.rejected_medications.items()
+        }
+
+        # Driving record limits (inf = no limit)
+        self.max_dui = np.full(n, INF, dtype=np.float64)
+        self.max_major_violations = np.full(n, INF, dtype=np.float64)
+        for i, eligibility in enumerate(eligibilities):
+            if 'driving' not in eligibility:
+                continue
+            driving_rules = eligibility['driving']
+            if 'dui_years_lookback' in driving_rules:
+                self.max_dui[i] = driving_rules.get('max_dui_total', 0)
+            if 'max_major_violations' in driving_rules:
+                self.max_major_violations[i] = driving_rules['max_major_violations']
+
+        # Lifestyle restrictions (True = the profile flag disqualifies)
+        self.bans_felony = np.array(
+            ['felony_lookback_years' in e for e in eligibilities], dtype=bool
+        )
+        self.bans_hazardous_avocation = np.array(
+            [not e.get('avocation_hazardous', True) for e in eligibilities], dtype=bool
+        )
+        self.bans_aviation = np.array(
+            [not e.get('aviation', True) for e in eligibilities], dtype=bool
+        )
+        self.bans_nicotine_non_tobacco = np.array(
+            [not e.get('nicotine_non_tobacco_allowed', True) for e in eligibilities], dtype=bool
+        )
+
+    def age_face_mask(self, age: Any, face: Any) -> np.ndarray:
+        """Products whose issue ages and face amount limits accept age and face."""
+        if isinstance(age, int) and 0 <= age < AGE_TABLE_SIZE:
+            if not face:
+                return np.zeros(self.size, dtype=bool)
+            return self.age_ok[age] & (self.face_min[age] <= face) & (face <= self.face_max[age])
+
+        # Fractional or out-of-table ages: defer to the rule predicates
+        return np.array(
+            [rule.supports_age(age) and rule.supports_face(face, age) for rule in self.rules],
+            dtype=bool,
+        )
+
+    def term_mask(self, term_length: Any, age: Any) -> np.ndarray:
+        """Products that can issue the requested term length at this age."""
+        if isinstance(age, int) and 0 <= age < AGE_TABLE_SIZE:
+            table = self.term_ok.get(term_length)
+            return self.any_term.copy() if table is None else table[age]
+
+        return np.array([rule.supports_term(term_length, age) for rule in self.rules], dtype=bool)
+
+    def knockout_bits(self, profile: ProfileInput) -> int:
+        """Bitset of products disqualified by the profile's knockout answers.
+
+        Walks the profile's own answers, so the cost depends on how many fields the
+        client supplied rather than on catalog size times knockouts per product.
+        """
+        if isinstance(profile, ProfileContext):
+            profile = profile.profile
+
+        knocked_out = 0
+        for condition, answer in profile.items():
+            entries = self.knockouts.get(condition)
+            if entries is None:
+                continue
+            for required_value, bits in entries:
+                if answer == required_value:
+                    knocked_out |= bits
+
+        for condition, bits in self.knockouts_on_missing:
+            if condition not in profile:
+                knocked_out |= bits
+        return knocked_out
+
+    def knockout_fail_mask(self, profile: ProfileInput, products: np.ndarray) -> np.ndarray:
+        """Which of ``products`` the profile's knockout answers disqualify.
+
+        Matches answers exactly as knockout_bits() does, but gathers only the given
+        products' columns, so the cost is matching answers times len(products).
+
+        Args:
+            profile: Client profile
+            products: Product indices to check
+
+        Returns:
+            Boolean mask aligned with ``products``, True where knocked out
+        """
+        if isinstance(profile, ProfileContext):
+            profile = profile.profile
+
+        failed = np.zeros(len(products), dtype=bool)
+        for condition, answer in profile.items():
+            for required_value, mask in self.knockout_masks.get(condition, ()):
+                if answer == required_value:
+                    failed |= mask[products]
+
+        for condition, mask in self.knockout_masks_on_missing:
+            if condition not in profile:
+                failed |= mask[products]
+        return failed
+
+    def _build_row(self, height_inches: Optional[int]) -> Optional[int]:
+        """Weight-range row for a total height, or None when no rule lists it."""
+        if height_inches is None:
+            return None
+        row = height_inches - self.build_height_base
+        return row if 0 <= row < len(self.build_weight_low) else None
+
+    def build_fail_matrix(
+        self, genders: Sequence[Any], heights_inches: Sequence[int], weights: Sequence[float]
+    ) -> np.ndarray:
+        """Screen many builds against every product's build chart at once.
+
+        Args:
+            genders: Gender per build
+            heights_inches: Total height in inches per build
+            weights: Weight in pounds per build
+
+        Returns:
+            Boolean (builds x products) matrix, True where the chart rejects the
+            build. Builds with a non-positive height or weight are never rejected,
+            matching profiles whose BMI can't be computed.
+        """
+        heights = np.asarray(heights_inches, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        known = (heights > 0) & (weights > 0)
+
+        # Same arithmetic as calculate_bmi, so caps compare exactly as per profile
+        height_meters = np.where(known, heights, 1) * 0.0254
+        bmi = (weights * 0.453592) / (height_meters ** 2)
+        cap_rows = np.array(
+            [self.bmi_cap_rows.get(gender, -1) for gender in genders], dtype=np.int64
+        )
+        failed = self.has_build & (bmi[:, None] > self.bmi_caps[cap_rows])
+
+        rows = heights - self.build_height_base
+        listed = (rows >= 0) & (rows < len(self.build_weight_low))
+        if listed.any():
+            rows = np.where(listed, rows, 0)
+            low = self.build_weight_low[rows]
+            high = self.build_weight_high[rows]
+            out_of_range = ~((low <= weights[:, None]) & (weights[:, None] <= high))
+            failed |= out_of_range & listed[:, None]
+
+        return failed & known[:, None]
+
+    def health_fail_mask(
+        self, profile: ProfileInput, products: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Products whose build, medication, driving or lifestyle rules reject the profile.
+
+        Args:
+            profile: Client profile
+            products: Ascending product indices to check (all products by default)
+
+        Returns:
+            Boolean mask aligned with ``products`` (or the catalog), True where rejected
+        """
+        context = ProfileContext.ensure(profile)
+        if products is None:
+            columns = slice(None)
+            failed = np.zeros(self.size, dtype=bool)
+        else:
+            columns = products
+            failed = np.zeros(len(products), dtype=bool)
+
+        # Build chart: one cap row for the gender, one weight row for the height
+        bmi = context.bmi
+        if bmi is not None:
+            caps = self.bmi_caps[self.bmi_cap_rows.get(context.gender, -1), columns]
+            failed |= self.has_build[columns] & (bmi > caps)
+
+            row = self._build_row(context.height_inches)
+            if row is not None:
+                weight = context.weight
+                in_range = (self.build_weight_low[row, columns] <= weight) & (
+                    weight <= self.build_weight_high[row, columns]
+                )
+                failed |= ~in_range
+
+        # Medications: one lookup per (canonical) profile medication
+        profile_meds = context.medications_canonical
+        if self.rejected_medication_masks and profile_meds:
+            for med in profile_meds:
+                mask = self.rejected_medication_masks.get(med)
+                if mask is not None:
+                    failed |= mask[columns]
+        for condition, required_meds, i in self.required_medications:
+            if context.get(condition, False) and not required_meds & profile_meds:
+                if products is None:
+                    failed[i] = True
+                else:
+                    position = np.searchsorted(products, i)
+                    if position < len(products) and products[position] == i:
+                        failed[position] = True
+
+        # Driving record
+        failed |= context.dui_count_recent > self.max_dui[columns]
+        failed |= context.major_violations > self.max_major_violations[columns]
+
+        # Felony, hazardous avocation, aviation, nicotine without tobacco
+        if context.felony_within_lookback:
+            failed |= self.bans_felony[columns]
+        if context.hazardous_avocation:
+            failed |= self.bans_hazardous_avocation[columns]
+        if context.aviation_activity:
+            failed |= self.bans_aviation[columns]
+        if context.nicotine_without_tobacco:
+            failed |= self.bans_nicotine_non_tobacco[columns]
+
+        return failed
+
+    def fingerprint(self, profile: ProfileInput) -> str:
+        """Canonical digest of the profile fields this catalog's rules read.
+
+        Profiles that differ only in fields no rule looks at (names, contact details)
+        share a fingerprint, and so get identical assign() results. A field that is
+        present (even as None) is distinguished from one that is missing.
+        """
+        return ProfileContext.ensure(profile).fingerprint(self.profile_fields)
+
+    def grid_eligibility_mask(
+        self,
+        profile: ProfileInput,
+        ages: Sequence[int],
+        faces: Sequence[float],
+        terms: Sequence[Any],
+    ) -> np.ndarray:
+        """Eligibility for a profile re-evaluated at every age/face/term combination.
+
+        Everything but issue age, face amount and term length is checked once for
+        the base profile; the grid axes are then broadcast against the dense age
+        tables. Cell [a, f, t] equals eligibility_mask() of the profile with
+        ``age=ages[a]``, ``desired_coverage=faces[f]``, ``term_length=terms[t]``.
+
+        Args:
+            profile: Base profile
+            ages: Integer issue ages in 0..AGE_TABLE_SIZE-1
+            faces: Face amounts
+            terms: Term lengths (a falsy entry means no requested term)
+
+        Returns:
+            Boolean array of shape (len(ages), len(faces), len(terms), size)
+        """
+        context = ProfileContext.ensure(profile)
+        ages = np.asarray(ages, dtype=np.intp)
+        if ages.size and (ages.min() < 0 or ages.max() >= AGE_TABLE_SIZE):
+            raise ValueError(f"Grid ages must be integers in 0..{AGE_TABLE_SIZE - 1}")
+        faces = np.asarray(faces, dtype=np.float64)
+
+        # Checks that don't depend on age, face or term
+        base = self.state_mask(context.state)
+        prior_decline_carrier = context.prior_decline_carrier
+        if prior_decline_carrier:
+            base &= np.array(
+                [prior_decline_carrier not in carrier for carrier in self.carrier_lower],
+                dtype=bool,
+            )
+        if context.prior_decline:
+            base &= ~self.full_medical_single_tier
+        if base.any():
+            base &= ~bits_to_mask(self.knockout_bits(context), self.size)
+            base &= ~self.health_fail_mask(context)
+
+        # (ages, faces, products): issue age and face limits; a falsy face is never eligible
+        face_ok = (
+            (self.face_min[ages][:, None, :] <= faces[None, :, None])
+            & (faces[None, :, None] <= self.face_max[ages][:, None, :])
+            & (faces != 0)[None, :, None]
+        )
+        age_face = (self.age_ok[ages] & base)[:, None, :] & face_ok
+
+        # (ages, terms, products): requested term length by issue age
+        term_ok = np.ones((len(ages), len(terms), self.size), dtype=bool)
+        for t, term in enumerate(terms):
+            if term:
+                table = self.term_ok.get(term)
+                term_ok[:, t] = self.any_term if table is None else table[ages]
+        return age_face[:, :, None, :] & term_ok[:, None, :, :]
+
+    def grid_scores(
+        self,
+        profile: ProfileInput,
+        ages: Sequence[int],
+        faces: Sequence[float],
+        products: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """CarrierRule.score() of a profile at every age/face combination.
+
+        The underwriting, product type and rider points come from one
+        score_client_fit() call per product; the face amount and age centrality
+        points are vectorized with the same float operations as score(), so the
+        results are identical. Term length doesn't affect scores.
+
+        Args:
+            profile: Base profile
+            ages: Issue ages
+            faces: Face amounts
+            products: Boolean mask of products to score (others get NaN); all by default
+
+        Returns:
+            Float array of shape (len(ages), len(faces), size)
+        """
+        context = ProfileContext.ensure(profile)
+        if products is None:
+            products = np.ones(self.size, dtype=bool)
+        fit = np.full(self.size, np.nan)
+        for index in np.flatnonzero(products).tolist():
+            fit[index] = self.rules[index].score_client_fit(context)
+
+        ages = np.asarray(ages, dtype=np.float64)[:, None]
+        faces = np.asarray(faces, dtype=np.float64)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Face amount alignment: 10 * centrality within the product's range, plus premium tier
+            in_range = (
+                (self.score_face_min <= faces) & (faces <= self.score_face_max) & (faces != 0)
+            )
+            distance = np.abs(faces - self.score_face_midpoint)
+            centrality = 1 - (distance / self.score_face_max_distance)
+            budget = np.where(
+                in_range, np.where(self.score_face_max_distance > 0, 10 * centrality, 10.0), 0.0
+            ) + self.score_premium_tier
+
+            # Carrier quality plus 2 * age centrality within the product's issue ages
+            in_range = (self.score_age_min <= ages) & (ages <= self.score_age_max) & (ages != 0)
+            in_range &= self.score_age_max_distance > 0
+            centrality = 1 - (np.abs(ages - self.score_age_midpoint) / self.score_age_max_distance)
+            quality = self.score_quality + np.where(in_range, 2 * centrality, 0.0)
+
+        return (fit + budget)[None, :, :] + quality[:, None, :]
+
+    def survival(self, profile: ProfileInput) -> List[Tuple[str, int]]:
+        """How many products survive each stage of eligibility_mask, in order.
+
+        Stages are the candidate index levels (state, age_band, face_band, term,
+        underwriting) followed by prior_decline_carrier, knockouts and health; the
+        last count equals ``eligibility_mask(profile).sum()``. Off-table ages skip
+        the index, so their report is state followed by the final count.
+
+        Returns:
+            (stage, surviving product count) pairs, starting with ('catalog', size)
+        """
+        context = ProfileContext.ensure(profile)
+        report = [('catalog', self.size)]
+        age = context.age
+        if not (isinstance(age, int) and 0 <= age < AGE_TABLE_SIZE):
+            report.append(('state', int(self.state_mask(context.state).sum())))
+            report.append(('eligible', int(self.eligibility_mask(context).sum())))
+            return report
+
+        report.extend(self.candidate_index.survival(context))
+        products = self._skip_declined_carrier(context, self.candidate_index.candidates(context))
+        report.append(('prior_decline_carrier', len(products)))
+        products = products[~self.knockout_fail_mask(context, products)]
+        report.append(('knockouts', len(products)))
+        products = products[~self.health_fail_mask(context, products)]
+        report.append(('health', len(products)))
+        return report
+
+    def _skip_declined_carrier(self, context: ProfileContext, products: np.ndarray) -> np.ndarray:
+        """Drop the products of the carrier named as having declined the client."""
+        prior_decline_carrier = context.prior_decline_carrier
+        if not prior_decline_carrier or not len(products):
+            return products
+        # Match each distinct carrier among the candidates once
+        ids = self.carrier_ids[products]
+        names = self.carrier_names
+        declined = [i for i in np.unique(ids).tolist() if prior_decline_carrier in names[i]]
+        return products[~np.isin(ids, declined)] if declined else products
+
+    def eligible_indices(self, profile: ProfileInput) -> np.ndarray:
+        """Ascending indices of the products the profile is eligible for (before scoring).
+
+        Integer in-table ages start from one memoized CandidateIndex leaf (state, age
+        band, face band, term and prior decline) and run the remaining checks on
+        those candidates only, so the cost follows the candidate count rather than
+        the catalog size.
+        """
+        context = ProfileContext.ensure(profile)
+
+        age = context.age
+        if not (isinstance(age, int) and 0 <= age < AGE_TABLE_SIZE):
+            # Off-table ages (fractional, out of range) have no dense rows: run the
+            # compiled predicate of each product sold in the state instead
+            products = np.flatnonzero(self.state_mask(context.state))
+            keep = np.array(
+                [self.rules[i].is_eligible(context) for i in products.tolist()], dtype=bool
+            )
+            return products[keep]
+
+        products = self._skip_declined_carrier(context, self.candidate_index.candidates(context))
+        if len(products):
+            products = products[~self.knockout_fail_mask(context, products)]
+        if len(products):
+            products = products[~self.health_fail_mask(context, products)]
+        return products
+
+    def eligibility_mask(self, profile: ProfileInput) -> np.ndarray:
+        """Boolean mask of products the profile is eligible for (before scoring)."""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.eligible_indices(profile)] = True
+        return mask
@@ -0,0 +1,300 @@
+"""
+Rule compiler: CarrierRule -> specialized Python predicate.
+
+CarrierRule.is_eligible_interpreted() walks the rule's nested ``eligibility``
+and ``knockouts`` dicts on every call, re-testing branches (``'driving' in
+eligibility``, ``isinstance(max_bmi, dict)``, ...) whose outcome is fixed once
+the YAML is loaded. generate_predicate_source() resolves those branches at load
+instead: it emits the source of one straight-line function per product with
+absent sections dropped and limits inlined as constants, and compile_predicate()
+turns it into a function of a ProfileContext with compile().
+
+Compiled predicates are cached by the product YAML's content hash (plus
+CODEGEN_VERSION), so a rule set reload only recompiles files that changed.
+The cache is a bounded LRU: each rule also holds its own predicate, so an
+evicted entry only costs a recompile at the next reload. Predicates are
+process-local and never pickled into rule set snapshots.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .profile import ProfileContext
+
+if TYPE_CHECKING:
+    from .assigner import CarrierRule
+
+logger = logging.getLogger("carrier_predictor")
+
+# Bump when generated code changes for the same rule
+CODEGEN_VERSION = 1
+
+# Compiled predicates kept for reuse across rule set reloads (least recently used evicted)
+PREDICATE_CACHE_SIZE = 1024
+
+Predicate = Callable[[ProfileContext], bool]
+
+# Literal types inlined into generated source; anything else is bound by name
+_INLINE_TYPES = (bool, int, str, type(None))
+
+
+class _Source:
+    """Accumulates generated lines and the constants they reference."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.namespace: Dict[str, Any] = {}
+
+    def emit(self, line: str, indent: int = 1) -> None:
+        self.lines.append('    ' * indent + line)
+
+    def const(self, value: Any) -> str:
+        """Source expression for a constant: a literal, or a bound name."""
+        if type(value) in _INLINE_TYPES or (type(value) is float and math.isfinite(value)):
+            return repr(value)
+        name = f'_c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def reject_if(self, condition: str) -> None:
+        self.emit(f'if {condition}:')
+        self.emit('return False', 2)
+
+
+def _emit_state(src: _Source, rule: "CarrierRule") -> None:
+    if rule.allowed_states is None and not rule.excluded_states:
+        return
+    src.emit('state = ctx.state')
+    if rule.allowed_states is not None:
+        src.reject_if(f'state is not None and state not in {src.const(rule.allowed_states)}')
+    if rule.excluded_states:
+        src.reject_if(f'state in {src.const(rule.excluded_states)}')
+
+
+def _emit_prior_decline(src: _Source, rule: "CarrierRule") -> None:
+    src.emit('prior_decline_carrier = ctx.prior_decline_carrier')
+    carrier = src.const(rule.carrier.lower())
+    src.reject_if(f'prior_decline_carrier and prior_decline_carrier in {carrier}')
+    if 'Full Medical' in rule.underwriting_type and not rule.tier_structure:
+        src.reject_if('ctx.prior_decline')
+
+
+def _emit_age_face_term(src: _Source, rule: "CarrierRule") -> None:
+    # supports_age / supports_face: a falsy age or face amount is never eligible
+    src.emit('age = ctx.age')
+    src.reject_if('not age')
+
+    duration_index = rule._duration_index
+    if duration_index is not None:
+        src.emit(f'terms = {src.const(duration_index.lookup)}(age)')
+        src.reject_if('not terms')
+    else:
+        min_age = src.const(rule.issue_ages.get('min', 0))
+        max_age = src.const(rule.issue_ages.get('max', 120))
+        src.reject_if(f'not ({min_age} <= age <= {max_age})')
+
+    src.emit('face = ctx.desired_coverage')
+    src.reject_if('not face')
+    face_index = rule._face_index
+    if face_index is not None:
+        src.emit(f'limits = {src.const(face_index.first)}(age)')
+        src.reject_if('limits is None or not (limits[0] <= face <= limits[1])')
+    else:
+        min_face = src.const(rule.face_amount.get('min', 0))
+        max_face = src.const(rule.face_amount.get('max', float('inf')))
+        src.reject_if(f'not ({min_face} <= face <= {max_face})')
+
+    # Requested term length: only by_duration products restrict it
+    if duration_index is not None:
+        src.emit('term_length = ctx.term_length')
+        src.reject_if('term_length and term_length not in terms')
+
+
+def _emit_knockouts(src: _Source, rule: "CarrierRule") -> None:
+    for key, value in (rule.knockouts or {}).items():
+        if key not in ('any', 'premier_plus', 'standard_graded') or not isinstance(value, list):
+            continue
+        for knockout in value:
+            if isinstance(knockout, dict):
+                for condition, required_value in knockout.items():
+                    src.reject_if(f'get({src.const(condition)}) == {src.const(required_value)}')
+
+
+def _emit_health(src: _Source, rule: "CarrierRule") -> None:
+    eligibility = rule.eligibility
+    if not eligibility:
+        return
+
+    chart = rule.build_chart
+    if chart is not None and (
+        chart.cap_by_gender or math.isfinite(chart.cap_default) or chart.weight_by_inches
+    ):
+        src.emit('bmi = ctx.bmi')
+        src.emit('if bmi is not None:')
+        if chart.cap_by_gender:
+            caps, default = src.const(dict(chart.cap_by_gender)), src.const(chart.cap_default)
+            cap = f'{caps}.get(ctx.gender, {default})'
+            src.emit(f'if bmi > {cap}:', 2)
+            src.emit('return False', 3)
+        elif math.isfinite(chart.cap_default):
+            src.emit(f'if bmi > {src.const(chart.cap_default)}:', 2)
+            src.emit('return False', 3)
+        if chart.weight_by_inches:
+            ranges = src.const(dict(chart.weight_by_inches))
+            src.emit(f'weight_range = {ranges}.get(ctx.height_inches)', 2)
+            src.emit(
+                'if weight_range is not None'
+                ' and not (weight_range[0] <= ctx.weight <= weight_range[1]):',
+                2,
+            )
+            src.emit('return False', 3)
+
+    if 'medications' in eligibility:
+        if rule.rejected_medications:
+            src.reject_if(f'{src.const(rule.rejected_medications)} & ctx.medications_canonical')
+        for condition, required_meds in rule.required_medications:
+            src.reject_if(
+                f'get({src.const(condition)}, False)'
+                f' and not {src.const(required_meds)} & ctx.medications_canonical'
+            )
+
+    if 'driving' in eligibility:
+        driving = eligibility['driving']
+        if 'dui_years_lookback' in driving:
+            src.reject_if(f'ctx.dui_count_recent > {src.const(driving.get("max_dui_total", 0))}')
+        if 'max_major_violations' in driving:
+            src.reject_if(f'ctx.major_violations > {src.const(driving["max_major_violations"])}')
+
+    if 'felony_lookback_years' in eligibility:
+        src.reject_if('ctx.felony_within_lookback')
+    if not eligibility.get('avocation_hazardous', True):
+        src.reject_if('ctx.hazardous_avocation')
+    if not eligibility.get('aviation', True):
+        src.reject_if('ctx.aviation_activity')
+    if not eligibility.get('nicotine_non_tobacco_allowed', True):
+        src.reject_if('ctx.nicotine_without_tobacco')
+
+
+def generate_predicate_source(
+    rule: "CarrierRule", name: str = 'is_eligible'
+) -> Tuple[str, Dict[str, Any]]:
+    """Generate a specialized eligibility function for one product.
+
+    Args:
+        rule: Product rule to compile
+        name: Name of the generated function
+
+    Returns:
+        (source, namespace): the function's source code and the non-literal
+        constants it references
+    """
+    src = _Source()
+    src.emit(f'def {name}(ctx):', 0)
+    src.emit('get = ctx.profile.get')
+    _emit_state(src, rule)
+    _emit_prior_decline(src, rule)
+    _emit_age_face_term(src, rule)
+    _emit_knockouts(src, rule)
+    _emit_health(src, rule)
+    src.emit('return True')
+    return '\n'.join(src.lines) + '\n', src.namespace
+
+
+_cache: "OrderedDict[str, Predicate]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key: str) -> Optional[Predicate]:
+    """Return a cached predicate, marking it most recently used."""
+    with _cache_lock:
+        predicate = _cache.get(key)
+        if predicate is not None:
+            _cache.move_to_end(key)
+        return predicate
+
+
+def _store(key: str, predicate: Predicate) -> Predicate:
+    """Cache a predicate (keeping one already stored under key), evicting beyond the size."""
+    with _cache_lock:
+        predicate = _cache.setdefault(key, predicate)
+        _cache.move_to_end(key)
+        while len(_cache) > PREDICATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+        return predicate
+
+
+def compile_predicate(rule: "CarrierRule") -> Predicate:
+    """Compiled eligibility predicate for a rule, from the cache when possible.
+
+    Rules loaded from YAML are cached by their file's content hash; rules built
+    in memory are cached by the generated source. Rules the generator can't
+    handle (malformed sections) fall back to the interpreted predicate.
+    """
+    key = f'{CODEGEN_VERSION}:{rule.source_hash}' if rule.source_hash else None
+    if key is not None:
+        predicate = _cached(key)
+        if predicate is not None:
+            return predicate
+
+    try:
+        source, namespace = generate_predicate_source(rule)
+    except Exception as e:
+        logger.warning(f"Using interpreted eligibility for {rule.carrier} {rule.product}: {e}")
+        return lambda ctx: rule.is_eligible_interpreted(ctx)
+
+    if key is None:
+        key = f'{CODEGEN_VERSION}:src:' + hashlib.sha256(
+            (source + repr(sorted(namespace.items()))).encode('utf-8')
+        ).hexdigest()
+        predicate = _cached(key)
+        if predicate is not None:
+            return predicate
+
+    # Names only appear in the filename (tracebacks), never in the generated code
+    code = compile(source, f'<rule {rule.carrier!r} {rule.product!r}>', 'exec')
+    exec(code, namespace)
+    return _store(key, namespace['is_eligible'])
+
+
+def differential_check(
+    rules: Sequence["CarrierRule"], profiles: Iterable[Any]
+) -> List[Tuple[int, str, bool, bool]]:
+    """Compare compiled and interpreted predicates.
+
+    Args:
+        rules: Products to check
+        profiles: Raw profile dicts or ProfileContexts
+
+    Returns:
+        (profile index, product, interpreted, compiled) for every disagreement
+    """
+    predicates = [compile_predicate(rule) for rule in rules]
+    mismatches = []
+    for n, profile in enumerate(profiles):
+        context = ProfileContext.ensure(profile)
+        for rule, predicate in zip(rules, predicates):
+            expected = rule.is_eligible_interpreted(context)
+            actual = predicate(context)
+            if actual != expected:
+                mismatches.append((n, f'{rule.carrier} - {rule.product}', expected, actual))
+    return mismatches
+
+
+def clear_predicate_cache() -> None:
+    """Drop every compiled predicate (e.g. between tests)."""
+    with _cache_lock:
+        _cache.clear()
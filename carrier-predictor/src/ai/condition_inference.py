@@ -0,0 +1,116 @@
+"""
+Medication-to-condition inference for /recommend.
+
+Agents often know a client's prescriptions better than their diagnoses. This
+optional stage runs before assign(): every medication is resolved through the
+compiled MedicationReference (one dict lookup, no text scanning) and the
+conditions it indicates are added to ``medical_conditions`` as inferred flags,
+alongside a severity estimate and the drug that triggered each flag.
+Conditions the profile states explicitly are never overridden.
+
+Inference affects scoring only. Knockouts read specific top-level answers
+(``recent_heart_attack_12_months``, ``diabetes_insulin_under_40``, ...) that a
+prescription cannot establish, so inferred flags never make a product eligible
+or ineligible; they feed the health-conditions part of CarrierRule.score().
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from .medication_reference import SEVERITY_SCALE, MedicationReference, default_medication_reference
+
+
+@dataclass(frozen=True)
+class ConditionInference:
+    """Conditions inferred from a medication list."""
+
+    conditions: Dict[str, Tuple[str, ...]]  # Condition flag -> medications indicating it
+    severity_range: Optional[Tuple[int, int]]  # SEVERITY_SCALE positions, None if unknown
+    unmatched: Tuple[str, ...]  # Medications not in the reference guide
+
+    @property
+    def severity(self) -> Optional[str]:
+        """Severity estimate label, e.g. "Moderate" or "Mild to Severe"."""
+        if self.severity_range is None:
+            return None
+        low, high = (SEVERITY_SCALE[rank].title() for rank in self.severity_range)
+        return low if low == high else f"{low} to {high}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable report for API responses."""
+        return {
+            "inferred_conditions": {flag: list(meds) for flag, meds in self.conditions.items()},
+            "applies_to": "scoring",
+            "severity_estimate": self.severity,
+            "unmatched_medications": list(self.unmatched),
+        }
+
+
+def infer_conditions(
+    medications: Iterable[Any], reference: Optional[MedicationReference] = None
+) -> ConditionInference:
+    """Infer condition flags from a medication list.
+
+    Args:
+        medications: Medication names as given in the profile
+        reference: Compiled reference guide (default: the process-wide one)
+
+    Returns:
+        ConditionInference with the conditions in reference-guide order
+    """
+    reference = reference or default_medication_reference()
+
+    found: Dict[str, list] = {}
+    order: Dict[str, int] = {}
+    unmatched = []
+    low = high = -1
+    for name in medications:
+        match = reference.lookup(name) if isinstance(name, str) else None
+        if match is None:
+            unmatched.append(name)
+            continue
+        for condition in match.conditions:
+            found.setdefault(condition.flag, []).append(name)
+            order[condition.flag] = condition.number
+            bounds = condition.severity_range
+            if bounds is not None:
+                low, high = max(low, bounds[0]), max(high, bounds[1])
+
+    return ConditionInference(
+        conditions={flag: tuple(found[flag]) for flag in sorted(found, key=order.__getitem__)},
+        severity_range=(low, high) if low >= 0 else None,
+        unmatched=tuple(unmatched),
+    )
+
+
+def apply_condition_inference(
+    profile: Mapping[str, Any], reference: Optional[MedicationReference] = None
+) -> Tuple[Dict[str, Any], ConditionInference]:
+    """Expand a profile's medications into inferred medical_conditions flags.
+
+    Only ``medical_conditions`` is changed, which assign() uses for scoring;
+    the knockout answers eligibility reads are left as given.
+
+    Args:
+        profile: Raw client profile
+        reference: Compiled reference guide (default: the process-wide one)
+
+    Returns:
+        (profile copy with the inferred flags added, the inference report)
+    """
+    inference = infer_conditions(profile.get('medications') or [], reference)
+    expanded = dict(profile)
+    if not inference.conditions:
+        return expanded, inference
+
+    conditions = profile.get('medical_conditions') or {}
+    if isinstance(conditions, Mapping):
+        # Explicit answers (including "no") win over inferred ones
+        merged = dict(conditions)
+        for flag in inference.conditions:
+            merged.setdefault(flag, True)
+    else:
+        merged = list(conditions)
+        merged.extend(flag for flag in inference.conditions if flag not in merged)
+    expanded['medical_conditions'] = merged
+    return expanded, inference
@@ -0,0 +1,118 @@
+"""
+Interval index for band tables in product rules.
+
+Rules describe issue-age bands as closed intervals, e.g. face limits by age
+(``{"18_45": [50000, 400000], ...}``) or issue ages by term duration
+(``{"10_year": [18, 60], ...}``). IntervalIndex compiles such a table once so a
+stabbing query ("which bands contain this age?") is a single bisect.
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger("carrier_predictor")
+
+
+class IntervalIndex:
+    """Stabbing-query index over closed intervals ``[low, high]``.
+
+    The distinct endpoints split the number line into points and the open gaps
+    between them; the bands covering each point and each gap are precomputed, in
+    the order the intervals were given. Works for integer and fractional queries.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[float, float, Any]]):
+        """Build the index.
+
+        Args:
+            intervals: (low, high, value) triples; earlier triples take priority
+        """
+        intervals = [(low, high, value) for low, high, value in intervals if low <= high]
+        points = sorted({p for low, high, _ in intervals for p in (low, high)})
+
+        self._points = points
+        self._at_point = [
+            tuple(value for low, high, value in intervals if low <= p <= high) for p in points
+        ]
+        # Gap i is the open interval (points[i-1], points[i]); gaps 0 and len(points) are unbounded
+        self._in_gap = (
+            [()]
+            + [
+                tuple(value for low, high, value in intervals if low <= left and right <= high)
+                for left, right in zip(points, points[1:])
+            ]
+            + [()]
+        )
+
+    def lookup(self, x: float) -> Tuple[Any, ...]:
+        """Return the values of every interval containing x, in priority order."""
+        i = bisect_left(self._points, x)
+        if i < len(self._points) and self._points[i] == x:
+            return self._at_point[i]
+        return self._in_gap[i]
+
+    def first(self, x: float) -> Optional[Any]:
+        """Return the highest-priority value whose interval contains x, if any."""
+        values = self.lookup(x)
+        return values[0] if values else None
+
+
+def parse_age_band(key: Any) -> Optional[Tuple[int, int]]:
+    """Parse an age band key such as ``"18_45"`` into (18, 45).
+
+    Band keys must be quoted in YAML: unquoted ``18_45`` is read as the integer 1845.
+    """
+    parts = str(key).split('_')
+    if len(parts) != 2:
+        return None
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError:
+        return None
+
+
+def parse_duration(key: Any) -> Any:
+    """Parse a term duration key such as ``"20_year"`` into 20 (other keys unchanged)."""
+    try:
+        return int(str(key).split('_')[0])
+    except ValueError:
+        return key
+
+
+def build_face_index(face_amount: dict, name: str = "") -> Optional[IntervalIndex]:
+    """Index ``face_amount.by_age`` as age band -> (min_face, max_face), if present.
+
+    Bands whose key does not parse are skipped with a warning, since a skipped
+    band leaves its ages without a face limit (and the product ineligible there).
+
+    Args:
+        face_amount: The rule's face_amount block
+        name: Product name for warnings
+    """
+    if 'by_age' not in face_amount:
+        return None
+
+    bands = []
+    for key, face_range in face_amount['by_age'].items():
+        ages = parse_age_band(key)
+        if ages is None:
+            logger.warning(
+                f"Ignoring face_amount.by_age band {key!r} of {name or 'a product'}: "
+                f"expected a quoted key such as \"18_45\""
+            )
+        elif isinstance(face_range, list) and len(face_range) == 2:
+            bands.append((ages[0], ages[1], (face_range[0], face_range[1])))
+    return IntervalIndex(bands)
+
+
+def build_duration_index(issue_ages: dict) -> Optional[IntervalIndex]:
+    """Index ``issue_ages.by_duration`` as issue age band -> term length, if present."""
+    if 'by_duration' not in issue_ages:
+        return None
+
+    bands = []
+    for key, age_range in issue_ages['by_duration'].items():
+        if isinstance(age_range, list) and len(age_range) == 2:
+            bands.append((age_range[0], age_range[1], parse_duration(key)))
+    return IntervalIndex(bands)
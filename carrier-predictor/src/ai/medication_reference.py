@@ -0,0 +1,402 @@
+"""
+Structured index over the medication reference guide.
+
+data/medical_conditions_medication_reference.txt is an agent guide made of
+``===SECTION===`` blocks of indented ``KEY: value`` lines. MedicationReference
+parses it once into conditions (name, severity, prescribed medications and
+per-box CARRIER_POSITIONING) and an index from every generic and brand name to
+the conditions it indicates, so looking up a medication is a dict access
+instead of a scan of the text.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .medications import (
+    _NON_BRANDS,
+    DEFAULT_MEDICATION_REFERENCE,
+    MedicationAliases,
+    default_medication_aliases,
+    parse_alias_pairs,
+)
+
+_SECTION_HEADER = re.compile(r'^===(?P<name>[A-Z0-9_]+)===\s*$')
+_CONDITION_SECTION = re.compile(r'^CONDITION_(?P<number>\d+)_(?P<key>[A-Z0-9_]+)$')
+
+# SEVERITY_LEVEL words, least to most severe ("Mild to Moderate", "Critical", ...)
+SEVERITY_SCALE = ('mild', 'moderate', 'severe', 'critical')
+
+# "Apixaban (Eliquis)" and "Aspirin (Daily)": name plus a parenthetical
+_PARENTHETICAL = re.compile(r'^(?P<name>[^()]+?)\s*\((?P<note>[^()]+)\)$')
+
+
+def condition_key(label: str) -> str:
+    """Normalize a condition label ("Asthma/COPD", "Diabetes (insulin)") to a section key."""
+    match = _PARENTHETICAL.match(label.strip())
+    if match:
+        label = match.group('name')
+    return re.sub(r'[^A-Z0-9]+', '_', label.upper()).strip('_')
+
+
+def severity_range(level: Optional[str]) -> Optional[Tuple[int, int]]:
+    """(lowest, highest) SEVERITY_SCALE positions named in a SEVERITY_LEVEL, or None."""
+    if not level:
+        return None
+    words = re.findall(r'[a-z]+', level.lower())
+    ranks = [SEVERITY_SCALE.index(w) for w in words if w in SEVERITY_SCALE]
+    if not ranks:
+        return None
+    return min(ranks), max(ranks)
+
+
+def parse_fields(lines: Iterable[str]) -> Dict[str, Any]:
+    """Parse indented ``KEY: value`` lines into nested dicts.
+
+    A key without a value opens a nested block holding the more-indented lines
+    below it: a dict of keys, or a list when they are ``- item`` lines. Repeated
+    keys keep their last value; lines that fit neither form are ignored.
+    """
+    root: Dict[str, Any] = {}
+    stack: List[Tuple[int, Dict[str, Any], str]] = []  # (indent, owner, key) of open blocks
+
+    for raw_line in lines:
+        text = raw_line.strip()
+        if not text:
+            continue
+        indent = len(raw_line) - len(raw_line.lstrip())
+        while stack and indent <= stack[-1][0]:
+            stack.pop()
+
+        is_item = text.startswith('- ')
+        if stack:
+            _, owner, key = stack[-1]
+            if owner[key] is None:
+                owner[key] = [] if is_item else {}
+            container = owner[key]
+        else:
+            container = root
+
+        if isinstance(container, list):
+            if is_item:
+                container.append(text[2:].strip())
+            continue
+
+        key, sep, value = text.partition(':')
+        if not sep or is_item:
+            continue
+        key, value = key.strip(), value.strip()
+        if value:
+            container[key] = value
+        else:
+            container[key] = None
+            stack.append((indent, container, key))
+
+    return root
+
+
+def split_sections(text: str) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (section name, lines) for every ``===NAME===`` block."""
+    name: Optional[str] = None
+    lines: List[str] = []
+    for line in text.splitlines():
+        match = _SECTION_HEADER.match(line)
+        if match:
+            if name is not None:
+                yield name, lines
+            name, lines = match.group('name'), []
+        elif name is not None:
+            lines.append(line)
+    if name is not None:
+        yield name, lines
+
+
+@dataclass(frozen=True)
+class PrescribedMedication:
+    """A medication listed under a condition's MEDICATIONS_PRESCRIBED block."""
+
+    generic: str
+    brands: Tuple[str, ...] = ()
+    purpose: Optional[str] = None
+    medication_class: Optional[str] = None
+    severity_indicator: Optional[str] = None
+    alternative: Optional[str] = None
+
+    def names(self) -> Iterator[Tuple[str, str]]:
+        """Yield (name, generic) for the generic, its brands and any listed alternative."""
+        yield self.generic, self.generic
+        for brand in self.brands:
+            yield brand, self.generic
+        if self.alternative:
+            match = _PARENTHETICAL.match(self.alternative)
+            if match:
+                yield match.group('name'), match.group('name')
+                yield match.group('note'), match.group('name')
+            else:
+                yield self.alternative, self.alternative
+
+
+@dataclass(frozen=True)
+class Condition:
+    """One ``===CONDITION_n_KEY===`` section of the reference guide."""
+
+    key: str  # e.g. "HEART_ATTACK"
+    number: int
+    name: str
+    medical_terms: Tuple[str, ...]
+    severity: Optional[str]  # Section-level SEVERITY
+    severity_level: Optional[str]  # UNDERWRITING_IMPACT.SEVERITY_LEVEL
+    medications: Tuple[PrescribedMedication, ...]
+    underwriting_impact: Dict[str, Any] = field(default_factory=dict)
+    carrier_positioning: Dict[str, Any] = field(default_factory=dict)  # Box -> carrier -> guidance
+    agent_guidance: Dict[str, Any] = field(default_factory=dict)
+    flag: str = field(init=False)  # medical_conditions key, e.g. "heart_attack"
+    severity_range: Optional[Tuple[int, int]] = field(init=False)  # SEVERITY_SCALE positions
+
+    def __post_init__(self) -> None:
+        # Derived once at load so condition inference never parses text per request
+        object.__setattr__(self, 'flag', self.key.lower())
+        object.__setattr__(self, 'severity_range', severity_range(self.severity_level))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable summary for API responses."""
+        return {
+            'condition': self.key,
+            'name': self.name,
+            'severity': self.severity,
+            'severity_level': self.severity_level,
+            'carrier_positioning': self.carrier_positioning,
+        }
+
+
+@dataclass(frozen=True)
+class MedicationMatch:
+    """Everything the reference guide says about one medication."""
+
+    medication: str  # Canonical (normalized generic) name
+    generic: str
+    brands: Tuple[str, ...]
+    conditions: Tuple[Condition, ...]
+    details: Dict[str, PrescribedMedication] = field(default_factory=dict)  # Condition key -> entry
+
+    def to_dict(self, query: Optional[str] = None) -> Dict[str, Any]:
+        """Serializable lookup result for API responses."""
+        conditions = []
+        for condition in self.conditions:
+            entry = condition.to_dict()
+            detail = self.details.get(condition.key)
+            if detail is not None:
+                entry['purpose'] = detail.purpose
+                entry['medication_class'] = detail.medication_class
+                entry['severity_indicator'] = detail.severity_indicator
+            conditions.append(entry)
+
+        return {
+            'query': query if query is not None else self.generic,
+            'found': True,
+            'medication': self.medication,
+            'generic': self.generic,
+            'brands': list(self.brands),
+            'conditions': conditions,
+        }
+
+
+def _parse_condition(number: int, key: str, fields: Dict[str, Any]) -> Condition:
+    medications = []
+    for entry in (fields.get('MEDICATIONS_PRESCRIBED') or {}).values():
+        if not isinstance(entry, dict) or not entry.get('GENERIC'):
+            continue
+        brands = tuple(
+            brand.strip()
+            for brand in (entry.get('BRAND') or '').split(',')
+            if brand.strip() and brand.strip().lower() not in _NON_BRANDS
+        )
+        medications.append(
+            PrescribedMedication(
+                generic=entry['GENERIC'],
+                brands=brands,
+                purpose=entry.get('PURPOSE'),
+                medication_class=entry.get('MEDICATION_CLASS'),
+                severity_indicator=entry.get('SEVERITY_INDICATOR'),
+                alternative=entry.get('ALTERNATIVE'),
+            )
+        )
+
+    impact = fields.get('UNDERWRITING_IMPACT') or {}
+    return Condition(
+        key=key,
+        number=number,
+        name=fields.get('CONDITION_NAME', key.replace('_', ' ').title()),
+        medical_terms=tuple(
+            term.strip() for term in (fields.get('MEDICAL_TERM') or '').split(',') if term.strip()
+        ),
+        severity=fields.get('SEVERITY'),
+        severity_level=impact.get('SEVERITY_LEVEL') if isinstance(impact, dict) else None,
+        medications=tuple(medications),
+        underwriting_impact=impact if isinstance(impact, dict) else {},
+        carrier_positioning=fields.get('CARRIER_POSITIONING') or {},
+        agent_guidance=fields.get('AGENT_GUIDANCE') or {},
+    )
+
+
+def _parse_lookup_index(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """Parse MEDICATION_LOOKUP_INDEX into (medication name, condition labels) pairs."""
+    entries: List[Tuple[str, List[str]]] = []
+    for line in lines:
+        key, _, value = line.strip().partition(':')
+        value = value.strip()
+        if key == 'MEDICATION_NAME' and value:
+            entries.append((value, []))
+        elif key == 'SEE_CONDITION' and entries:
+            entries[-1][1].extend(label.strip() for label in value.split(',') if label.strip())
+    return entries
+
+
+class MedicationReference:
+    """Compiled medication -> condition index over the reference guide."""
+
+    def __init__(
+        self,
+        conditions: Iterable[Condition],
+        aliases: MedicationAliases,
+        lookup_index: Iterable[Tuple[str, List[str]]] = (),
+    ):
+        """Build the index.
+
+        Args:
+            conditions: Parsed condition sections
+            aliases: Brand/generic table for the same guide (the one rule
+                compilation uses), so both resolve names identically
+            lookup_index: (medication name, condition labels) pairs from MEDICATION_LOOKUP_INDEX
+        """
+        self.conditions: Dict[str, Condition] = {c.key: c for c in conditions}
+        self.aliases = aliases
+
+        # canonical name -> (generic, brands, condition keys, prescribed entries)
+        generics: Dict[str, str] = {}
+        brands: Dict[str, List[str]] = {}
+        condition_keys: Dict[str, List[str]] = {}
+        details: Dict[str, Dict[str, PrescribedMedication]] = {}
+
+        def add(canonical: str, key: str) -> None:
+            keys = condition_keys.setdefault(canonical, [])
+            if key in self.conditions and key not in keys:
+                keys.append(key)
+
+        for condition in self.conditions.values():
+            for medication in condition.medications:
+                canonical = self.aliases.canonical(medication.generic)
+                generics.setdefault(canonical, medication.generic)
+                add(canonical, condition.key)
+                for name, generic in medication.names():
+                    alias_canonical = self.aliases.canonical(name)
+                    details.setdefault(alias_canonical, {}).setdefault(condition.key, medication)
+                    generics.setdefault(alias_canonical, generic)
+                    if name != generic and name not in brands.setdefault(alias_canonical, []):
+                        brands[alias_canonical].append(name)
+                    add(alias_canonical, condition.key)
+
+        # The alphabetical index also lists combination components ("Salmeterol")
+        lookup_index = list(lookup_index)
+        self.lookup_index_names: Tuple[str, ...] = tuple(name for name, _ in lookup_index)
+        for name, labels in lookup_index:
+            match = _PARENTHETICAL.match(name)
+            canonical = self.aliases.canonical(match.group('name') if match else name)
+            generics.setdefault(canonical, match.group('name') if match else name)
+            for label in labels:
+                add(canonical, condition_key(label))
+
+        self._matches: Dict[str, MedicationMatch] = {
+            canonical: MedicationMatch(
+                medication=canonical,
+                generic=generics[canonical],
+                brands=tuple(brands.get(canonical, ())),
+                conditions=tuple(
+                    sorted((self.conditions[k] for k in keys), key=lambda c: c.number)
+                ),
+                details=details.get(canonical, {}),
+            )
+            for canonical, keys in condition_keys.items()
+            if keys
+        }
+
+    @classmethod
+    def parse(cls, text: str, aliases: Optional[MedicationAliases] = None) -> "MedicationReference":
+        """Compile the reference guide's text.
+
+        Args:
+            text: Reference guide contents
+            aliases: Alias table already built from the same text (parsed from it if None)
+        """
+        conditions = []
+        lookup_index: List[Tuple[str, List[str]]] = []
+        for name, lines in split_sections(text):
+            match = _CONDITION_SECTION.match(name)
+            if match:
+                number, key = int(match.group('number')), match.group('key')
+                conditions.append(_parse_condition(number, key, parse_fields(lines)))
+            elif name == 'MEDICATION_LOOKUP_INDEX':
+                lookup_index = _parse_lookup_index(lines)
+        if aliases is None:
+            aliases = MedicationAliases(parse_alias_pairs(text))
+        return cls(conditions, aliases, lookup_index)
+
+    @classmethod
+    def load(
+        cls, path: Optional[Path] = None, aliases: Optional[MedicationAliases] = None
+    ) -> "MedicationReference":
+        """Compile the reference guide file (an empty index if it is missing)."""
+        path = Path(path or DEFAULT_MEDICATION_REFERENCE)
+        if not path.exists():
+            return cls([], aliases or MedicationAliases())
+        return cls.parse(path.read_text(encoding='utf-8'), aliases)
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def lookup(self, name: str) -> Optional[MedicationMatch]:
+        """Conditions a medication (generic or brand, any case) indicates, or None."""
+        match = self._matches.get(self.aliases.canonical(name))
+        if match is None:
+            # "Aspirin (Daily)" style queries
+            parenthetical = _PARENTHETICAL.match(name.strip())
+            if parenthetical:
+                match = self._matches.get(self.aliases.canonical(parenthetical.group('name')))
+        return match
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Look up a medication list.
+
+        Returns:
+            Dict with per-medication ``results`` (in input order), the union of
+            ``conditions`` they indicate, and the ``unmatched`` names
+        """
+        results = []
+        unmatched = []
+        conditions: Dict[str, Dict[str, Any]] = {}
+        for name in names:
+            match = self.lookup(name)
+            if match is None:
+                unmatched.append(name)
+                results.append({'query': name, 'found': False})
+                continue
+            results.append(match.to_dict(query=name))
+            for condition in match.conditions:
+                entry = conditions.setdefault(
+                    condition.key, {**condition.to_dict(), 'medications': []}
+                )
+                entry['medications'].append(name)
+
+        return {
+            'results': results,
+            'conditions': list(conditions.values()),
+            'unmatched': unmatched,
+        }
+
+
+@lru_cache(maxsize=1)
+def default_medication_reference() -> MedicationReference:
+    """Process-wide compiled reference guide, sharing the rule compiler's alias table."""
+    return MedicationReference.load(aliases=default_medication_aliases())
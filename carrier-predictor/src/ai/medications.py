@@ -0,0 +1,100 @@
+"""
+Canonical medication names for rule matching.
+
+Product rules and client profiles name the same drug in different ways
+("Coumadin", "warfarin", "Warfarin "). MedicationAliases maps every brand and
+generic spelling to one canonical name (the lowercased generic), so rejected and
+required medication lists compile to frozensets at load time and screening a
+profile is a set intersection.
+
+Brand/generic pairs come from the GENERIC/BRAND entries of
+data/medical_conditions_medication_reference.txt.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Default medication reference (carrier-predictor/data)
+DEFAULT_MEDICATION_REFERENCE = (
+    Path(__file__).parent.parent.parent / "data" / "medical_conditions_medication_reference.txt"
+)
+
+# BRAND values that don't name a product
+_NON_BRANDS = {'various', 'n/a', 'none', 'generic'}
+
+# "ALTERNATIVE: Apixaban (Eliquis)"
+_ALTERNATIVE = re.compile(r'^(?P<generic>[^()]+?)\s*\((?P<brand>[^()]+)\)$')
+
+
+def normalize_medication_name(name: str) -> str:
+    """Lowercase a medication name and collapse whitespace."""
+    return ' '.join(name.lower().split())
+
+
+class MedicationAliases:
+    """Brand/generic alias table resolving medication names to canonical names."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]] = ()):
+        """Build the table.
+
+        Args:
+            pairs: (alias, canonical) name pairs, e.g. ("Coumadin", "Warfarin")
+        """
+        self._canonical: Dict[str, str] = {}
+        for alias, canonical in pairs:
+            canonical = normalize_medication_name(canonical)
+            self._canonical.setdefault(canonical, canonical)
+            self._canonical.setdefault(normalize_medication_name(alias), canonical)
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def canonical(self, name: str) -> str:
+        """Canonical name for a medication (its normalized spelling if unknown)."""
+        normalized = normalize_medication_name(name)
+        return self._canonical.get(normalized, normalized)
+
+    def canonicalize(self, names: Iterable[str]) -> FrozenSet[str]:
+        """Canonical names for a list of medications."""
+        return frozenset(self.canonical(name) for name in names)
+
+
+def parse_alias_pairs(text: str) -> Iterable[Tuple[str, str]]:
+    """Yield (brand, generic) pairs from the reference file's medication entries."""
+    generic: Optional[str] = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        key, _, value = line.partition(':')
+        value = value.strip()
+
+        if key == 'GENERIC':
+            generic = value
+            yield value, value
+        elif key == 'BRAND' and generic:
+            for brand in value.split(','):
+                brand = brand.strip()
+                if brand and brand.lower() not in _NON_BRANDS:
+                    yield brand, generic
+        elif key == 'ALTERNATIVE':
+            match = _ALTERNATIVE.match(value)
+            if match:
+                yield match.group('generic'), match.group('generic')
+                yield match.group('brand'), match.group('generic')
+        elif line.startswith('MEDICATION_') or line.startswith('==='):
+            generic = None
+
+
+def load_medication_aliases(path: Optional[Path] = None) -> MedicationAliases:
+    """Build the alias table from the medication reference file (empty if missing)."""
+    path = Path(path or DEFAULT_MEDICATION_REFERENCE)
+    if not path.exists():
+        return MedicationAliases()
+    return MedicationAliases(parse_alias_pairs(path.read_text(encoding='utf-8')))
+
+
+@lru_cache(maxsize=1)
+def default_medication_aliases() -> MedicationAliases:
+    """Process-wide alias table shared by rule compilation and profile normalization."""
+    return load_medication_aliases()
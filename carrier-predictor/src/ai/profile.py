@@ -0,0 +1,139 @@
+"""
+Normalized, per-request view of a client profile.
+
+ProfileContext derives everything the rule predicates and the scorer need from
+a raw /recommend profile (BMI, tobacco status, condition flags, canonical
+medication names, lowercased rider list, ...) exactly once, instead of once per
+product.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple, Union
+
+from .build_chart import total_height_inches
+from .medications import default_medication_aliases
+
+
+def normalize_state(state: Any) -> Optional[str]:
+    """Upper-case, stripped state abbreviation, or None when no state is given."""
+    if not isinstance(state, str) or not state.strip():
+        return None
+    return state.strip().upper()
+
+
+def calculate_bmi(height_ft: Any, height_in: Any, weight: Any) -> Optional[float]:
+    """BMI from height in feet/inches and weight in pounds (None if any is missing or zero)."""
+    if not (height_ft and height_in and weight):
+        return None
+    total_inches = (height_ft * 12) + height_in
+    height_meters = total_inches * 0.0254
+    weight_kg = weight * 0.453592
+    return weight_kg / (height_meters ** 2)
+
+
+@dataclass(frozen=True)
+class ProfileContext:
+    """Immutable profile plus the values derived from it, built once per request."""
+
+    profile: Mapping[str, Any]  # Read-only copy of the raw fields (knockout flags, conditions)
+    state: Optional[str]  # Normalized abbreviation (None = don't filter by state)
+    age: Any
+    desired_coverage: Any
+    term_length: Any
+    coverage_type: str  # Lowercased
+    gender: Any
+    height_ft: Any
+    height_in: Any
+    weight: Any
+    bmi: Optional[float]
+    # Total inches, for build chart rows (None if not whole feet/inches)
+    height_inches: Optional[int]
+    has_conditions: bool
+    tobacco_status: Any
+    medications: Tuple[Any, ...]
+    medications_canonical: FrozenSet[str]  # Brand/generic aliases resolved
+    rider_preferences: Tuple[Any, ...]
+    rider_preferences_lower: Tuple[str, ...]
+    dui_count_recent: Any
+    major_violations: Any
+    felony_within_lookback: Any
+    hazardous_avocation: Any
+    aviation_activity: Any
+    nicotine_without_tobacco: bool
+    prior_decline: Any
+    prior_decline_carrier: str  # Lowercased
+
+    @classmethod
+    def from_profile(cls, profile: Mapping[str, Any]) -> "ProfileContext":
+        """Derive a context from a raw client profile dict."""
+        height_ft = profile.get('height_ft')
+        height_in = profile.get('height_in')
+        weight = profile.get('weight')
+
+        medical_conditions = profile.get('medical_conditions', {})
+        has_conditions = (
+            any(medical_conditions.values())
+            if isinstance(medical_conditions, dict)
+            else bool(medical_conditions)
+        )
+
+        medications = tuple(profile.get('medications', []))
+        rider_preferences = tuple(profile.get('rider_preferences', []))
+
+        return cls(
+            profile=MappingProxyType(dict(profile)),
+            state=normalize_state(profile.get('state')),
+            age=profile.get('age', 0),
+            desired_coverage=profile.get('desired_coverage', 0),
+            term_length=profile.get('term_length'),
+            coverage_type=profile.get('coverage_type', '').lower(),
+            gender=profile.get('gender', 'M'),
+            height_ft=height_ft,
+            height_in=height_in,
+            weight=weight,
+            bmi=calculate_bmi(height_ft, height_in, weight),
+            height_inches=total_height_inches(height_ft, height_in),
+            has_conditions=has_conditions,
+            tobacco_status=profile.get(
+                'tobacco_status', 'non-tobacco' if not profile.get('smoker') else 'tobacco'
+            ),
+            medications=medications,
+            medications_canonical=default_medication_aliases().canonicalize(medications),
+            rider_preferences=rider_preferences,
+            rider_preferences_lower=tuple(r.lower() for r in rider_preferences),
+            dui_count_recent=profile.get('dui_count_recent', 0),
+            major_violations=profile.get('major_violations', 0),
+            felony_within_lookback=profile.get('felony_within_lookback', False),
+            hazardous_avocation=profile.get('hazardous_avocation', False),
+            aviation_activity=profile.get('aviation_activity', False),
+            nicotine_without_tobacco=bool(
+                profile.get('nicotine_use') and not profile.get('tobacco_use')
+            ),
+            prior_decline=profile.get('prior_decline', False),
+            prior_decline_carrier=profile.get('prior_decline_carrier', '').lower(),
+        )
+
+    @classmethod
+    def ensure(cls, profile: Union["ProfileContext", Mapping[str, Any]]) -> "ProfileContext":
+        """Return profile unchanged if it is already a context, else derive one."""
+        if isinstance(profile, cls):
+            return profile
+        return cls.from_profile(profile)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a raw profile field."""
+        return self.profile.get(key, default)
+
+    def fingerprint(self, fields: Iterable[str]) -> str:
+        """Canonical digest of the given raw fields.
+
+        A field that is present (even as None) is distinguished from one that is missing.
+        """
+        relevant: Dict[str, Any] = {
+            field: self.profile[field] for field in fields if field in self.profile
+        }
+        canonical = json.dumps(relevant, sort_keys=True, separators=(',', ':'), default=repr)
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,230 @@
+"""
+Compiled, process-wide rule set for the rules-based engine.
+
+The YAML product rules under carriers/ are parsed once into a RuleSet that is
+shared by every request and versioned with a content hash of its source files.
+The cache re-checks file stats at most every ``check_interval`` seconds and only
+rebuilds when the content of a file under carriers/ actually changes. A matching
+binary snapshot (see snapshot.py) skips YAML parsing and compilation entirely.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .assigner import CarrierRule, rule_from_dict
+from .catalog import CompiledCatalog
+from .snapshot import DEFAULT_SNAPSHOT_PATH, read_snapshot
+from .yaml_loader import safe_load
+
+logger = logging.getLogger("carrier_predictor")
+
+# Default location of the product YAML catalog (carrier-predictor/carriers)
+DEFAULT_CARRIERS_DIR = Path(__file__).parent.parent.parent / "carriers"
+
+# (path, mtime_ns, size) for every source file, used for cheap change detection
+StatFingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+def discover_rule_files(carriers_dir: Path) -> List[Path]:
+    """List product YAML files under carriers_dir in a stable order."""
+    return sorted(Path(carriers_dir).glob("**/*.yaml"))
+
+
+def stat_fingerprint(paths: Iterable[Path]) -> StatFingerprint:
+    """Build a stat-based fingerprint (no file reads) for change detection."""
+    fingerprint = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        fingerprint.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+def read_sources(carriers_dir: Path) -> List[Tuple[str, bytes]]:
+    """Read every product YAML file as (path relative to carriers_dir, raw bytes)."""
+    base_path = Path(carriers_dir)
+    sources = []
+    for path in discover_rule_files(base_path):
+        try:
+            sources.append((path.relative_to(base_path).as_posix(), path.read_bytes()))
+        except OSError as e:
+            logger.warning(f"Failed to read {path}: {e}")
+    return sources
+
+
+def content_version(sources: Iterable[Tuple[str, bytes]]) -> str:
+    """Hash (relative path, content) pairs into a short rule-set version string."""
+    digest = hashlib.sha256()
+    for name, content in sources:
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content)
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """Immutable, versioned collection of CarrierRule objects.
+
+    Iterating a RuleSet yields its rules, so it can be passed anywhere a list of
+    CarrierRule is accepted (e.g. ``assign(profile, rule_set)``). The columnar
+    CompiledCatalog is built once alongside the rules and shared by every request.
+    """
+
+    rules: Tuple[CarrierRule, ...]
+    version: str
+    source_files: Tuple[str, ...] = ()
+    built_at: float = 0.0
+    catalog: CompiledCatalog = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "catalog", CompiledCatalog(self.rules))
+
+    def __iter__(self) -> Iterator[CarrierRule]:
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @classmethod
+    def load(
+        cls, carriers_dir: Optional[Path] = None, snapshot_path: Optional[Path] = None
+    ) -> "RuleSet":
+        """Read, hash and parse every product YAML file under carriers_dir.
+
+        Args:
+            carriers_dir: Directory containing product YAML files
+            snapshot_path: Binary snapshot to use instead of parsing, if it matches
+        """
+        return cls.from_sources(read_sources(carriers_dir or DEFAULT_CARRIERS_DIR), snapshot_path)
+
+    @classmethod
+    def from_sources(
+        cls, sources: List[Tuple[str, bytes]], snapshot_path: Optional[Path] = None
+    ) -> "RuleSet":
+        """Parse already-read (relative path, content) pairs into a RuleSet.
+
+        Args:
+            sources: (relative path, raw bytes) for every product YAML file
+            snapshot_path: Binary snapshot to use instead of parsing, if it matches
+        """
+        version = content_version(sources)
+        snapshot = read_snapshot(snapshot_path, version)
+        if snapshot is not None:
+            logger.info(f"Loaded rule set {version} from snapshot {snapshot_path}")
+            return snapshot
+
+        rules = []
+        for name, content in sources:
+            try:
+                data = safe_load(content)
+                if data:  # Skip empty files
+                    rules.append(rule_from_dict(data, hashlib.sha256(content).hexdigest()[:16]))
+            except Exception as e:
+                # One malformed product file must not take down the whole catalog
+                logger.warning(f"Skipping {name}: {type(e).__name__}: {e}")
+
+        return cls(
+            rules=tuple(rules),
+            version=version,
+            source_files=tuple(name for name, _ in sources),
+            built_at=time.time(),
+        )
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[CarrierRule]) -> "RuleSet":
+        """Wrap an in-memory list of rules (e.g. built by tests) in a RuleSet."""
+        rules = tuple(rules)
+        sources = [(f"{r.carrier}/{r.product}", repr(r).encode("utf-8")) for r in rules]
+        return cls(rules=rules, version=content_version(sources), built_at=time.time())
+
+
+class RuleSetCache:
+    """Process-wide holder of the current RuleSet.
+
+    ``get()`` is cheap on the hot path: it only stats the source files once per
+    ``check_interval`` and only re-reads them when a stat changed. A rebuild
+    happens when the content hash differs from the served version.
+    """
+
+    def __init__(
+        self,
+        carriers_dir: Optional[Path] = None,
+        check_interval: float = 2.0,
+        snapshot_path: Optional[Path] = DEFAULT_SNAPSHOT_PATH,
+    ):
+        """Initialize the cache.
+
+        Args:
+            carriers_dir: Directory containing product YAML files
+            check_interval: Minimum seconds between change checks
+            snapshot_path: Binary snapshot consulted before parsing YAML (None to disable)
+        """
+        self.carriers_dir = Path(carriers_dir) if carriers_dir else DEFAULT_CARRIERS_DIR
+        self.check_interval = check_interval
+        self.snapshot_path = snapshot_path
+        self._rule_set: Optional[RuleSet] = None
+        self._fingerprint: StatFingerprint = ()
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> RuleSet:
+        """Return the current RuleSet, rebuilding it if a source file changed."""
+        rule_set = self._rule_set
+        if rule_set is not None and time.monotonic() - self._last_check < self.check_interval:
+            return rule_set
+
+        with self._lock:
+            if self._rule_set is None:
+                self._build()
+            elif time.monotonic() - self._last_check >= self.check_interval:
+                self._refresh_if_changed()
+            return self._rule_set
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether a rule set has been built (get() won't parse YAML)."""
+        return self._rule_set is not None
+
+    def reload(self) -> RuleSet:
+        """Force a rebuild from disk."""
+        with self._lock:
+            self._build()
+            return self._rule_set
+
+    def _build(self) -> None:
+        fingerprint = stat_fingerprint(discover_rule_files(self.carriers_dir))
+        self._rule_set = RuleSet.load(self.carriers_dir, self.snapshot_path)
+        self._fingerprint = fingerprint
+        self._last_check = time.monotonic()
+        logger.info(
+            f"Built rule set {self._rule_set.version} with {len(self._rule_set)} products"
+        )
+
+    def _refresh_if_changed(self) -> None:
+        self._last_check = time.monotonic()
+        fingerprint = stat_fingerprint(discover_rule_files(self.carriers_dir))
+        if fingerprint == self._fingerprint:
+            return
+
+        # Stats changed (touch, checkout, editor save): only re-parse if content did
+        sources = read_sources(self.carriers_dir)
+        if content_version(sources) != self._rule_set.version:
+            previous = self._rule_set.version
+            self._rule_set = RuleSet.from_sources(sources, self.snapshot_path)
+            logger.info(f"Rule set changed: {previous} -> {self._rule_set.version}")
+
+        # Only after a successful rebuild, so a failed one is retried on the next check
+        self._fingerprint = fingerprint
+
+
+# Global rule set cache instance
+rule_set_cache = RuleSetCache()
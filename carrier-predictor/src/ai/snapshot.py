@@ -0,0 +1,172 @@
+"""
+Binary snapshot of the compiled rule set for fast cold start.
+
+Parsing the YAML catalog and compiling it into a RuleSet dominates process
+start-up. ``scripts/build_rules_snapshot.py`` pickles the finished RuleSet
+(rules, interval indexes and the columnar CompiledCatalog) to
+``data/index/rules_snapshot.pkl``, and RuleSet.load() uses it when its key still
+matches: the content hash of the source YAML files plus a hash of the modules
+that compile them. Any mismatch or unreadable file falls back to parsing YAML.
+
+The same script snapshots the parsed ``src/config/carriers.yaml`` (the carrier
+table RulesEngine reads on every start) to
+``data/index/carriers_config_snapshot.pkl``, keyed by the file's content hash.
+
+Snapshots are pickles: only load files built by this service's own deploy.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .medications import DEFAULT_MEDICATION_REFERENCE
+from .yaml_loader import safe_load
+
+if TYPE_CHECKING:
+    from .ruleset import RuleSet
+
+logger = logging.getLogger("carrier_predictor")
+
+# Bump when the snapshot payload layout changes
+SNAPSHOT_FORMAT = 1
+
+# Default snapshot location (carrier-predictor/data/index, rebuilt on deploy)
+DEFAULT_SNAPSHOT_PATH = (
+    Path(__file__).parent.parent.parent / "data" / "index" / "rules_snapshot.pkl"
+)
+DEFAULT_CONFIG_SNAPSHOT_PATH = DEFAULT_SNAPSHOT_PATH.with_name("carriers_config_snapshot.pkl")
+
+# Modules whose code shapes the pickled objects; editing any of them invalidates snapshots
+COMPILER_MODULES = (
+    "assigner.py",
+    "bitset.py",
+    "build_chart.py",
+    "candidate_index.py",
+    "catalog.py",
+    "codegen.py",
+    "intervals.py",
+    "medications.py",
+    "profile.py",
+    "ruleset.py",
+)
+
+
+@lru_cache(maxsize=1)
+def compiler_version() -> str:
+    """Hash of the rule compiler's source code and the medication aliases it applies."""
+    digest = hashlib.sha256()
+    module_dir = Path(__file__).parent
+    for name in COMPILER_MODULES:
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update((module_dir / name).read_bytes())
+
+    # Medication lists are compiled to canonical names from the reference file's aliases
+    if DEFAULT_MEDICATION_REFERENCE.exists():
+        digest.update(DEFAULT_MEDICATION_REFERENCE.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def _dump(payload: Dict[str, Any], path: Path) -> Path:
+    """Pickle a payload next to path and rename it, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _load(path: Optional[Path], **key: Any) -> Optional[Dict[str, Any]]:
+    """Unpickle a payload if it exists and every key field matches."""
+    if path is None or not Path(path).exists():
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+
+    if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT:
+        logger.info(f"Snapshot {path} is stale; parsing YAML sources")
+        return None
+    if any(payload.get(field) != value for field, value in key.items()):
+        logger.info(f"Snapshot {path} is stale; parsing YAML sources")
+        return None
+    return payload
+
+
+def write_snapshot(rule_set: "RuleSet", path: Optional[Path] = None) -> Path:
+    """Write a RuleSet snapshot atomically.
+
+    Args:
+        rule_set: Compiled rule set to persist
+        path: Snapshot file (default: DEFAULT_SNAPSHOT_PATH)
+
+    Returns:
+        Path the snapshot was written to
+    """
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "compiler": compiler_version(),
+        "version": rule_set.version,
+        "rule_set": rule_set,
+    }
+    return _dump(payload, Path(path or DEFAULT_SNAPSHOT_PATH))
+
+
+def read_snapshot(path: Optional[Path], version: str) -> Optional["RuleSet"]:
+    """Load a snapshot if it exists and was built from the same sources and compiler.
+
+    Args:
+        path: Snapshot file
+        version: Content version of the current source files
+
+    Returns:
+        The snapshotted RuleSet, or None if missing, stale or unreadable
+    """
+    payload = _load(path, compiler=compiler_version(), version=version)
+    return None if payload is None else payload["rule_set"]
+
+
+def write_config_snapshot(content: bytes, path: Optional[Path] = None) -> Path:
+    """Parse carriers.yaml content and snapshot the result atomically.
+
+    Args:
+        content: Raw bytes of carriers.yaml
+        path: Snapshot file (default: DEFAULT_CONFIG_SNAPSHOT_PATH)
+
+    Returns:
+        Path the snapshot was written to
+    """
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "data": safe_load(content),
+    }
+    return _dump(payload, Path(path or DEFAULT_CONFIG_SNAPSHOT_PATH))
+
+
+def read_config_snapshot(content: bytes, path: Optional[Path]) -> Optional[Dict[str, Any]]:
+    """Parsed carriers.yaml from a snapshot built from exactly this content.
+
+    Args:
+        content: Raw bytes of the current carriers.yaml
+        path: Snapshot file
+
+    Returns:
+        The parsed mapping, or None if the snapshot is missing, stale or unreadable
+    """
+    payload = _load(path, sha256=hashlib.sha256(content).hexdigest())
+    return None if payload is None else payload["data"]
@@ -0,0 +1,259 @@
+"""
+Rejection tracing for the eligibility screen.
+
+CompiledCatalog.eligibility_mask() answers which products a profile is
+eligible for, but not why the others were dropped. trace_eligibility() runs
+the same screen one predicate family at a time, in CarrierRule evaluation
+order, and records for every product the first stage that rejected it, plus
+the nanoseconds each stage took. assign(..., trace=True) uses it in place of
+eligibility_mask(), so the untraced path is unchanged.
+
+Every trace also feeds the process-wide ``trace_counters``: traced requests,
+rejections by stage and total time by stage.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bitset import bits_to_mask
+from .profile import ProfileContext
+
+if TYPE_CHECKING:
+    from .catalog import CompiledCatalog
+
+# Eligibility stages in the order CarrierRule.is_eligible_interpreted() applies them
+STAGES = (
+    'state',
+    'prior_decline',
+    'age',
+    'face',
+    'term',
+    'knockout',
+    'build',
+    'medication',
+    'driving',
+    'felony',
+    'avocation',
+    'aviation',
+    'nicotine',
+)
+
+
+def _in_table(catalog: "CompiledCatalog", age: Any) -> bool:
+    return isinstance(age, int) and 0 <= age < len(catalog.age_ok)
+
+
+def _state(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    return ~catalog.state_mask(context.state)
+
+
+def _prior_decline(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    failed = np.zeros(catalog.size, dtype=bool)
+    prior_decline_carrier = context.prior_decline_carrier
+    if prior_decline_carrier:
+        failed |= np.array(
+            [prior_decline_carrier in carrier for carrier in catalog.carrier_lower], dtype=bool
+        )
+    if context.prior_decline:
+        failed |= catalog.full_medical_single_tier
+    return failed
+
+
+def _age(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    age = context.age
+    if _in_table(catalog, age):
+        return ~catalog.age_ok[age]
+    return ~np.array([rule.supports_age(age) for rule in catalog.rules], dtype=bool)
+
+
+def _face(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    age, face = context.age, context.desired_coverage
+    if not face:
+        return np.ones(catalog.size, dtype=bool)
+    if _in_table(catalog, age):
+        return ~((catalog.face_min[age] <= face) & (face <= catalog.face_max[age]))
+    return ~np.array([rule.supports_face(face, age) for rule in catalog.rules], dtype=bool)
+
+
+def _term(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    if not context.term_length:
+        return np.zeros(catalog.size, dtype=bool)
+    return ~catalog.term_mask(context.term_length, context.age)
+
+
+def _knockout(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    return bits_to_mask(catalog.knockout_bits(context), catalog.size)
+
+
+def _build(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    failed = np.zeros(catalog.size, dtype=bool)
+    bmi = context.bmi
+    if bmi is not None:
+        caps = catalog.bmi_caps[catalog.bmi_cap_rows.get(context.gender, -1)]
+        failed |= catalog.has_build & (bmi > caps)
+        row = catalog._build_row(context.height_inches)
+        if row is not None:
+            weight = context.weight
+            in_range = (catalog.build_weight_low[row] <= weight) & (
+                weight <= catalog.build_weight_high[row]
+            )
+            failed |= ~in_range
+    return failed
+
+
+def _medication(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    failed = np.zeros(catalog.size, dtype=bool)
+    profile_meds = context.medications_canonical
+    rejected = 0
+    for med in profile_meds:
+        rejected |= catalog.rejected_medications.get(med, 0)
+    if rejected:
+        failed |= bits_to_mask(rejected, catalog.size)
+    for condition, required_meds, i in catalog.required_medications:
+        if context.get(condition, False) and not required_meds & profile_meds:
+            failed[i] = True
+    return failed
+
+
+def _driving(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+    return (context.dui_count_recent > catalog.max_dui) | (
+        context.major_violations > catalog.max_major_violations
+    )
+
+
+def _flag(flag: str, bans: str) -> Callable[["CompiledCatalog", ProfileContext], np.ndarray]:
+    def failed(catalog: "CompiledCatalog", context: ProfileContext) -> np.ndarray:
+        if getattr(context, flag):
+            return getattr(catalog, bans).copy()
+        return np.zeros(catalog.size, dtype=bool)
+    return failed
+
+
+_STAGE_CHECKS: Tuple[Callable[["CompiledCatalog", ProfileContext], np.ndarray], ...] = (
+    _state,
+    _prior_decline,
+    _age,
+    _face,
+    _term,
+    _knockout,
+    _build,
+    _medication,
+    _driving,
+    _flag('felony_within_lookback', 'bans_felony'),
+    _flag('hazardous_avocation', 'bans_hazardous_avocation'),
+    _flag('aviation_activity', 'bans_aviation'),
+    _flag('nicotine_without_tobacco', 'bans_nicotine_non_tobacco'),
+)
+
+
+@dataclass
+class EligibilityTrace:
+    """Why each product was or wasn't eligible for one profile."""
+
+    catalog: "CompiledCatalog"
+    first_failure: List[Optional[str]]  # Per product: first rejecting stage, None if eligible
+    stage_ns: Dict[str, int]  # Nanoseconds spent per stage
+
+    @property
+    def eligible_mask(self) -> np.ndarray:
+        """Boolean mask of eligible products (equals eligibility_mask())."""
+        return np.array([stage is None for stage in self.first_failure], dtype=bool)
+
+    def rejected_by_stage(self) -> Dict[str, int]:
+        """Number of products each stage was the first to reject."""
+        counts = dict.fromkeys(STAGES, 0)
+        for stage in self.first_failure:
+            if stage is not None:
+                counts[stage] += 1
+        return counts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable trace for API responses."""
+        return {
+            'eligible': self.first_failure.count(None),
+            'rejected_by_stage': self.rejected_by_stage(),
+            'rejections': [
+                {'carrier': rule.carrier, 'product': rule.product, 'stage': stage}
+                for rule, stage in zip(self.catalog.rules, self.first_failure)
+                if stage is not None
+            ],
+            'stage_ns': dict(self.stage_ns),
+        }
+
+
+def trace_eligibility(catalog: "CompiledCatalog", profile: Any) -> EligibilityTrace:
+    """Screen a profile stage by stage, recording first failures and timings.
+
+    Every stage is evaluated for the whole catalog (not only the products still
+    standing), so the timings are comparable across requests.
+
+    Args:
+        catalog: Compiled catalog to screen
+        profile: Raw profile dict or ProfileContext
+
+    Returns:
+        EligibilityTrace (also added to ``trace_counters``)
+    """
+    context = ProfileContext.ensure(profile)
+    first_failure: List[Optional[str]] = [None] * catalog.size
+    remaining = np.ones(catalog.size, dtype=bool)
+    stage_ns: Dict[str, int] = {}
+
+    for stage, check in zip(STAGES, _STAGE_CHECKS):
+        start = time.perf_counter_ns()
+        failed = check(catalog, context)
+        stage_ns[stage] = time.perf_counter_ns() - start
+
+        newly_rejected = failed & remaining
+        for index in np.flatnonzero(newly_rejected).tolist():
+            first_failure[index] = stage
+        remaining &= ~newly_rejected
+
+    trace = EligibilityTrace(catalog, first_failure, stage_ns)
+    trace_counters.record(trace)
+    return trace
+
+
+class TraceCounters:
+    """Process-wide totals over every traced evaluation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        with self._lock:
+            self.traces = 0
+            self.rejections = dict.fromkeys(STAGES, 0)
+            self.stage_ns = dict.fromkeys(STAGES, 0)
+
+    def record(self, trace: EligibilityTrace) -> None:
+        """Add one trace's rejections and timings."""
+        rejected = trace.rejected_by_stage()
+        with self._lock:
+            self.traces += 1
+            for stage in STAGES:
+                self.rejections[stage] += rejected[stage]
+                self.stage_ns[stage] += trace.stage_ns.get(stage, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return traced request count, rejections by stage and time by stage."""
+        with self._lock:
+            return {
+                "traces": self.traces,
+                "rejections": dict(self.rejections),
+                "stage_ns_total": dict(self.stage_ns),
+                "stage_ns_mean": {
+                    stage: (ns / self.traces if self.traces else 0.0)
+                    for stage, ns in self.stage_ns.items()
+                },
+            }
+
+
+# Global counters behind GET /recommend/trace
+trace_counters = TraceCounters()
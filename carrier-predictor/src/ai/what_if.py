@@ -0,0 +1,100 @@
+"""
+What-if grids: one profile re-evaluated across ages, face amounts and term lengths.
+
+Agents ask "what if we drop to $10k?" or "what changes at their next
+birthday?". Rather than one assign() per scenario, what_if_grid() checks the
+parts of eligibility that don't move (state, knockouts, health, prior decline)
+once, broadcasts the grid axes against the catalog's dense age and face tables,
+and vectorizes the age- and face-dependent parts of scoring. Each cell ranks
+its eligible products exactly as assign() would for that scenario.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .profile import ProfileContext
+from .ruleset import RuleSet
+
+# Largest grid (ages x face amounts x term lengths) one request may evaluate
+MAX_GRID_CELLS = 10000
+
+
+def _product_summary(rule: Any) -> Dict[str, Any]:
+    """Identifying fields of a product, listed once per grid response."""
+    return {
+        'carrier': rule.carrier,
+        'product': rule.product,
+        'type': rule.type,
+        'underwriting_type': rule.underwriting_type,
+        'premium_tier': rule.typical_premium_tier,
+    }
+
+
+def what_if_grid(
+    profile: Dict[str, Any],
+    rule_set: RuleSet,
+    ages: Sequence[int],
+    face_amounts: Sequence[float],
+    term_lengths: Sequence[Any] = (None,),
+) -> Dict[str, Any]:
+    """Eligible products, best first, for every age/face/term combination.
+
+    Args:
+        profile: Base client profile (its own age, desired_coverage and
+            term_length are replaced by each cell's values)
+        rule_set: Compiled rule set to evaluate against
+        ages: Integer issue ages (0-120)
+        face_amounts: Face amounts
+        term_lengths: Term lengths; None evaluates without a requested term
+
+    Returns:
+        Dict with:
+            - products: Summaries of every product eligible in some cell
+            - cells: One entry per combination (age-major, then face amount,
+              then term length) with age, desired_coverage, term_length, the
+              eligible products best first (indexes into ``products``) and
+              their scores
+            - rule_set_version: Content hash of the rule set used
+
+    Raises:
+        ValueError: If an age is outside the age table or the grid is too large
+    """
+    cell_count = len(ages) * len(face_amounts) * len(term_lengths)
+    if cell_count > MAX_GRID_CELLS:
+        raise ValueError(f"Grid has {cell_count} cells; the limit is {MAX_GRID_CELLS}")
+
+    catalog = rule_set.catalog
+    context = ProfileContext.ensure(profile)
+    eligible = catalog.grid_eligibility_mask(context, ages, face_amounts, term_lengths)
+    scored = eligible.any(axis=(0, 1, 2))
+    scores = catalog.grid_scores(context, ages, face_amounts, scored)
+
+    # Highest score first, ties in catalog order, as assign() ranks them
+    ranking = np.where(eligible, scores[:, :, None, :], -np.inf)
+    counts = eligible.sum(axis=-1)
+    # Only the first max(counts) columns hold eligible products
+    order = np.argsort(-ranking, axis=-1, kind='stable')[..., :int(counts.max(initial=0))]
+    ranked_scores = np.take_along_axis(ranking, order, axis=-1).tolist()
+    order = order.tolist()
+    counts = counts.tolist()
+
+    product_ids = {index: n for n, index in enumerate(np.flatnonzero(scored).tolist())}
+    cells: List[Dict[str, Any]] = []
+    for a, age in enumerate(ages):
+        for f, face in enumerate(face_amounts):
+            for t, term_length in enumerate(term_lengths):
+                count = counts[a][f][t]
+                cells.append({
+                    'age': age,
+                    'desired_coverage': face,
+                    'term_length': term_length,
+                    'products': [product_ids[index] for index in order[a][f][t][:count]],
+                    'scores': ranked_scores[a][f][t][:count],
+                })
+
+    return {
+        'products': [_product_summary(catalog.rules[index]) for index in product_ids],
+        'cells': cells,
+        'rule_set_version': rule_set.version,
+    }
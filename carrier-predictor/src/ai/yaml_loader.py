@@ -0,0 +1,18 @@
+"""
+YAML loading for rule catalogs.
+
+Uses libyaml's C loader when PyYAML was built with it (several times faster on
+the product catalog) and falls back to the pure-Python SafeLoader otherwise.
+Both only construct plain Python types.
+"""
+
+from typing import Any
+
+import yaml
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def safe_load(stream: Any) -> Any:
+    """Drop-in replacement for ``yaml.safe_load`` that prefers the C loader."""
+    return yaml.load(stream, Loader=SafeLoader)
@@ -3,13 +3,16 @@
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from .routers import kb_router, predict_router
-from .services import embedder_service, logger
+from .ai.autocomplete import autocomplete_index
+from .ai.medication_reference import default_medication_reference
+from .ai.ruleset import rule_set_cache
+from .routers import kb_router, medications_router, predict_router
+from .services import embedder_service, logger, query_embedding_cache, settings
 
 
 @asynccontextmanager
@@ -18,15 +21,30 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Carrier Predictor API (Rules Engine)")
 
-    # NOTE: Legacy RAG/FAISS system no longer loaded on startup
-    # The new rules-based engine (/recommend) doesn't require embeddings
-    # Legacy /recommend-carriers endpoint still available for backward compatibility
+    # Build the shared rule set once so the first /recommend doesn't pay for YAML parsing
+    rule_set_cache.check_interval = settings.rules_check_interval
+    rule_set = rule_set_cache.get()
+    logger.info(f"Rule set {rule_set.version} ready with {len(rule_set)} products")
+
+    # Compile the medication reference used by /medications and condition inference
+    medication_reference = default_medication_reference()
+    logger.info(f"Medication reference ready with {len(medication_reference)} medications")
+    logger.info(f"Autocomplete index ready with {len(autocomplete_index(rule_set))} terms")
+
+    # The rules engine (/recommend) doesn't need embeddings: the model for the legacy
+    # /recommend-carriers endpoint loads on first use, or in the background if enabled
+    if settings.warm_embedder:
+        embedder_service.start_warmup()
+        logger.info("Warming up embedding model in the background")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Carrier Predictor API")
 
+    # Keep query embeddings across restarts (only if a cache path is configured)
+    query_embedding_cache.save()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -48,6 +66,7 @@ app.add_middleware(
 # Include routers
 app.include_router(predict_router, tags=["Predictions"])
 app.include_router(kb_router, tags=["Knowledge Base"])
+app.include_router(medications_router, tags=["Medications"])
 
 
 @app.get("/health")
@@ -64,6 +83,33 @@ async def health_check() -> dict:
     }
 
 
+@app.get("/ready")
+async def readiness_check(
+    response: Response,
+    require_retrieval: bool = Query(
+        False, description="Also require the embedding model and FAISS index (RAG workers)"
+    ),
+) -> dict:
+    """Readiness probe, distinct from /health (liveness).
+
+    Ready once the rule set is built. With require_retrieval, also waits for
+    the embedding model and index (see settings.warm_embedder).
+
+    Returns:
+        Readiness of the rules engine and of retrieval; HTTP 503 while not ready
+    """
+    rules_ready = rule_set_cache.is_loaded
+    retrieval = embedder_service.readiness()
+    ready = rules_ready and (retrieval["ready"] or not require_retrieval)
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "rules_ready": rules_ready,
+        "retrieval": retrieval,
+    }
+
+
 # Serve frontend static files if they exist
 frontend_path = Path(__file__).parent.parent / "frontend" / "build"
 if frontend_path.exists():
@@ -74,7 +120,11 @@ if frontend_path.exists():
     async def serve_frontend_routes(full_path: str):
         """Serve frontend for all routes (SPA routing)"""
         # Check if it's an API endpoint
-        if full_path.startswith(("health", "recommend", "recommend-carriers", "kb/", "docs", "redoc", "openapi.json")):
+        api_prefixes = (
+            "health", "ready", "recommend", "recommend-carriers", "kb/",
+            "docs", "redoc", "openapi.json",
+        )
+        if full_path.startswith(api_prefixes):
             return None
 
         # Try to serve the file if it exists
@@ -99,6 +149,7 @@ else:
             "primary_endpoint": "/recommend",
             "endpoints": {
                 "health": "/health",
+                "ready": "/ready",
                 "docs": "/docs",
                 "recommend": "/recommend (PRIMARY - rules-based)",
                 "recommend_legacy": "/recommend-carriers (DEPRECATED - RAG-based)",
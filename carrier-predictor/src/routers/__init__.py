@@ -1,6 +1,7 @@
 """Routers package."""
 
 from .kb import router as kb_router
+from .medications import router as medications_router
 from .predict import router as predict_router
 
-__all__ = ["predict_router", "kb_router"]
+__all__ = ["predict_router", "kb_router", "medications_router"]
@@ -5,7 +5,14 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException
 
 from ..schemas import IngestRequest, IngestResponse
-from ..services import embedder_service, generate_request_id, kb_loader, logger, set_request_id
+from ..services import (
+    embedder_service,
+    generate_request_id,
+    kb_ingestor,
+    logger,
+    query_embedding_cache,
+    set_request_id,
+)
 
 router = APIRouter()
 
@@ -15,13 +22,13 @@ async def ingest_documents(request: IngestRequest) -> IngestResponse:
     """Ingest documents into the knowledge base.
 
     Args:
-        request: Ingest request with directory path
+        request: Ingest request with directory path and rebuild flag
 
     Returns:
-        Number of files and chunks indexed
+        Number of files and chunks indexed, and what this run re-embedded
 
     Raises:
-        HTTPException: If directory doesn't exist or ingestion fails
+        HTTPException: If directory doesn't exist, holds no documents or ingestion fails
     """
     # Generate request ID
     request_id = generate_request_id()
@@ -38,32 +45,29 @@ async def ingest_documents(request: IngestRequest) -> IngestResponse:
         raise HTTPException(status_code=400, detail=f"Path is not a directory: {request.path}")
 
     try:
-        # Load documents
-        chunks = kb_loader.load_documents(request.path)
-
-        if not chunks:
-            raise HTTPException(
-                status_code=400,
-                detail="No documents found or no text extracted. "
-                "Ensure directory contains .pdf, .html, or .txt files.",
-            )
-
-        # Count unique files
-        unique_files = set(chunk.source_path for chunk in chunks)
-        num_files = len(unique_files)
-
-        # Build index
-        embedder_service.build_index(chunks)
-
-        # Save index
-        embedder_service.save_index()
-
-        logger.info(f"Successfully indexed {num_files} files with {len(chunks)} chunks")
-
-        return IngestResponse(indexed_files=num_files, chunks=len(chunks))
-
-    except HTTPException:
-        raise
+        # Only new, changed and removed files are (re-)embedded
+        report = kb_ingestor.ingest(request.path, rebuild=request.rebuild)
+
+        logger.info(
+            f"Successfully indexed {report.total_files} files "
+            f"with {report.total_chunks} chunks"
+        )
+
+        return IngestResponse(
+            indexed_files=report.total_files,
+            chunks=report.total_chunks,
+            files_added=report.files_added,
+            files_changed=report.files_changed,
+            files_removed=report.files_removed,
+            files_unchanged=report.files_unchanged,
+            chunks_embedded=report.chunks_embedded,
+            chunks_reused=report.chunks_reused,
+            full_rebuild=report.full_rebuild,
+        )
+
+    except ValueError as e:
+        # Nothing to index: raised before the existing index is touched
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error during knowledge base ingest: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
@@ -83,3 +87,13 @@ async def kb_status() -> dict:
         "dimension": info.get("dimension", 0),
         "model_name": info.get("model_name", ""),
     }
+
+
+@router.get("/kb/query-cache")
+async def kb_query_cache_stats() -> dict:
+    """Get query embedding cache counters.
+
+    Returns:
+        Dict with size, max_size, hits, misses, evictions, hit_rate and persist_path
+    """
+    return query_embedding_cache.stats()
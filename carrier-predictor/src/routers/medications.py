@@ -0,0 +1,73 @@
+"""Medication reference router."""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Query
+
+from ..ai.autocomplete import MAX_SUGGESTIONS, autocomplete_index
+from ..ai.medication_reference import default_medication_reference
+from ..ai.ruleset import rule_set_cache
+
+router = APIRouter()
+
+
+@router.get("/medications/{name}")
+async def lookup_medication(name: str) -> Dict[str, Any]:
+    """Look up which conditions a medication indicates.
+
+    Args:
+        name: Generic or brand name (case-insensitive), e.g. "Coumadin"
+
+    Returns:
+        Canonical generic, brands, and for each indicated condition its
+        severity and per-box carrier positioning
+
+    Raises:
+        HTTPException: If the medication is not in the reference guide
+    """
+    match = default_medication_reference().lookup(name)
+    if match is None:
+        raise HTTPException(status_code=404, detail=f"Medication not in reference guide: {name}")
+    return match.to_dict(query=name)
+
+
+@router.post("/medications/resolve")
+async def resolve_medications(medications: List[str] = Body(..., embed=True)) -> Dict[str, Any]:
+    """Look up a client's medication list in one call.
+
+    Args:
+        medications: Generic or brand names
+
+    Returns:
+        Per-medication results, the conditions they indicate (with the
+        medications pointing at each) and the unmatched names
+    """
+    return default_medication_reference().resolve(medications)
+
+
+@router.get("/autocomplete")
+async def autocomplete(
+    q: str = Query(..., description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    kind: Optional[Literal["medication", "condition", "accepted"]] = Query(
+        None, description="Only suggest terms of this kind"
+    ),
+) -> Dict[str, Any]:
+    """Suggest medication and condition names as an agent types.
+
+    Tolerates typos ("metforman" -> Metformin). Terms come from the medication
+    reference guide and the carrier ``accepted`` lists.
+
+    Args:
+        q: Partial query
+        limit: Maximum suggestions
+        kind: Optional term kind filter
+
+    Returns:
+        Dict with the query and ranked suggestions (term, kind, match, score)
+    """
+    index = autocomplete_index(rule_set_cache.get())
+    return {
+        "query": q,
+        "suggestions": [suggestion.to_dict() for suggestion in index.suggest(q, limit, kind)],
+    }
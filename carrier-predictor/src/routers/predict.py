@@ -1,21 +1,95 @@
 """Prediction router for carrier recommendations."""
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import json
+import tempfile
+from typing import Any, Dict, Iterator, Literal, Optional
 
-from ..schemas import ClientInput, RecommendationResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..schemas import ClientInput, RecommendationResponse, WhatIfRequest
 from ..services import (
     generate_request_id,
     logger,
     ranker_service,
     redact_phi,
+    result_cache,
     scorer_service,
     set_request_id,
+    settings,
 )
-from ..ai.assigner import load_rules, assign, render_response
+from ..ai.assigner import assign, render_greeting, render_response_body
+from ..ai.batch import iter_profiles
+from ..ai.condition_inference import apply_condition_inference
+from ..ai.profile import ProfileContext
+from ..ai.ruleset import RuleSet, rule_set_cache
+from ..ai.trace import trace_counters
+from ..ai.what_if import what_if_grid
 
 router = APIRouter()
 
+# Batch uploads larger than this are spooled to disk instead of held in memory
+BATCH_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _evaluate_profile(
+    profile: Dict[str, Any],
+    rule_set: RuleSet,
+    include_explanation: bool = True,
+    infer_conditions: bool = False,
+    trace: bool = False,
+) -> Dict[str, Any]:
+    """Run assign() and render_response() for one profile against a rule set.
+
+    Results are cached by rule set version and the catalog's fingerprint of the
+    profile, so near-duplicate profiles (e.g. differing only in name) share one
+    evaluation. The first_name greeting is applied after the cache lookup.
+
+    Args:
+        profile: Client profile dict
+        rule_set: Compiled rule set to evaluate against
+        include_explanation: Whether to render the explanation text
+        infer_conditions: Whether to add medical_conditions flags inferred from
+            the profile's medications before evaluating (reported under
+            ``condition_inference``; they affect scores, not eligibility)
+        trace: Whether to re-evaluate with rejection tracing (bypassing the
+            cached result) and report it under ``trace``
+
+    Returns:
+        Response body shared by /recommend and /recommend/batch
+    """
+    inference = None
+    if infer_conditions:
+        profile, inference = apply_condition_inference(profile)
+
+    # Derived once and shared by the cache key and the rules engine
+    context = ProfileContext.from_profile(profile)
+    cache_key = (rule_set.version, rule_set.catalog.fingerprint(context))
+    cached = result_cache.get(cache_key)
+
+    if cached is None or trace:
+        result = assign(context, rule_set, trace=trace)
+        recommendations = result.get('recommendations', [])
+        cached = {
+            "recommendations": recommendations,
+            "best_match": result.get('best_match'),
+            "budget_options": result.get('budget_options', []),
+            "alternatives": result.get('alternatives', []),
+            "fallback_triggered": len(recommendations) == 0,
+            "rule_set_version": rule_set.version,
+            "explanation_body": render_response_body(result),
+        }
+        result_cache.put(cache_key, cached)
+
+    response = {key: value for key, value in cached.items() if key != "explanation_body"}
+    if include_explanation:
+        response["explanation"] = render_greeting(profile, cached) + cached["explanation_body"]
+    if inference is not None:
+        response["condition_inference"] = inference.to_dict()
+    if trace:
+        response["trace"] = result["trace"]
+    return response
+
 
 @router.post("/recommend-carriers", response_model=RecommendationResponse)
 async def recommend_carriers(client_input: ClientInput) -> RecommendationResponse:
@@ -67,7 +141,13 @@ async def recommend_carriers(client_input: ClientInput) -> RecommendationRespons
 
 
 @router.post("/recommend")
-async def recommend_rules_based(profile: Dict[str, Any]) -> Dict[str, Any]:
+async def recommend_rules_based(
+    profile: Dict[str, Any],
+    infer_conditions: Optional[bool] = Query(
+        None, description="Infer medical_conditions from medications (default from settings)"
+    ),
+    trace: bool = Query(False, description="Report which predicate rejected each product"),
+) -> Dict[str, Any]:
     """Get carrier/product recommendations using rules-based engine.
 
     This endpoint uses deterministic YAML-based rules instead of RAG/AI inference.
@@ -79,15 +159,27 @@ async def recommend_rules_based(profile: Dict[str, Any]) -> Dict[str, Any]:
             - coverage_type (str): Type (Term, WL, FE, IUL)
             - smoker (bool): Tobacco use
             - state (str): State abbreviation
+            - term_length (int, optional): Requested term length in years (e.g. 20)
             - medical_conditions (dict): Medical history
+            - medications (list, optional): Generic or brand names
             - first_name (str, optional): Client first name
             - ... and other eligibility fields
+        infer_conditions: Add condition flags indicated by the medications
+            before evaluation (settings.infer_conditions_from_medications if unset)
+        trace: Report the first failing predicate of every rejected product and
+            the nanoseconds spent per eligibility stage
 
     Returns:
         Dict with:
             - recommendations: List of top 3 products
             - explanation: Formatted response text
             - fallback_triggered: Boolean indicating if no match found
+            - rule_set_version: Content hash of the rule set that served the request
+            - condition_inference: Conditions inferred from which medications and
+              a severity estimate; they adjust scores only, never eligibility
+              (only when inference is enabled)
+            - trace: Eligible count, rejections by stage, each rejected product's
+              stage and stage timings (only when trace is set)
 
     Example:
         {
@@ -108,35 +200,178 @@ async def recommend_rules_based(profile: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Received rules-based recommendation request: {safe_data}")
 
     try:
-        # Load rules and run assignment
-        rules = load_rules()
-        logger.info(f"Loaded {len(rules)} product rules")
+        # Shared compiled rule set (rebuilt only when carriers/ changes)
+        rule_set = rule_set_cache.get()
 
-        result = assign(profile, rules)
-        recommendations = result.get('recommendations', [])
+        if infer_conditions is None:
+            infer_conditions = settings.infer_conditions_from_medications
 
-        fallback_triggered = len(recommendations) == 0
-
-        # Format response
-        explanation = render_response(profile, result)
+        response = _evaluate_profile(
+            profile, rule_set, infer_conditions=infer_conditions, trace=trace
+        )
 
         logger.info(
-            f"Returning {len(recommendations)} recommendations "
-            f"(fallback_triggered={fallback_triggered})"
+            f"Returning {len(response['recommendations'])} recommendations "
+            f"(fallback_triggered={response['fallback_triggered']}, rule_set={rule_set.version})"
         )
 
-        return {
-            "recommendations": recommendations,
-            "best_match": result.get('best_match'),
-            "budget_options": result.get('budget_options', []),
-            "alternatives": result.get('alternatives', []),
-            "explanation": explanation,
-            "fallback_triggered": fallback_triggered,
-            "request_id": request_id,
-        }
+        return {**response, "request_id": request_id}
 
     except Exception as e:
         logger.error(f"Error generating rules-based recommendations: {e}", exc_info=True)
         raise HTTPException(
             status_code=500, detail="Internal error generating recommendations"
         )
+
+
+@router.post("/recommend/what-if")
+def recommend_what_if(request: WhatIfRequest) -> Dict[str, Any]:
+    """Re-run /recommend for a profile over a grid of ages, face amounts and term lengths.
+
+    Answers "what if we drop to $10k?" or "what changes at their next birthday?"
+    in one request. The grid is evaluated in one vectorized pass over the
+    compiled catalog, and each cell ranks products exactly as /recommend would
+    for that age, face amount and term length.
+
+    Returns:
+        Dict with:
+            - products: Carrier/product summaries referenced by the cells
+            - cells: Per age/face/term combination, the eligible products best
+              first (indexes into products) and their scores
+            - rule_set_version: Content hash of the rule set that served the request
+
+    Example:
+        {
+            "profile": {"age": 64, "state": "TX", "coverage_type": "Final Expense"},
+            "ages": {"start": 64, "stop": 66},
+            "face_amounts": [10000, 15000, 25000]
+        }
+    """
+    request_id = generate_request_id()
+    set_request_id(request_id)
+
+    safe_data = redact_phi(request.profile)
+    logger.info(
+        f"Received what-if request: {safe_data} over {len(request.ages)} ages x "
+        f"{len(request.face_amounts)} face amounts x {len(request.term_lengths)} terms"
+    )
+
+    try:
+        rule_set = rule_set_cache.get()
+        grid = what_if_grid(
+            request.profile, rule_set, request.ages, request.face_amounts, request.term_lengths
+        )
+        return {**grid, "request_id": request_id}
+
+    except Exception as e:
+        logger.error(f"Error evaluating what-if grid: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal error evaluating what-if grid")
+
+
+@router.get("/recommend/cache")
+async def recommend_cache_stats() -> Dict[str, Any]:
+    """Get /recommend result cache counters.
+
+    Returns:
+        Dict with size, max_size, ttl_seconds, hits, misses, evictions,
+        expirations and hit_rate
+    """
+    return result_cache.stats()
+
+
+@router.get("/recommend/trace")
+async def recommend_trace_stats() -> Dict[str, Any]:
+    """Get rejection counters aggregated over every traced evaluation.
+
+    Returns:
+        Dict with traces (traced evaluations), rejections (products first
+        rejected by each stage), stage_ns_total and stage_ns_mean
+    """
+    return trace_counters.stats()
+
+
+@router.post("/recommend/batch")
+async def recommend_batch(
+    request: Request,
+    input_format: Optional[Literal["jsonl", "csv"]] = Query(
+        None, alias="format", description="Upload format (defaults from Content-Type)"
+    ),
+    include_explanation: bool = Query(True, description="Render explanation text per profile"),
+    infer_conditions: Optional[bool] = Query(
+        None, description="Infer medical_conditions from medications (default from settings)"
+    ),
+) -> StreamingResponse:
+    """Re-screen a book of business against one shared rule set.
+
+    The request body is a JSONL upload (one /recommend profile per line) or a CSV
+    upload with a header row. CSV list columns (medications, rider_preferences) are
+    ';'-separated, and columns named ``medical_conditions.<name>`` fill the
+    medical_conditions dict.
+
+    Results stream back as NDJSON as profiles are evaluated, one line per profile:
+    the /recommend response body plus ``line`` (source line number), or
+    ``{"line": n, "error": "..."}`` for rows that can't be parsed or evaluated. The
+    final line is a summary: ``{"done": true, "processed": n, "errors": m, ...}``.
+
+    Example:
+        curl -X POST "http://localhost:8000/recommend/batch?include_explanation=false" \\
+             -H "Content-Type: application/x-ndjson" --data-binary @book.jsonl
+    """
+    request_id = generate_request_id()
+    set_request_id(request_id)
+
+    if input_format is None:
+        content_type = request.headers.get("content-type", "")
+        input_format = "csv" if "csv" in content_type else "jsonl"
+
+    # Spool the upload (to disk past BATCH_SPOOL_MAX_BYTES) so memory stays flat
+    upload = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    # Every profile in the upload is evaluated against the same rule set version
+    rule_set = rule_set_cache.get()
+    if infer_conditions is None:
+        infer_conditions = settings.infer_conditions_from_medications
+    logger.info(f"Starting batch re-screen ({input_format}, rule_set={rule_set.version})")
+
+    def stream_results() -> Iterator[bytes]:
+        # Sync generator: Starlette iterates it in a worker thread, off the event loop
+        set_request_id(request_id)
+        processed = 0
+        errors = 0
+
+        try:
+            for line_number, profile, error in iter_profiles(upload, input_format):
+                if profile is not None:
+                    try:
+                        result = _evaluate_profile(
+                            profile, rule_set, include_explanation, infer_conditions
+                        )
+                    except Exception as e:
+                        logger.warning(f"Batch line {line_number} failed: {type(e).__name__}")
+                        error = f"Evaluation failed: {type(e).__name__}"
+
+                if error is None:
+                    processed += 1
+                    body = {"line": line_number, **result}
+                else:
+                    errors += 1
+                    body = {"line": line_number, "error": error}
+
+                yield (json.dumps(body) + "\n").encode("utf-8")
+        finally:
+            upload.close()
+
+        logger.info(f"Batch re-screen finished: {processed} profiles, {errors} errors")
+        summary = {
+            "done": True,
+            "processed": processed,
+            "errors": errors,
+            "rule_set_version": rule_set.version,
+            "request_id": request_id,
+        }
+        yield (json.dumps(summary) + "\n").encode("utf-8")
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
@@ -3,6 +3,7 @@
 from .client_input import ClientInput
 from .ingest import IngestRequest, IngestResponse
 from .recommendation import Recommendation, RecommendationResponse
+from .what_if import WhatIfRequest
 
 __all__ = [
     "ClientInput",
@@ -10,4 +11,5 @@ __all__ = [
     "RecommendationResponse",
     "IngestRequest",
     "IngestResponse",
+    "WhatIfRequest",
 ]
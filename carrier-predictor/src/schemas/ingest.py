@@ -7,11 +7,15 @@ class IngestRequest(BaseModel):
     """Request to ingest documents into knowledge base."""
 
     path: str = Field(..., description="Directory path containing documents to ingest")
+    rebuild: bool = Field(
+        default=False,
+        description="Re-index every file instead of only new, changed and removed ones",
+    )
 
     class Config:
         """Pydantic config."""
 
-        json_schema_extra = {"example": {"path": "data/carriers"}}
+        json_schema_extra = {"example": {"path": "data/carriers", "rebuild": False}}
 
 
 class IngestResponse(BaseModel):
@@ -19,8 +23,29 @@ class IngestResponse(BaseModel):
 
     indexed_files: int = Field(..., description="Number of files indexed")
     chunks: int = Field(..., description="Total number of text chunks created")
+    files_added: int = Field(default=0, description="Files new since the last ingest")
+    files_changed: int = Field(default=0, description="Files whose content changed")
+    files_removed: int = Field(default=0, description="Files deleted since the last ingest")
+    files_unchanged: int = Field(default=0, description="Files skipped as unchanged")
+    chunks_embedded: int = Field(default=0, description="Chunks run through the embedding model")
+    chunks_reused: int = Field(
+        default=0, description="New chunks whose stored embedding was reused"
+    )
+    full_rebuild: bool = Field(default=False, description="Whether the whole index was rebuilt")
 
     class Config:
         """Pydantic config."""
 
-        json_schema_extra = {"example": {"indexed_files": 15, "chunks": 342}}
+        json_schema_extra = {
+            "example": {
+                "indexed_files": 15,
+                "chunks": 342,
+                "files_added": 0,
+                "files_changed": 1,
+                "files_removed": 0,
+                "files_unchanged": 14,
+                "chunks_embedded": 3,
+                "chunks_reused": 19,
+                "full_rebuild": False,
+            }
+        }
@@ -0,0 +1,88 @@
+"""What-if grid request schema."""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from ..ai.what_if import MAX_GRID_CELLS
+
+
+def _expand_range(v: Any) -> Any:
+    """Expand a ``{"start", "stop", "step"}`` range (stop inclusive) into a list."""
+    if not isinstance(v, dict):
+        return v
+    try:
+        start, stop, step = int(v["start"]), int(v["stop"]), int(v.get("step", 1))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Range must have integer start and stop, and optionally step")
+    if step <= 0 or stop < start:
+        raise ValueError("Range needs step > 0 and stop >= start")
+    if (stop - start) // step + 1 > MAX_GRID_CELLS:
+        raise ValueError(f"Range has more than {MAX_GRID_CELLS} values")
+    return list(range(start, stop + 1, step))
+
+
+class WhatIfRequest(BaseModel):
+    """A base profile re-evaluated over ages, face amounts and term lengths."""
+
+    profile: Dict[str, Any] = Field(..., description="Base client profile (as for /recommend)")
+    ages: List[int] = Field(
+        ..., min_length=1, description="Issue ages (0-120): a list or {start, stop, step}"
+    )
+    face_amounts: List[int] = Field(
+        ..., min_length=1, description="Face amounts: a list or {start, stop, step}"
+    )
+    term_lengths: List[Optional[int]] = Field(
+        default_factory=lambda: [None],
+        min_length=1,
+        description="Term lengths in years (null: no requested term)",
+    )
+
+    @field_validator("ages", "face_amounts", mode="before")
+    @classmethod
+    def expand_ranges(cls, v: Any) -> Any:
+        """Accept inclusive ranges as well as explicit lists."""
+        return _expand_range(v)
+
+    @field_validator("ages")
+    @classmethod
+    def check_ages(cls, v: List[int]) -> List[int]:
+        """Ages must fall in the rules engine's issue-age table."""
+        if any(age < 0 or age > 120 for age in v):
+            raise ValueError("Ages must be between 0 and 120")
+        return v
+
+    @field_validator("face_amounts")
+    @classmethod
+    def check_face_amounts(cls, v: List[int]) -> List[int]:
+        """Face amounts must be positive."""
+        if any(face <= 0 for face in v):
+            raise ValueError("Face amounts must be positive")
+        return v
+
+    @model_validator(mode="after")
+    def check_grid_size(self) -> "WhatIfRequest":
+        """Bound the number of cells one request may evaluate."""
+        cells = len(self.ages) * len(self.face_amounts) * len(self.term_lengths)
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"Grid has {cells} cells; the limit is {MAX_GRID_CELLS}")
+        return self
+
+    class Config:
+        """Pydantic config."""
+
+        json_schema_extra = {
+            "example": {
+                "profile": {
+                    "age": 64,
+                    "state": "TX",
+                    "gender": "F",
+                    "coverage_type": "Final Expense",
+                    "desired_coverage": 15000,
+                    "medical_conditions": {"diabetes": True},
+                },
+                "ages": {"start": 64, "stop": 66},
+                "face_amounts": [10000, 15000, 25000],
+                "term_lengths": [None],
+            }
+        }
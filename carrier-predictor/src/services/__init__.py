@@ -2,9 +2,12 @@
 
 from .config import settings
 from .embedder import embedder_service
+from .embedding_cache import query_embedding_cache
+from .kb_ingest import kb_ingestor
 from .kb_loader import kb_loader
 from .logging_setup import generate_request_id, logger, redact_phi, set_request_id
 from .portals import portal_service
+from .result_cache import result_cache
 from .retriever import retriever_service
 from .rules import rules_engine
 from .scorer import ranker_service, scorer_service
@@ -16,10 +19,13 @@ __all__ = [
     "set_request_id",
     "redact_phi",
     "kb_loader",
+    "kb_ingestor",
     "embedder_service",
+    "query_embedding_cache",
     "retriever_service",
     "rules_engine",
     "portal_service",
+    "result_cache",
     "scorer_service",
     "ranker_service",
 ]
@@ -0,0 +1,220 @@
+"""FAISS index types for the knowledge base.
+
+settings.index_type selects the structure:
+
+- ``flat``: exact brute-force scan; cost grows linearly with the corpus.
+- ``hnsw``: graph search (IndexHNSWFlat). Fast and accurate, but FAISS can't
+  remove vectors from the graph, so removals rebuild it from the stored
+  vectors (no re-embedding).
+- ``ivf``: inverted lists over k-means centroids (IndexIVFFlat). Trained on
+  the first batch added; nlist is capped so every list gets enough training
+  points. Once the index holds twice the points its lists were sized for, it
+  is retrained on every stored vector (until nlist reaches ivf_nlist), so
+  growth by small batches still ends up with properly sized lists.
+
+settings.index_metric is ``l2`` or ``cosine`` (inner product over
+L2-normalized vectors). Every index stores vectors under caller-supplied chunk
+ids and can reconstruct them, which EmbedderService relies on for removal and
+compaction. search() reports cosine scores as the squared L2 distance between
+the unit vectors (2 - 2 cos), so callers rank and score both metrics the same
+way.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import faiss
+
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+METRICS = ("l2", "cosine")
+
+# FAISS warns when k-means gets fewer training points than this per centroid
+MIN_POINTS_PER_LIST = 39
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Index type, metric and their tuning parameters."""
+
+    type: str = "flat"
+    metric: str = "l2"
+    hnsw_m: int = 32  # Graph neighbours per node
+    hnsw_ef_construction: int = 200  # Candidate list size while building
+    hnsw_ef_search: int = 64  # Candidate list size per query
+    ivf_nlist: int = 1024  # Inverted lists (upper bound, see module docstring)
+    ivf_nprobe: int = 16  # Lists scanned per query
+
+    def __post_init__(self):
+        if self.type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {self.type!r}; expected one of {INDEX_TYPES}")
+        if self.metric not in METRICS:
+            raise ValueError(f"Unknown index metric {self.metric!r}; expected one of {METRICS}")
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "IndexSpec":
+        """Build the spec from application settings."""
+        return cls(
+            type=settings.index_type,
+            metric=settings.index_metric,
+            hnsw_m=settings.hnsw_m,
+            hnsw_ef_construction=settings.hnsw_ef_construction,
+            hnsw_ef_search=settings.hnsw_ef_search,
+            ivf_nlist=settings.ivf_nlist,
+            ivf_nprobe=settings.ivf_nprobe,
+        )
+
+    def build_params(self) -> Dict[str, Any]:
+        """Parameters fixed when the index is built (changing them needs a rebuild)."""
+        params: Dict[str, Any] = {"type": self.type, "metric": self.metric}
+        if self.type == "hnsw":
+            params.update(hnsw_m=self.hnsw_m, hnsw_ef_construction=self.hnsw_ef_construction)
+        elif self.type == "ivf":
+            params.update(ivf_nlist=self.ivf_nlist)
+        return params
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Every field, for logs and benchmark output."""
+        return asdict(self)
+
+
+def _faiss_metric(metric: str) -> int:
+    import faiss
+
+    return faiss.METRIC_INNER_PRODUCT if metric == "cosine" else faiss.METRIC_L2
+
+
+def _base(index: "faiss.Index") -> "faiss.Index":
+    """The index doing the search, beneath any IndexIDMap2 wrapper."""
+    import faiss
+
+    if isinstance(index, faiss.IndexIDMap2):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def create_index(
+    dimension: int, spec: IndexSpec, training: Optional[np.ndarray] = None
+) -> "faiss.Index":
+    """Create an empty index that stores vectors under caller-supplied ids.
+
+    Args:
+        dimension: Embedding dimension
+        spec: Index type, metric and parameters
+        training: Vectors to train an IVF index on (already prepared); without
+            them an IVF index is returned untrained
+
+    Returns:
+        FAISS index supporting add_with_ids(), reconstruct(id) and search()
+    """
+    import faiss
+
+    metric = _faiss_metric(spec.metric)
+    if spec.type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dimension, spec.hnsw_m, metric)
+        hnsw.hnsw.efConstruction = spec.hnsw_ef_construction
+        hnsw.hnsw.efSearch = spec.hnsw_ef_search
+        return faiss.IndexIDMap2(hnsw)
+
+    if spec.type == "ivf":
+        # IVF keeps ids in its lists; IndexIDMap2 can't remove from it correctly
+        nlist = spec.ivf_nlist
+        if training is not None:
+            nlist = max(1, min(nlist, len(training) // MIN_POINTS_PER_LIST))
+        quantizer = faiss.IndexFlat(dimension, metric)
+        ivf = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        ivf.nprobe = spec.ivf_nprobe
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        if training is not None:
+            ivf.train(training)
+        return ivf
+
+    return faiss.IndexIDMap2(faiss.IndexFlat(dimension, metric))
+
+
+def needs_retraining(index: "faiss.Index", spec: IndexSpec) -> bool:
+    """Whether an IVF index has outgrown the training set its lists were sized for.
+
+    nlist was capped at training size / MIN_POINTS_PER_LIST; retraining once
+    the index holds twice that keeps the cost amortized over the vectors added.
+    """
+    import faiss
+
+    base = _base(index)
+    if not isinstance(base, faiss.IndexIVF) or base.nlist >= spec.ivf_nlist:
+        return False
+    return index.ntotal >= 2 * (base.nlist + 1) * MIN_POINTS_PER_LIST
+
+
+def prepare(index: "faiss.Index", vectors: np.ndarray) -> np.ndarray:
+    """Contiguous float32 vectors, L2-normalized for inner-product indexes."""
+    import faiss
+
+    vectors = np.array(vectors, dtype="float32", order="C", ndmin=2)
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def supports_removal(index: "faiss.Index") -> bool:
+    """Whether remove_ids() works in place (HNSW graphs can't drop nodes)."""
+    import faiss
+
+    return not isinstance(_base(index), faiss.IndexHNSW)
+
+
+def apply_search_params(index: "faiss.Index", spec: IndexSpec) -> None:
+    """Set query-time parameters (efSearch, nprobe) on a built or loaded index."""
+    import faiss
+
+    base = _base(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = spec.hnsw_ef_search
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = spec.ivf_nprobe
+
+
+def search(index: "faiss.Index", queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Search an index, reporting squared L2 distances for every metric.
+
+    Args:
+        index: Index from create_index() (or loaded from disk)
+        queries: Query vectors, one per row
+        k: Neighbours per query
+
+    Returns:
+        (distances, ids); ids are -1 where fewer than k vectors were found
+    """
+    import faiss
+
+    distances, ids = index.search(prepare(index, queries), k)
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        # |a - b|^2 = 2 - 2 a.b for unit vectors; padding rows stay padding
+        distances = np.where(ids >= 0, np.maximum(2.0 - 2.0 * distances, 0.0), np.float32(np.inf))
+    return distances, ids
+
+
+def describe(index: "faiss.Index") -> Dict[str, Any]:
+    """Type, metric and parameters of an index as built (for index_info.json)."""
+    import faiss
+
+    base = _base(index)
+    metric = "cosine" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+    if isinstance(base, faiss.IndexHNSW):
+        return {
+            "type": "hnsw",
+            "metric": metric,
+            "hnsw_m": int(base.hnsw.nb_neighbors(1)),
+            "hnsw_ef_construction": int(base.hnsw.efConstruction),
+            "hnsw_ef_search": int(base.hnsw.efSearch),
+        }
+    if isinstance(base, faiss.IndexIVF):
+        return {
+            "type": "ivf",
+            "metric": metric,
+            "ivf_nlist": int(base.nlist),
+            "ivf_nprobe": int(base.nprobe),
+        }
+    return {"type": "flat", "metric": metric}
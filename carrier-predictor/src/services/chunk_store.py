@@ -0,0 +1,160 @@
+"""Columnar, memory-mapped chunk metadata.
+
+Chunk metadata used to be a pickled list of dicts that every worker unpickled
+in full at startup, so load time and memory grew with the corpus. ChunkStore
+keeps it on disk in columns instead:
+
+- ``chunk_text.bin``: every chunk's UTF-8 text, concatenated
+- ``chunk_offsets.npy``: int64 byte offsets into the text blob (rows + 1)
+- ``chunk_columns.npy``: per row, int32 codes for source_path, carrier_guess
+  and product_guess, and the page number (-1 for none); source -1 marks a
+  removed chunk
+- ``chunks.json``: the string table the codes point into, and the row count
+
+The blob and arrays are memory-mapped read-only, so opening the store costs
+the same for any corpus size, workers share the pages through the OS page
+cache, and only the rows of search hits are decoded into dicts. A store is
+written once, into a fresh directory (EmbedderService saves each index in a
+new generation directory), and never modified in place.
+"""
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+TEXT_FILE = "chunk_text.bin"
+OFFSETS_FILE = "chunk_offsets.npy"
+COLUMNS_FILE = "chunk_columns.npy"
+HEADER_FILE = "chunks.json"
+
+# Bump when the layout changes
+STORE_FORMAT = 1
+
+COLUMNS_DTYPE = np.dtype([
+    ("source_path", "<i4"),
+    ("carrier_guess", "<i4"),
+    ("product_guess", "<i4"),
+    ("page_num", "<i4"),
+])
+
+REMOVED = -1  # source_path code of a removed chunk
+NO_PAGE = -1
+
+
+class ChunkStore(Sequence):
+    """Read-only sequence of chunk dicts (None for removed chunks), backed by mmaps."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Open a store written by ChunkStore.write().
+
+        Args:
+            directory: Directory holding the store files
+
+        Raises:
+            ValueError: If the files are from another format or don't agree on the row count
+        """
+        directory = Path(directory)
+        header = json.loads((directory / HEADER_FILE).read_text(encoding="utf-8"))
+        if header.get("format") != STORE_FORMAT:
+            raise ValueError(
+                f"Unsupported chunk store format {header.get('format')!r} in {directory}"
+            )
+
+        self.strings: List[str] = header["strings"]
+        self.offsets = np.load(directory / OFFSETS_FILE, mmap_mode="r")
+        self.columns = np.load(directory / COLUMNS_FILE, mmap_mode="r")
+        count = header["count"]
+        if len(self.columns) != count or len(self.offsets) != count + 1:
+            raise ValueError(f"Chunk store files in {directory} don't agree on the row count")
+
+        # np.memmap can't map an empty file
+        text_path = directory / TEXT_FILE
+        if text_path.stat().st_size:
+            self.text_blob = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            self.text_blob = np.zeros(0, dtype=np.uint8)
+
+    @staticmethod
+    def exists(directory: Union[str, Path]) -> bool:
+        """Whether a store has been written to the directory."""
+        directory = Path(directory)
+        names = (HEADER_FILE, TEXT_FILE, OFFSETS_FILE, COLUMNS_FILE)
+        return all((directory / name).exists() for name in names)
+
+    @staticmethod
+    def write(directory: Union[str, Path], chunks: Iterable[Optional[Dict[str, Any]]]) -> int:
+        """Write chunk metadata as a store.
+
+        Args:
+            directory: New directory for the store (existing files are overwritten
+                in place, so never pass one a reader may have open)
+            chunks: Chunk dicts (DocumentChunk.to_dict()), None for removed chunks
+
+        Returns:
+            Number of rows written
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        codes: Dict[str, int] = {}
+        rows: List[tuple] = []
+        offsets = [0]
+
+        def code(value: Any) -> int:
+            return codes.setdefault(value or "", len(codes))
+
+        def write_text(f) -> None:
+            for chunk in chunks:
+                if chunk is None:
+                    rows.append((REMOVED, REMOVED, REMOVED, NO_PAGE))
+                else:
+                    f.write(chunk.get("text", "").encode("utf-8"))
+                    page_num = chunk.get("page_num")
+                    rows.append((
+                        code(chunk.get("source_path")),
+                        code(chunk.get("carrier_guess")),
+                        code(chunk.get("product_guess")),
+                        NO_PAGE if page_num is None else page_num,
+                    ))
+                offsets.append(f.tell())
+
+        with open(directory / TEXT_FILE, "wb") as f:
+            write_text(f)
+        np.save(directory / OFFSETS_FILE, np.array(offsets, dtype="<i8"))
+        np.save(directory / COLUMNS_FILE, np.array(rows, dtype=COLUMNS_DTYPE))
+        # Header last: it carries the row count the other files are checked against
+        header = {"format": STORE_FORMAT, "count": len(rows), "strings": list(codes)}
+        (directory / HEADER_FILE).write_text(json.dumps(header), encoding="utf-8")
+        return len(rows)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getitem__(self, row: int) -> Optional[Dict[str, Any]]:
+        """Decode one row (only that chunk's text is read from the blob)."""
+        if not -len(self) <= row < len(self):
+            raise IndexError(row)
+        row %= len(self)
+        source, carrier, product, page_num = self.columns[row].tolist()
+        if source == REMOVED:
+            return None
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return {
+            "text": self.text_blob[start:end].tobytes().decode("utf-8"),
+            "source_path": self.strings[source],
+            "carrier_guess": self.strings[carrier],
+            "product_guess": self.strings[product],
+            "page_num": None if page_num == NO_PAGE else page_num,
+        }
+
+    def __iter__(self) -> Iterator[Optional[Dict[str, Any]]]:
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def live_count(self) -> int:
+        """Rows that aren't removed chunks (without decoding any)."""
+        return int(np.count_nonzero(self.columns["source_path"] != REMOVED))
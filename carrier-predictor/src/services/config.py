@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,6 +32,39 @@ class Settings(BaseSettings):
     carriers_yaml_path: str = "src/config/carriers.yaml"
     portal_links_json_path: str = "src/config/portal_links.json"
 
+    # Rules engine: seconds between checks of carriers/ for changed YAML files
+    rules_check_interval: float = 2.0
+
+    # Rules engine result cache (entries, seconds); size 0 disables it
+    result_cache_size: int = 4096
+    result_cache_ttl: float = 300.0
+
+    # Infer medical_conditions from medications on /recommend when the request doesn't say
+    infer_conditions_from_medications: bool = False
+
+    # Load the embedding model (and saved FAISS index) in the background at startup;
+    # otherwise it loads on the first /recommend-carriers or /kb/ingest call
+    warm_embedder: bool = False
+
+    # Query embedding LRU cache for retrieval (entries; 0 disables it), and an
+    # optional .npz file it is loaded from at startup and saved to at shutdown
+    query_embedding_cache_size: int = 2048
+    query_embedding_cache_path: Optional[str] = None
+
+    # FAISS index: "flat" (exact scan), "hnsw" or "ivf", over "l2" or "cosine"
+    # distance. Changing type, metric, hnsw_m, hnsw_ef_construction or ivf_nlist
+    # takes effect on the next rebuild; hnsw_ef_search and ivf_nprobe apply on load
+    index_type: Literal["flat", "hnsw", "ivf"] = "flat"
+    index_metric: Literal["l2", "cosine"] = "l2"
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 1024
+    ivf_nprobe: int = 16
+
+    # Memory-map the saved FAISS index instead of reading it into each worker's heap
+    index_mmap: bool = True
+
     # Retrieval settings
     top_k: int = 10
     chunk_size: int = 800
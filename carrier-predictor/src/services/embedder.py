@@ -1,40 +1,136 @@
-"""Embedding and FAISS index management."""
+"""Embedding and FAISS index management.
+
+The SentenceTransformer model (and the torch stack behind it) is imported and
+loaded on first use, not at import, so rules-only workers never pay for it.
+Deployments serving /recommend-carriers can warm it up in the background at
+startup (settings.warm_embedder) and report readiness via /ready.
+
+The FAISS index type and metric come from settings (see ann_index). Saved
+indexes are opened memory-mapped (settings.index_mmap) with their chunk
+metadata in a ChunkStore, so uvicorn workers share one copy through the page
+cache; the first in-place change (incremental ingest) takes a private copy.
+
+Each save writes the index, its ChunkStore and any files the caller saves
+with them (the ingest manifest) into a new ``generations/<id>/`` directory,
+then atomically replaces the ``CURRENT`` pointer file. A reader resolves the
+pointer once and opens everything from that directory, so it never pairs an
+index with another save's metadata. The previous generation is kept for
+readers that resolved the pointer just before a swap; older ones are deleted.
+"""
 
 import json
 import pickle
+import shutil
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
-import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
+from . import ann_index
+from .ann_index import IndexSpec
+from .chunk_store import ChunkStore
 from .config import settings
+from .fileio import write_atomic
 from .kb_loader import DocumentChunk
 from .logging_setup import logger
 
+if TYPE_CHECKING:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+
+INDEX_FILE = "faiss.index"
+INFO_FILE = "index_info.json"
+# Names the generation directory readers open
+CURRENT_FILE = "CURRENT"
+GENERATIONS_DIR = "generations"
+# Pickled list of chunk dicts, saved beside faiss.index before generations
+# and ChunkStore existed; still read if there is no CURRENT pointer
+LEGACY_METADATA_FILE = "metadata.pkl"
+
 
 class EmbedderService:
     """Service for creating embeddings and managing FAISS index."""
 
     def __init__(self):
-        """Initialize embedder service."""
+        """Initialize embedder service (the model is loaded on first use)."""
         self.model_name = settings.embed_model_name
         self.index_dir = Path(settings.index_dir)
-        self.model: Optional[SentenceTransformer] = None
-        self.index: Optional[faiss.IndexFlatL2] = None
-        self.metadata: List[dict] = []
-
-        # Lazy load model
-        self._load_model()
+        self.index_spec = IndexSpec.from_settings(settings)
+        self.model: Optional["SentenceTransformer"] = None
+        self.index: Optional["faiss.Index"] = None
+        # A list while being built or changed; a read-only ChunkStore once loaded
+        self.metadata: Sequence[Optional[dict]] = []
+        self.index_mmapped = False
+        # Generation the index was loaded from or last saved to
+        self.generation: Optional[str] = None
+
+        # "not_loaded" -> "loading" -> "ready" (or "failed", with model_error set)
+        self.model_state = "not_loaded"
+        self.model_error: Optional[str] = None
+        self._model_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
 
     def _load_model(self) -> None:
-        """Load sentence transformer model."""
-        if self.model is None:
+        """Load sentence transformer model (once; concurrent callers wait for it)."""
+        if self.model is not None:
+            return
+        with self._model_lock:
+            if self.model is not None:
+                return
+            self.model_state = "loading"
             logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            try:
+                from sentence_transformers import SentenceTransformer
+
+                model = SentenceTransformer(self.model_name)
+            except Exception as e:
+                self.model_state = "failed"
+                self.model_error = f"{type(e).__name__}: {e}"
+                raise
+            self.model = model
+            self.model_state = "ready"
+            self.model_error = None
             logger.info(f"Model loaded successfully. Embedding dimension: {self.get_dimension()}")
 
+    def start_warmup(self) -> threading.Thread:
+        """Load the model (and the saved index, if any) in a background thread.
+
+        Returns:
+            The warm-up thread (already started); repeated calls return the same one
+        """
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(
+                target=self._warm_up, name="embedder-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warm_up(self) -> None:
+        try:
+            self._load_model()
+        except Exception as e:
+            logger.error(f"Embedding model warm-up failed: {e}")
+            return
+        if self.index is None and self.index_exists():
+            self.load_index()
+
+    def is_ready(self) -> bool:
+        """Whether retrieval can serve without loading anything (model and index in memory)."""
+        return self.model is not None and self.index is not None
+
+    def readiness(self) -> Dict[str, Any]:
+        """Model load state and index presence, for the /ready endpoint."""
+        status: Dict[str, Any] = {
+            "ready": self.is_ready(),
+            "model_state": self.model_state,
+            "index_loaded": self.index is not None,
+        }
+        if self.model_error:
+            status["model_error"] = self.model_error
+        return status
+
     def get_dimension(self) -> int:
         """Get embedding dimension.
 
@@ -80,74 +176,290 @@ class EmbedderService:
         embeddings = self.embed_texts(texts)
 
         # Create FAISS index
-        dimension = self.get_dimension()
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings)
-
-        # Store metadata
-        self.metadata = [chunk.to_dict() for chunk in chunks]
+        self.reset_index(self.get_dimension())
+        self.add_chunks([chunk.to_dict() for chunk in chunks], embeddings)
 
         logger.info(f"Index built with {self.index.ntotal} vectors")
 
-    def save_index(self) -> None:
-        """Save FAISS index and metadata to disk."""
+    def reset_index(self, dimension: int) -> None:
+        """Replace the index with an empty one that stores vectors under chunk ids.
+
+        Chunk ids are positions in ``metadata``; removed chunks leave a None
+        there, so the ids of the remaining chunks never change.
+
+        Args:
+            dimension: Embedding dimension
+        """
+        self.index = ann_index.create_index(dimension, self.index_spec)
+        self.index_mmapped = False
+        self.metadata = []
+
+    def add_chunks(self, metadata: List[dict], embeddings: np.ndarray) -> List[int]:
+        """Add chunk vectors to the index in place.
+
+        Args:
+            metadata: Chunk dicts (DocumentChunk.to_dict())
+            embeddings: One float32 row per chunk
+
+        Returns:
+            Chunk ids assigned, in order
+        """
+        ids = list(range(len(self.metadata), len(self.metadata) + len(metadata)))
+        if ids:
+            self._make_writable()
+            vectors = ann_index.prepare(self.index, embeddings)
+            if not self.index.is_trained:
+                # IVF: size the lists to and train on the first batch
+                self.index = ann_index.create_index(self.index.d, self.index_spec, training=vectors)
+            self.index.add_with_ids(vectors, np.array(ids, dtype="int64"))
+            self.metadata.extend(metadata)
+            if ann_index.needs_retraining(self.index, self.index_spec):
+                logger.info(f"Retraining IVF index on {self.index.ntotal} vectors")
+                self._rebuild()
+        return ids
+
+    def remove_chunks(self, ids: List[int]) -> int:
+        """Remove chunk vectors from the index in place.
+
+        Args:
+            ids: Chunk ids returned by add_chunks()
+
+        Returns:
+            Number of vectors removed
+        """
+        if not ids:
+            return 0
+        self._make_writable()
+        for chunk_id in ids:
+            self.metadata[chunk_id] = None
+        if ann_index.supports_removal(self.index):
+            return int(self.index.remove_ids(np.array(ids, dtype="int64")))
+
+        # HNSW can't drop graph nodes: rebuild it from the remaining stored vectors
+        before = self.index.ntotal
+        self._rebuild()
+        return before - self.index.ntotal
+
+    def _rebuild(self) -> None:
+        """Rebuild the index from its live stored vectors, under the same chunk ids.
+
+        An IVF index is retrained on all of them (see ann_index).
+        """
+        live = [chunk_id for chunk_id, chunk in enumerate(self.metadata) if chunk is not None]
+        vectors = self.reconstruct(live)
+        self.index = ann_index.create_index(self.index.d, self.index_spec, training=vectors)
+        if live:
+            self.index.add_with_ids(vectors, np.array(live, dtype="int64"))
+
+    def _make_writable(self) -> None:
+        """Swap a memory-mapped index and ChunkStore for private in-memory copies.
+
+        FAISS can't modify an index whose storage is mapped from the file (and
+        a ChunkStore is read-only), so the first change copies both.
+        """
+        if self.index_mmapped:
+            import faiss
+
+            self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+            self.index_mmapped = False
+        if not isinstance(self.metadata, list):
+            self.metadata = list(self.metadata)
+
+    def live_chunk_count(self) -> int:
+        """Number of chunks that haven't been removed."""
+        if isinstance(self.metadata, ChunkStore):
+            return self.metadata.live_count
+        return sum(chunk is not None for chunk in self.metadata)
+
+    def reconstruct(self, ids: List[int]) -> Optional[np.ndarray]:
+        """Stored vectors for chunk ids, one row each (None for no ids).
+
+        Vectors come back as stored: L2-normalized in a cosine index.
+        """
+        if not ids:
+            return None
+        return np.vstack([self.index.reconstruct(chunk_id) for chunk_id in ids])
+
+    def compact(self) -> Dict[int, int]:
+        """Renumber live chunks densely, dropping removed ids (no re-embedding).
+
+        Returns:
+            Mapping of old chunk id to new chunk id
+        """
+        if self.live_chunk_count() == len(self.metadata):
+            return {chunk_id: chunk_id for chunk_id in range(len(self.metadata))}
+
+        self._make_writable()
+        live = [chunk_id for chunk_id, chunk in enumerate(self.metadata) if chunk is not None]
+        vectors = self.reconstruct(live)
+        metadata = [self.metadata[chunk_id] for chunk_id in live]
+        self.reset_index(self.index.d)
+        if live:
+            self.add_chunks(metadata, vectors)
+        return {old: new for new, old in enumerate(live)}
+
+    def search(self, query_embeddings: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index for the k nearest chunks to each query.
+
+        Args:
+            query_embeddings: Query vectors, one per row
+            k: Number of neighbours per query
+
+        Returns:
+            (squared L2 distances, chunk ids) whatever the index metric; ids
+            are -1 where fewer than k chunks were found
+        """
+        return ann_index.search(self.index, query_embeddings, k)
+
+    def chunk_metadata(self, chunk_id: int) -> Optional[dict]:
+        """Metadata for a search hit's id (None for padding ids or removed chunks)."""
+        if 0 <= chunk_id < len(self.metadata):
+            return self.metadata[chunk_id]
+        return None
+
+    def current_generation(self) -> Optional[str]:
+        """Generation named by the CURRENT pointer (None before the first save)."""
+        try:
+            generation = (self.index_dir / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return generation or None
+
+    def generation_dir(self, generation: Optional[str] = None) -> Optional[Path]:
+        """Directory of a generation (default: the one loaded or last saved)."""
+        generation = generation or self.generation
+        return self.index_dir / GENERATIONS_DIR / generation if generation else None
+
+    def save_index(self, extra_files: Optional[Dict[str, bytes]] = None) -> None:
+        """Save FAISS index and metadata to disk as a new generation.
+
+        Args:
+            extra_files: File name -> content saved in the same generation, so
+                they are swapped in (and read back) together with the index
+        """
         if self.index is None:
             logger.warning("No index to save")
             return
 
-        self.index_dir.mkdir(parents=True, exist_ok=True)
-
-        # Save FAISS index
-        index_path = self.index_dir / "faiss.index"
-        faiss.write_index(self.index, str(index_path))
-        logger.info(f"Saved FAISS index to {index_path}")
+        import faiss
 
-        # Save metadata
-        metadata_path = self.index_dir / "metadata.pkl"
-        with open(metadata_path, "wb") as f:
-            pickle.dump(self.metadata, f)
-        logger.info(f"Saved metadata to {metadata_path}")
+        previous = self.current_generation()
+        # Hex nanoseconds: unique per save and sorts by age
+        generation = f"{time.time_ns():016x}"
+        directory = self.index_dir / GENERATIONS_DIR / generation
+        directory.mkdir(parents=True)
+        try:
+            faiss.write_index(self.index, str(directory / INDEX_FILE))
+            rows = ChunkStore.write(directory, self.metadata)
+            for name, content in (extra_files or {}).items():
+                (directory / name).write_bytes(content)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        # The swap: readers resolving CURRENT from here on open the new files
+        write_atomic(self.index_dir / CURRENT_FILE, lambda f: f.write(generation.encode("utf-8")))
+        self.generation = generation
+        logger.info(
+            f"Saved FAISS index ({self.index.ntotal} vectors) and {rows} metadata rows "
+            f"to {directory}"
+        )
+
+        if previous is not None:
+            self._prune_generations(older_than=previous)
+        for name in (INDEX_FILE, LEGACY_METADATA_FILE):
+            (self.index_dir / name).unlink(missing_ok=True)
 
         # Save index info
-        info_path = self.index_dir / "index_info.json"
         info = {
             "num_vectors": self.index.ntotal,
-            "dimension": self.get_dimension(),
+            "dimension": self.index.d,
             "model_name": self.model_name,
-            "num_chunks": len(self.metadata),
+            "num_chunks": self.index.ntotal,
+            "generation": generation,
+            "index": ann_index.describe(self.index),
         }
-        with open(info_path, "w") as f:
-            json.dump(info, f, indent=2)
-        logger.info(f"Saved index info to {info_path}")
+        body = json.dumps(info, indent=2).encode("utf-8")
+        write_atomic(self.index_dir / INFO_FILE, lambda f: f.write(body))
+
+    def _prune_generations(self, older_than: str) -> None:
+        """Delete generations saved before the given one.
+
+        Newer directories are left alone: they may belong to a save still in
+        progress in another process.
+        """
+        for directory in (self.index_dir / GENERATIONS_DIR).iterdir():
+            if directory.name < older_than:
+                shutil.rmtree(directory, ignore_errors=True)
 
-    def load_index(self) -> bool:
+    def _open(
+        self, generation: Optional[str], flags: int
+    ) -> Tuple["faiss.Index", Sequence[Optional[dict]]]:
+        """Read the index and metadata of a generation (None: the legacy layout)."""
+        import faiss
+
+        if generation is None:
+            index = faiss.read_index(str(self.index_dir / INDEX_FILE), flags)
+            with open(self.index_dir / LEGACY_METADATA_FILE, "rb") as f:
+                return index, pickle.load(f)
+
+        directory = self.generation_dir(generation)
+        return faiss.read_index(str(directory / INDEX_FILE), flags), ChunkStore(directory)
+
+    def load_index(self, mmap: Optional[bool] = None) -> bool:
         """Load FAISS index and metadata from disk.
 
+        Args:
+            mmap: Map the index file rather than reading it into memory
+                (default: settings.index_mmap)
+
         Returns:
             True if loaded successfully, False otherwise
         """
-        index_path = self.index_dir / "faiss.index"
-        metadata_path = self.index_dir / "metadata.pkl"
-
-        if not index_path.exists() or not metadata_path.exists():
+        if not self.index_exists():
             logger.warning(f"Index files not found in {self.index_dir}")
             return False
 
         try:
-            # Load FAISS index
-            self.index = faiss.read_index(str(index_path))
-            logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors from {index_path}")
-
-            # Load metadata
-            with open(metadata_path, "rb") as f:
-                self.metadata = pickle.load(f)
-            logger.info(f"Loaded {len(self.metadata)} metadata entries from {metadata_path}")
-
+            import faiss
+
+            # faiss < 1.10 can only map IVF inverted lists
+            flags = 0
+            if settings.index_mmap if mmap is None else mmap:
+                flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+            generation = self.current_generation()
+            try:
+                index, metadata = self._open(generation, flags)
+            except Exception:
+                # Pruned between reading CURRENT and opening it: two saves landed meanwhile
+                newer = self.current_generation()
+                if newer == generation:
+                    raise
+                generation = newer
+                index, metadata = self._open(generation, flags)
+
+            self.index, self.metadata, self.generation = index, metadata, generation
+            self.index_mmapped = bool(flags)
+            ann_index.apply_search_params(self.index, self.index_spec)
+            source = self.generation_dir(generation) or self.index_dir
+            logger.info(
+                f"Loaded FAISS index with {self.index.ntotal} vectors and "
+                f"{len(self.metadata)} metadata rows from {source}"
+            )
+            built = ann_index.describe(self.index)
+            if (built["type"], built["metric"]) != (self.index_spec.type, self.index_spec.metric):
+                logger.warning(
+                    f"Loaded {built['type']}/{built['metric']} index but settings ask for "
+                    f"{self.index_spec.type}/{self.index_spec.metric}; rebuild to apply them"
+                )
             return True
         except Exception as e:
             logger.error(f"Error loading index: {e}")
             self.index = None
+            self.index_mmapped = False
             self.metadata = []
+            self.generation = None
             return False
 
     def index_exists(self) -> bool:
@@ -156,9 +468,11 @@ class EmbedderService:
         Returns:
             True if index exists, False otherwise
         """
-        index_path = self.index_dir / "faiss.index"
-        metadata_path = self.index_dir / "metadata.pkl"
-        return index_path.exists() and metadata_path.exists()
+        directory = self.generation_dir(self.current_generation())
+        if directory is not None:
+            return (directory / INDEX_FILE).exists()
+        legacy = (self.index_dir / INDEX_FILE, self.index_dir / LEGACY_METADATA_FILE)
+        return all(path.exists() for path in legacy)
 
     def get_index_info(self) -> dict:
         """Get information about the current index.
@@ -172,9 +486,10 @@ class EmbedderService:
         return {
             "exists": True,
             "num_vectors": self.index.ntotal,
-            "dimension": self.get_dimension(),
-            "num_metadata": len(self.metadata),
+            "dimension": self.index.d,
+            "num_metadata": self.live_chunk_count(),
             "model_name": self.model_name,
+            "index": ann_index.describe(self.index),
         }
 
 
@@ -0,0 +1,151 @@
+"""LRU cache of query embeddings, optionally persisted to disk."""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .config import settings
+from .fileio import write_atomic
+from .logging_setup import logger
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache from canonical query text to its embedding.
+
+    Embeddings only mean something for the model that produced them, so the
+    cache is tied to one model name: a persisted file written for another
+    model is ignored.
+    """
+
+    def __init__(self, max_size: int, model_name: str, path: Optional[Path] = None) -> None:
+        """Initialize the cache, loading persisted entries from path if present.
+
+        Args:
+            max_size: Maximum number of embeddings (0 disables caching)
+            model_name: Embedding model the cached vectors come from
+            path: .npz file to load from and save() to (None: memory only)
+        """
+        self.max_size = max_size
+        self.model_name = model_name
+        self.path = Path(path) if path else None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a query, or None on a miss."""
+        with self._lock:
+            vector = self._entries.get(query)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector: np.ndarray) -> None:
+        """Store an embedding, evicting the least recently used beyond max_size."""
+        if self.max_size <= 0:
+            return
+
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[query] = vector
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persist_path": str(self.path) if self.path else None,
+            }
+
+    def save(self, path: Optional[Path] = None) -> Optional[Path]:
+        """Write the entries (least recently used first) atomically.
+
+        Args:
+            path: Target file (default: the path given at construction)
+
+        Returns:
+            Path written, or None if there is no path or nothing to save
+        """
+        path = Path(path) if path else self.path
+        if path is None:
+            return None
+
+        with self._lock:
+            queries = list(self._entries)
+            vectors = list(self._entries.values())
+        if not queries:
+            return None
+
+        write_atomic(
+            path,
+            lambda f: np.savez(
+                f,
+                model=np.array(self.model_name),
+                queries=np.array(queries, dtype=str),
+                vectors=np.stack(vectors),
+            ),
+        )
+        logger.info(f"Saved {len(queries)} query embeddings to {path}")
+        return path
+
+    def load(self, path: Optional[Path] = None) -> int:
+        """Load persisted entries written for the same model.
+
+        Returns:
+            Number of embeddings loaded (0 if the file is unreadable or for another model)
+        """
+        path = Path(path) if path else self.path
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                model = str(data["model"])
+                queries = [str(query) for query in data["queries"]]
+                vectors = data["vectors"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable query embedding cache {path}: {e}")
+            return 0
+
+        if model != self.model_name:
+            logger.info(f"Query embedding cache {path} was built for {model}; ignoring it")
+            return 0
+
+        # Most recently used entries were saved last, so they survive a smaller max_size
+        for query, vector in zip(queries, vectors):
+            self.put(query, vector)
+        logger.info(f"Loaded {len(self._entries)} query embeddings from {path}")
+        return len(self._entries)
+
+
+# Global query embedding cache for RetrieverService
+query_embedding_cache = QueryEmbeddingCache(
+    settings.query_embedding_cache_size,
+    settings.embed_model_name,
+    settings.query_embedding_cache_path,
+)
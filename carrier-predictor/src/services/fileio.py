@@ -0,0 +1,36 @@
+"""Atomic file writes.
+
+Files are written beside their target and renamed over it, so a reader (or a
+worker that has the old file memory-mapped) never sees a half-written file,
+and a failed write leaves the previous file in place.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Union
+
+
+def write_atomic(path: Union[str, Path], write: Callable[[BinaryIO], None]) -> Path:
+    """Write a file atomically through a callback.
+
+    The temporary file is removed if the callback raises.
+
+    Args:
+        path: Target file (its directory is created if missing)
+        write: Called with the temporary file opened for binary writing
+
+    Returns:
+        The target path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
@@ -0,0 +1,309 @@
+"""Incremental knowledge base ingest.
+
+A full ingest re-extracts, re-chunks and re-embeds every document. KBIngestor
+keeps a ``manifest.json`` so re-ingesting only does work for what changed. Per
+source file it records the size, mtime, content hash, and the chunk ids it
+contributed with the hash of each chunk's text. Files whose size and mtime
+match are skipped without being read; files whose content hash matches only
+get a new mtime. The manifest is saved in the index's generation directory
+(see embedder), so its chunk ids always refer to the index saved with it.
+
+Changed and deleted files have their vectors removed from the index in place
+(EmbedderService stores vectors under stable chunk ids), and new chunks are
+added. Before removal, the vectors of chunks whose text hash reappears in the
+new chunks (a file edited in one place, or moved) are read back from the index,
+so only text the index has never held goes through the model. A change of
+chunking settings or index build parameters forces a full rebuild, which reads
+every vector back the same way; only a new embedding model or metric re-embeds.
+
+Limitation: embedding, extraction and hashing follow the changed files, but
+saving still writes a complete new generation (FAISS index and ChunkStore, and
+a loaded ChunkStore is decoded into a list before the first change), so that
+I/O stays proportional to the corpus.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import ann_index
+from .embedder import EmbedderService, embedder_service
+from .fileio import write_atomic
+from .kb_loader import KBLoader, kb_loader
+from .logging_setup import logger
+
+# Bump when the manifest layout changes (forces a full rebuild)
+MANIFEST_FORMAT = 2
+
+MANIFEST_FILE = "manifest.json"
+
+# Renumber chunk ids once removed ids outnumber live ones
+COMPACT_RATIO = 1.0
+
+
+def text_hash(text: str) -> str:
+    """Content hash of a chunk's text (decides whether its vector can be reused)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """Content hash of a source file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class IngestReport:
+    """What an ingest run did."""
+
+    files_added: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    files_unchanged: int = 0
+    chunks_embedded: int = 0  # Chunks sent through the model
+    chunks_reused: int = 0  # New chunks whose vector was read back from the index
+    vectors_added: int = 0
+    vectors_removed: int = 0
+    total_files: int = 0
+    total_chunks: int = 0
+    full_rebuild: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable report."""
+        return asdict(self)
+
+
+class KBIngestor:
+    """Keeps the FAISS index in sync with a document directory."""
+
+    def __init__(self, embedder: EmbedderService, loader: KBLoader):
+        """Initialize the ingestor.
+
+        Args:
+            embedder: Service owning the index (and its index_dir)
+            loader: Document loader used for extraction and chunking
+        """
+        self.embedder = embedder
+        self.loader = loader
+        self._lock = threading.Lock()
+
+    def _settings_key(self) -> Dict[str, Any]:
+        """Settings whose change invalidates every stored chunk and vector."""
+        return {
+            "format": MANIFEST_FORMAT,
+            "model_name": self.embedder.model_name,
+            "chunk_size": self.loader.chunk_size,
+            "chunk_overlap": self.loader.chunk_overlap,
+            "index": self.embedder.index_spec.build_params(),
+        }
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        """The manifest saved with the latest index, loading that index if needed."""
+        embedder = self.embedder
+        if embedder.index is None or embedder.generation != embedder.current_generation():
+            # Start from the latest save, whose manifest describes it
+            if not embedder.index_exists() or not embedder.load_index(mmap=False):
+                return None
+        directory = embedder.generation_dir()
+        if directory is None or not (directory / MANIFEST_FILE).exists():
+            return None
+
+        path = directory / MANIFEST_FILE
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable KB manifest {path}: {e}")
+            return None
+        live = sum(len(entry["chunk_ids"]) for entry in manifest.get("files", {}).values())
+        if embedder.index.ntotal != live:
+            logger.info("KB index doesn't match its manifest; rebuilding")
+            return None
+        return manifest
+
+    def _indexed_hashes(self, manifest: Optional[Dict[str, Any]]) -> Dict[str, int]:
+        """Chunk ids of every indexed vector a full rebuild can reuse, by text hash.
+
+        Vectors are reusable if they came from the same model and are stored
+        under the same metric (cosine indexes hold normalized vectors).
+        """
+        embedder = self.embedder
+        if manifest is None:
+            return {}
+        if manifest.get("settings", {}).get("model_name") != embedder.model_name:
+            return {}
+        if ann_index.describe(embedder.index)["metric"] != embedder.index_spec.metric:
+            return {}
+
+        hashes: Dict[str, int] = {}
+        for entry in manifest["files"].values():
+            chunk_hashes = entry.get("chunk_hashes")
+            if chunk_hashes is None:
+                # Manifest from before chunk hashes were recorded
+                chunk_hashes = [text_hash(embedder.metadata[i]["text"]) for i in entry["chunk_ids"]]
+            hashes.update(zip(chunk_hashes, entry["chunk_ids"]))
+        return hashes
+
+    def ingest(self, directory: str, rebuild: bool = False) -> IngestReport:
+        """Bring the index in line with the documents under a directory.
+
+        Args:
+            directory: Directory containing .pdf, .html and .txt documents
+            rebuild: Ignore the manifest and re-index everything (vectors
+                already in the index are still reused)
+
+        Returns:
+            IngestReport of the files and vectors touched
+
+        Raises:
+            ValueError: If the directory has no supported documents or none of
+                them yields text; the saved index is left untouched
+        """
+        with self._lock:
+            return self._ingest(Path(directory), rebuild)
+
+    def _ingest(self, directory: Path, rebuild: bool) -> IngestReport:
+        # An empty or mistyped directory would otherwise read as "every file was deleted"
+        current = {str(path): path for path in self.loader.discover_files(directory)}
+        if not current:
+            raise ValueError(f"No .pdf, .html or .txt documents found in {directory}")
+
+        report = IngestReport()
+        saved = self._read_manifest()
+        manifest = saved
+        if saved is not None and saved.get("settings") != self._settings_key():
+            logger.info("KB manifest was built with other settings; rebuilding")
+            manifest = None
+        # Indexed vectors new chunks may reuse, by chunk text hash
+        reusable: Dict[str, int] = {}
+        if manifest is None or rebuild:
+            report.full_rebuild = True
+            reusable = self._indexed_hashes(saved)
+            manifest = {"settings": self._settings_key(), "files": {}}
+        files: Dict[str, Dict[str, Any]] = manifest["files"]
+
+        # Classify files: stat first, hash only when size or mtime moved
+        to_load: List[str] = []
+        stale: List[Dict[str, Any]] = []  # Entries of changed and removed files
+        for key, path in current.items():
+            stat = path.stat()
+            entry = files.get(key)
+            seen = entry is not None and entry["mtime_ns"] == stat.st_mtime_ns
+            if seen and entry["size"] == stat.st_size:
+                report.files_unchanged += 1
+                continue
+            digest = file_hash(path)
+            if entry is not None and entry["sha256"] == digest:
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                report.files_unchanged += 1
+                continue
+
+            if entry is None:
+                report.files_added += 1
+            else:
+                report.files_changed += 1
+                stale.append(entry)
+            files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+            to_load.append(key)
+
+        for key in [key for key in files if key not in current]:
+            report.files_removed += 1
+            stale.append(files.pop(key))
+
+        stale_ids: List[int] = []
+        for entry in stale:
+            stale_ids.extend(entry["chunk_ids"])
+            reusable.update(zip(entry["chunk_hashes"], entry["chunk_ids"]))
+
+        # Extract and chunk only the new or changed files
+        new_chunks: Dict[str, List[dict]] = {}
+        for key in to_load:
+            try:
+                chunks = self.loader.load_file(current[key])
+            except Exception as e:
+                logger.error(f"Error loading {key}: {e}")
+                chunks = []
+            new_chunks[key] = [chunk.to_dict() for chunk in chunks]
+            files[key]["chunk_hashes"] = [text_hash(chunk["text"]) for chunk in new_chunks[key]]
+
+        # Refuse before touching the index, so a failed run never saves an empty one
+        live_before = 0 if report.full_rebuild else self.embedder.index.ntotal
+        new_count = sum(len(chunks) for chunks in new_chunks.values())
+        if live_before - len(stale_ids) + new_count == 0:
+            raise ValueError(f"No text could be extracted from the documents in {directory}")
+
+        changed = report.full_rebuild or bool(
+            report.files_added or report.files_changed or report.files_removed
+        )
+
+        # Read back vectors the index already holds (before anything is removed),
+        # then embed the remaining texts in one batch
+        needed: Dict[str, str] = {}
+        for key, chunks in new_chunks.items():
+            for digest, chunk in zip(files[key]["chunk_hashes"], chunks):
+                needed.setdefault(digest, chunk["text"])
+        reuse = {digest: reusable[digest] for digest in needed if digest in reusable}
+        vectors: Dict[str, np.ndarray] = {}
+        if reuse:
+            vectors.update(zip(reuse, self.embedder.reconstruct(list(reuse.values()))))
+        pending = {digest: text for digest, text in needed.items() if digest not in vectors}
+        if pending:
+            vectors.update(zip(pending, self.embedder.embed_texts(list(pending.values()))))
+        report.chunks_embedded = len(pending)
+        report.chunks_reused = new_count - len(pending)
+
+        # Update the index in place
+        if report.full_rebuild:
+            # Reused vectors give the dimension without loading the model
+            if vectors:
+                dimension = len(next(iter(vectors.values())))
+            else:
+                dimension = self.embedder.get_dimension()
+            self.embedder.reset_index(dimension)
+        report.vectors_removed = self.embedder.remove_chunks(stale_ids)
+        # One batch for every file, so an IVF index is trained on all new chunks
+        batch = [chunk for chunks in new_chunks.values() for chunk in chunks]
+        ids: List[int] = []
+        if batch:
+            digests = [digest for key in new_chunks for digest in files[key]["chunk_hashes"]]
+            ids = self.embedder.add_chunks(batch, np.stack([vectors[d] for d in digests]))
+            report.vectors_added = len(batch)
+        start = 0
+        for key, chunks in new_chunks.items():
+            files[key]["chunk_ids"] = ids[start:start + len(chunks)]
+            start += len(chunks)
+
+        live_chunks = self.embedder.live_chunk_count()
+        removed = len(self.embedder.metadata) - live_chunks
+        if removed and removed > COMPACT_RATIO * live_chunks:
+            remap = self.embedder.compact()
+            for entry in files.values():
+                entry["chunk_ids"] = [remap[chunk_id] for chunk_id in entry["chunk_ids"]]
+
+        report.total_files = len(files)
+        report.total_chunks = self.embedder.index.ntotal
+
+        body = json.dumps(manifest, indent=1).encode("utf-8")
+        if changed:
+            self.embedder.save_index(extra_files={MANIFEST_FILE: body})
+        else:
+            # Same chunk ids, new mtimes: update the manifest of the current generation
+            write_atomic(self.embedder.generation_dir() / MANIFEST_FILE, lambda f: f.write(body))
+
+        logger.info(
+            f"KB ingest: {report.files_added} added, {report.files_changed} changed, "
+            f"{report.files_removed} removed, {report.files_unchanged} unchanged; "
+            f"{report.chunks_embedded} chunks embedded, {report.chunks_reused} reused"
+        )
+        return report
+
+
+# Global ingestor for /kb/ingest and scripts/update_kb.py
+kb_ingestor = KBIngestor(embedder_service, kb_loader)
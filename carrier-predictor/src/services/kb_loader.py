@@ -19,6 +19,10 @@ except ImportError:
     logger.warning("trafilatura not available, HTML parsing will use basic fallback")
 
 
+# Document types the loader can extract text from
+SUPPORTED_EXTENSIONS = frozenset({".pdf", ".html", ".htm", ".txt"})
+
+
 class DocumentChunk:
     """Represents a chunk of document text with metadata."""
 
@@ -78,22 +82,33 @@ class KBLoader:
             raise ValueError(f"Directory does not exist: {directory}")
 
         chunks: List[DocumentChunk] = []
-        supported_extensions = {".pdf", ".html", ".htm", ".txt"}
-
-        # Walk directory for files
-        for file_path in path.rglob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                try:
-                    file_chunks = self._load_file(file_path)
-                    chunks.extend(file_chunks)
-                    logger.info(f"Loaded {len(file_chunks)} chunks from {file_path.name}")
-                except Exception as e:
-                    logger.error(f"Error loading {file_path}: {e}")
+        for file_path in self.discover_files(path):
+            try:
+                file_chunks = self.load_file(file_path)
+                chunks.extend(file_chunks)
+                logger.info(f"Loaded {len(file_chunks)} chunks from {file_path.name}")
+            except Exception as e:
+                logger.error(f"Error loading {file_path}: {e}")
 
         logger.info(f"Total chunks loaded: {len(chunks)} from {directory}")
         return chunks
 
-    def _load_file(self, file_path: Path) -> List[DocumentChunk]:
+    def discover_files(self, directory: Path) -> List[Path]:
+        """Supported documents under a directory, recursively, in a stable order.
+
+        Args:
+            directory: Directory to walk
+
+        Returns:
+            Sorted file paths
+        """
+        return sorted(
+            file_path
+            for file_path in Path(directory).rglob("*")
+            if file_path.is_file() and file_path.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+
+    def load_file(self, file_path: Path) -> List[DocumentChunk]:
         """Load a single file and return chunks.
 
         Args:
@@ -1,5 +1,6 @@
 """Retrieval service for similarity search."""
 
+from bisect import bisect_left
 from typing import List, Tuple
 
 import numpy as np
@@ -7,8 +8,23 @@ import numpy as np
 from ..schemas import ClientInput
 from .config import settings
 from .embedder import embedder_service
+from .embedding_cache import query_embedding_cache
 from .logging_setup import logger
 
+# Face amounts in retrieval queries are rounded up to one of these, so nearby
+# amounts share a query embedding; larger amounts round up to a whole million
+FACE_AMOUNT_BUCKETS = (
+    10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000
+)
+
+
+def bucket_face_amount(amount: int) -> int:
+    """Round a face amount up to its retrieval bucket."""
+    i = bisect_left(FACE_AMOUNT_BUCKETS, amount)
+    if i < len(FACE_AMOUNT_BUCKETS):
+        return FACE_AMOUNT_BUCKETS[i]
+    return -(-amount // 1_000_000) * 1_000_000
+
 
 class RetrieverService:
     """Service for retrieving similar documents from the index."""
@@ -50,6 +66,41 @@ class RetrieverService:
         query = " ".join(parts)
         return query
 
+    def canonical_query(self, client_input: ClientInput) -> str:
+        """Build the query string used for retrieval and as the embedding cache key.
+
+        Same as build_query(), with health conditions sorted and de-duplicated and
+        the face amount rounded up to its bucket, so equivalent clients share an
+        embedding.
+
+        Args:
+            client_input: Client input schema
+
+        Returns:
+            Canonical query string
+        """
+        update = {"health_conditions": sorted(set(client_input.health_conditions))}
+        if client_input.desired_coverage:
+            update["desired_coverage"] = bucket_face_amount(client_input.desired_coverage)
+        if client_input.notes:
+            update["notes"] = " ".join(client_input.notes.split())
+        return self.build_query(client_input.model_copy(update=update))
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, from the query embedding cache when possible.
+
+        Args:
+            query: Canonical query string
+
+        Returns:
+            float32 embedding of shape (1, dimension)
+        """
+        embedding = query_embedding_cache.get(query)
+        if embedding is None:
+            embedding = embedder_service.embed_texts([query])[0]
+            query_embedding_cache.put(query, embedding)
+        return np.asarray(embedding, dtype="float32").reshape(1, -1)
+
     def retrieve(
         self, client_input: ClientInput, top_k: int = None
     ) -> List[Tuple[dict, float]]:
@@ -71,22 +122,21 @@ class RetrieverService:
         k = top_k or self.top_k
         k = min(k, embedder_service.index.ntotal)  # Don't exceed available vectors
 
-        # Build query
-        query = self.build_query(client_input)
+        # Build query (canonical, so repeat clients hit the embedding cache)
+        query = self.canonical_query(client_input)
         logger.debug(f"Query: {query[:200]}...")
 
         # Embed query
-        query_embedding = embedder_service.embed_texts([query])[0]
-        query_embedding = np.array([query_embedding]).astype("float32")
+        query_embedding = self.embed_query(query)
 
         # Search index
-        distances, indices = embedder_service.index.search(query_embedding, k)
+        distances, indices = embedder_service.search(query_embedding, k)
 
         # Collect results with metadata
         results = []
         for idx, dist in zip(indices[0], distances[0]):
-            if idx < len(embedder_service.metadata):
-                metadata = embedder_service.metadata[idx]
+            metadata = embedder_service.chunk_metadata(int(idx))
+            if metadata is not None:
                 # Convert L2 distance to similarity score (0-1, higher is better)
                 # Using exponential decay: sim = exp(-distance)
                 similarity = float(np.exp(-dist))
@@ -3,8 +3,8 @@
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
-import yaml
-
+from ..ai.snapshot import DEFAULT_CONFIG_SNAPSHOT_PATH, read_config_snapshot
+from ..ai.yaml_loader import safe_load
 from ..schemas import ClientInput
 from .config import settings
 from .logging_setup import logger
@@ -114,13 +114,19 @@ class CarrierRules:
 class RulesEngine:
     """Engine for evaluating carrier eligibility rules."""
 
-    def __init__(self):
-        """Initialize rules engine."""
+    def __init__(self, snapshot_path: Optional[Path] = DEFAULT_CONFIG_SNAPSHOT_PATH):
+        """Initialize rules engine.
+
+        Args:
+            snapshot_path: Parsed carriers.yaml snapshot used instead of parsing
+                when built from the same content (None to disable)
+        """
         self.carriers: Dict[str, CarrierRules] = {}
+        self.snapshot_path = snapshot_path
         self.load_rules()
 
     def load_rules(self) -> None:
-        """Load carrier rules from YAML file."""
+        """Load carrier rules from YAML file (or its snapshot, if current)."""
         yaml_path = Path(settings.carriers_yaml_path)
 
         if not yaml_path.exists():
@@ -129,8 +135,10 @@ class RulesEngine:
             return
 
         try:
-            with open(yaml_path, "r") as f:
-                data = yaml.safe_load(f)
+            content = yaml_path.read_bytes()
+            data = read_config_snapshot(content, self.snapshot_path)
+            if data is None:
+                data = safe_load(content)
 
             if not data:
                 logger.warning("Empty carriers YAML")
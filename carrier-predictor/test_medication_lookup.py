@@ -1,61 +1,47 @@
 #!/usr/bin/env python3
 """
 Quick medication lookup tester
-Tests the medication reference file without running the full API
+Tests the medication reference index without running the full API
 """
 
-def search_medication_file(medication_name):
-    """Search for a medication in the reference file"""
-    file_path = "data/medical_conditions_medication_reference.txt"
-
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    # Search in medication index
-    if f"MEDICATION_NAME: {medication_name}" in content:
-        # Find the condition reference
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if f"MEDICATION_NAME: {medication_name}" in line:
-                if i + 1 < len(lines):
-                    see_condition = lines[i + 1]
-                    print(f"\n✓ Found: {medication_name}")
-                    print(f"  {see_condition}")
-                    return see_condition.split(": ")[1] if ": " in see_condition else None
-    else:
+from src.ai.medication_reference import default_medication_reference
+
+
+def search_medication(medication_name):
+    """Look up a medication in the reference index"""
+    match = default_medication_reference().lookup(medication_name)
+    if match is None:
         print(f"\n✗ Medication '{medication_name}' not found in index")
         return None
 
-def get_carrier_recommendations(condition_name):
-    """Get carrier recommendations for a condition"""
-    file_path = "data/medical_conditions_medication_reference.txt"
-
-    with open(file_path, 'r') as f:
-        content = f.read()
+    brands = f" ({', '.join(match.brands)})" if match.brands else ""
+    print(f"\n✓ Found: {medication_name} -> {match.generic}{brands}")
+    print(f"  SEE_CONDITION: {', '.join(c.name for c in match.conditions)}")
+    return match
 
-    # Find the condition section
-    condition_marker = f"===CONDITION"
-    sections = content.split(condition_marker)
 
-    for section in sections:
-        if condition_name.lower() in section.lower():
-            print(f"\n{'='*60}")
-            print(f"CONDITION: {condition_name}")
-            print(f"{'='*60}")
+def print_carrier_recommendations(condition):
+    """Print carrier positioning for a condition"""
+    print(f"\n{'='*60}")
+    print(f"CONDITION: {condition.name} (severity: {condition.severity_level})")
+    print(f"{'='*60}")
 
-            # Extract carrier positioning
-            if "CARRIER_POSITIONING:" in section:
-                positioning_start = section.find("CARRIER_POSITIONING:")
-                positioning_end = section.find("AGENT_GUIDANCE:", positioning_start)
-                if positioning_end == -1:
-                    positioning_end = section.find("===", positioning_start + 1)
+    for box, carriers in condition.carrier_positioning.items():
+        print(f"{box}:")
+        if isinstance(carriers, dict):
+            for carrier, guidance in carriers.items():
+                print(f"  {carrier}: {guidance}")
+        else:
+            print(f"  {carriers}")
 
-                positioning = section[positioning_start:positioning_end]
-                print(positioning)
 
-            return True
+def lookup(medication_name):
+    """Look up a medication and print positioning for every condition it indicates"""
+    match = search_medication(medication_name)
+    if match:
+        for condition in match.conditions:
+            print_carrier_recommendations(condition)
 
-    return False
 
 def main():
     """Interactive medication lookup"""
@@ -79,9 +65,7 @@ def main():
         print(f"Expected: {expected}")
         print(f"{'='*60}")
 
-        condition = search_medication_file(medication)
-        if condition:
-            get_carrier_recommendations(condition)
+        lookup(medication)
 
     # Interactive mode
     print("\n" + "="*60)
@@ -95,9 +79,7 @@ def main():
             break
 
         if med:
-            condition = search_medication_file(med)
-            if condition:
-                get_carrier_recommendations(condition)
+            lookup(med)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,93 @@
+"""Shared fixtures: the real rule catalog and random-profile differential helpers."""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.ai.ruleset import RuleSet
+
+KNOCKOUT_FLAGS = [
+    "current_cancer_treatment",
+    "dialysis",
+    "california_resident",
+    "hospice_care",
+    "aids_hiv_positive",
+    "major_health_issues",
+    "oxygen_therapy",
+]
+
+
+def _random_profile(rng: random.Random) -> dict:
+    """Generate a random client profile touching every eligibility predicate."""
+    profile = {
+        "age": rng.choice([0, rng.randint(0, 130), 45.5]),
+        "desired_coverage": rng.choice([0, 10000, 50000, 250000, rng.randint(1000, 5_000_000)]),
+        "gender": rng.choice(["M", "F", "X"]),
+        "height_ft": rng.choice([None, 5, 6]),
+        "height_in": rng.randint(0, 11),
+        "weight": rng.randint(100, 350),
+        "medications": rng.sample(["Metformin", "Chemotherapy (active)", "Lisinopril"], 2),
+        "dui_count_recent": rng.randint(0, 2),
+        "major_violations": rng.randint(0, 3),
+        "felony_within_lookback": rng.random() < 0.2,
+        "hazardous_avocation": rng.random() < 0.2,
+        "aviation_activity": rng.random() < 0.2,
+        "nicotine_use": rng.random() < 0.3,
+        "tobacco_use": rng.random() < 0.3,
+        "prior_decline": rng.random() < 0.2,
+        "prior_decline_carrier": rng.choice(["", "", "elco", "SBLI"]),
+        "term_length": rng.choice([None, 10, 20, 30, 25]),
+        "state": rng.choice([None, "", "TX", "NY", "ca", " MT ", "HI", "ZZ"]),
+    }
+    for flag in KNOCKOUT_FLAGS:
+        if rng.random() < 0.1:
+            profile[flag] = True
+    return profile
+
+
+def _interpreted_mask(rules, profile: dict) -> np.ndarray:
+    """Eligibility computed rule by rule with the CarrierRule predicates."""
+    prior_decline_carrier = profile.get("prior_decline_carrier", "").lower()
+    mask = []
+    for rule in rules:
+        if not rule.available_in_state(profile.get("state")):
+            mask.append(False)
+        elif prior_decline_carrier and prior_decline_carrier in rule.carrier.lower():
+            mask.append(False)
+        elif (
+            profile.get("prior_decline", False)
+            and "Full Medical" in rule.underwriting_type
+            and not rule.tier_structure
+        ):
+            mask.append(False)
+        else:
+            mask.append(
+                rule.supports_age(profile.get("age", 0))
+                and rule.supports_face(profile.get("desired_coverage", 0), profile.get("age", 0))
+                and (
+                    not profile.get("term_length")
+                    or rule.supports_term(profile["term_length"], profile.get("age", 0))
+                )
+                and rule.passes_knockouts(profile)
+                and rule.passes_health(profile)
+            )
+    return np.array(mask, dtype=bool)
+
+
+@pytest.fixture
+def random_profile():
+    """Random profile generator: random_profile(rng) -> dict."""
+    return _random_profile
+
+
+@pytest.fixture
+def interpreted_mask():
+    """Reference eligibility: interpreted_mask(rules, profile) -> bool array."""
+    return _interpreted_mask
+
+
+@pytest.fixture(scope="module")
+def rule_set():
+    """Load the real product catalog."""
+    return RuleSet.load()
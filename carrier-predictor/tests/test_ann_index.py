@@ -0,0 +1,89 @@
+"""Tests for the configurable FAISS index types."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.services.ann_index import IndexSpec, create_index, describe, search
+from src.services.embedder import EmbedderService
+
+
+@pytest.fixture
+def vectors():
+    """Clustered vectors, enough to train a small IVF index."""
+    rng = np.random.default_rng(3)
+    centers = rng.standard_normal((20, 16), dtype=np.float32)
+    noise = rng.standard_normal((1000, 16), dtype=np.float32)
+    return centers[rng.integers(20, size=1000)] + 0.1 * noise
+
+
+def embedder_with(spec, vectors, index_dir):
+    """EmbedderService holding the vectors in an index built to spec."""
+    embedder = EmbedderService()
+    embedder.index_spec = spec
+    embedder.index_dir = index_dir
+    embedder.reset_index(vectors.shape[1])
+    embedder.add_chunks([{"text": f"chunk {i}"} for i in range(len(vectors))], vectors)
+    return embedder
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+@pytest.mark.parametrize("metric", ["l2", "cosine"])
+def test_index_types_find_stored_vectors_and_support_removal(index_type, metric, vectors, tmp_path):
+    """Every type returns a vector as its own nearest neighbour, before and after removals."""
+    spec = IndexSpec(type=index_type, metric=metric, ivf_nprobe=8)
+    embedder = embedder_with(spec, vectors, tmp_path)
+    distances, ids = embedder.search(vectors[:20], 1)
+    assert list(ids[:, 0]) == list(range(20))
+    assert np.allclose(distances[:, 0], 0.0, atol=1e-4)
+
+    assert embedder.remove_chunks(list(range(0, 1000, 2))) == 500
+    _, ids = embedder.search(vectors[1:40:2], 1)
+    assert list(ids[:, 0]) == list(range(1, 40, 2))
+    assert embedder.index.ntotal == 500
+
+
+def test_cosine_distances_match_normalized_l2(vectors):
+    """Cosine search reports squared L2 distances between the unit vectors."""
+    cosine = create_index(16, IndexSpec(metric="cosine"))
+    cosine.add_with_ids(vectors / np.linalg.norm(vectors, axis=1, keepdims=True), np.arange(1000))
+    distances, ids = search(cosine, vectors[:5] * 3.0, 3)  # Query scale doesn't matter
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = ((unit[ids] - unit[:5, None, :]) ** 2).sum(axis=2)
+    assert np.allclose(distances, expected, atol=1e-4)
+
+
+def test_index_info_records_type_and_parameters(vectors, tmp_path):
+    """index_info.json and a reloaded index report the parameters the index was built with."""
+    spec = IndexSpec(
+        type="hnsw", metric="cosine", hnsw_m=16, hnsw_ef_construction=80, hnsw_ef_search=40
+    )
+    embedder_with(spec, vectors, tmp_path).save_index()
+
+    info = json.loads((tmp_path / "index_info.json").read_text())
+    assert info["index"] == {
+        "type": "hnsw",
+        "metric": "cosine",
+        "hnsw_m": 16,
+        "hnsw_ef_construction": 80,
+        "hnsw_ef_search": 40,
+    }
+
+    reloaded = EmbedderService()
+    reloaded.index_dir = tmp_path
+    reloaded.index_spec = IndexSpec(type="hnsw", metric="cosine", hnsw_ef_search=128)
+    assert reloaded.load_index()
+    # Query-time parameter follows settings
+    assert describe(reloaded.index)["hnsw_ef_search"] == 128
+
+
+def test_ivf_lists_are_capped_by_training_size(vectors):
+    """A small corpus gets fewer IVF lists than configured instead of undertrained ones."""
+    index = create_index(16, IndexSpec(type="ivf", ivf_nlist=1024), training=vectors)
+    assert index.is_trained
+    assert describe(index)["ivf_nlist"] == 1000 // 39
+
+    with pytest.raises(ValueError):
+        IndexSpec(type="annoy")
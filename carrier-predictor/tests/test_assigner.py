@@ -0,0 +1,93 @@
+"""Tests for the rules-based assignment engine."""
+
+import pytest
+
+from src.ai.assigner import assign, load_rules, rule_from_dict
+from src.ai.ruleset import RuleSet
+
+IDEAL_RULE = {
+    "carrier": "Test Carrier",
+    "product": "Ideal Term",
+    "type": "Term",
+    "underwriting_type": "Full Medical",
+    "face_amount": {"min": 0, "max": 200000},
+    "issue_ages": {"min": 20, "max": 60, "by_duration": {"20_year": [20, 60]}},
+    "tobacco_classes": ["Preferred Non-Tobacco", "Standard Tobacco"],
+    "riders": [
+        "Accelerated Death Benefit",
+        "Waiver of Premium",
+        "Child Rider",
+        "Term Conversion",
+        "Return of Premium",
+    ],
+    "am_best_rating": "A+",
+    "tier_structure": {"preferred": "Best rates"},
+    "typical_premium_tier": "low",
+}
+
+IDEAL_PROFILE = {"age": 40, "desired_coverage": 100000, "coverage_type": "Term", "smoker": False}
+
+
+def test_score_weights_sum_to_100():
+    """A product matching on every component scores the full 100 points."""
+    assert rule_from_dict(IDEAL_RULE).score(IDEAL_PROFILE) == 100.0
+
+
+@pytest.mark.parametrize(
+    "profile_changes, rule_changes, expected",
+    [
+        ({"coverage_type": "Whole Life"}, {}, 75.0),  # no type or term match
+        ({"rider_preferences": ["waiver", "long term care"]}, {}, 90.0),  # half of desired riders
+        ({"desired_coverage": 150000}, {}, 95.0),  # halfway between midpoint and max face
+        (
+            {},
+            {"am_best_rating": "B+", "tier_structure": None, "typical_premium_tier": "high"},
+            90.0,
+        ),
+        ({"medical_conditions": {"diabetes": True}}, {}, 97.0),  # full medical with conditions
+    ],
+)
+def test_score_components(profile_changes, rule_changes, expected):
+    """Each client-dependent and precomputed component contributes its weight."""
+    rule = rule_from_dict({**IDEAL_RULE, **rule_changes})
+    assert rule.score({**IDEAL_PROFILE, **profile_changes}) == pytest.approx(expected)
+
+
+def sorted_reference(rules, profile):
+    """The selection assign() must reproduce: a stable sort of every eligible product."""
+    catalog = RuleSet.from_rules(rules).catalog
+    eligible = [
+        (rule.score(profile), rule.product, rule.typical_premium_tier, rule.underwriting_type)
+        for rule, ok in zip(rules, catalog.eligibility_mask(profile))
+        if ok
+    ]
+    eligible.sort(key=lambda p: p[0], reverse=True)
+    return (
+        [p[:2] for p in eligible][:3],
+        [p[:2] for p in eligible if p[2] == "low"][:2],
+        [p[:2] for p in eligible if "Simplified" in p[3] or "Guaranteed Issue" in p[3]][:2],
+    )
+
+
+def test_top_k_matches_full_sort():
+    """Bounded heaps pick the same products, in the same order, as sorting everything."""
+    rules = load_rules() * 20  # duplicates force score ties
+    rule_set = RuleSet.from_rules(rules)
+    profiles = [
+        {"age": 65, "desired_coverage": 15000, "coverage_type": "Final Expense"},
+        {"age": 35, "desired_coverage": 250000, "coverage_type": "Term", "smoker": True},
+        {"age": 55, "desired_coverage": 50000, "coverage_type": "Whole Life",
+         "medical_conditions": {"diabetes": True}},
+    ]
+
+    for profile in profiles:
+        result = assign(profile, rule_set)
+        recommendations, budget, alternatives = sorted_reference(rules, profile)
+
+        def picks(section):
+            return [(p["score"], p["product"]) for p in section]
+
+        assert picks(result["recommendations"]) == recommendations
+        assert picks(result["budget_options"]) == budget
+        assert picks(result["alternatives"]) == alternatives
+        assert result["best_match"] is result["recommendations"][0]
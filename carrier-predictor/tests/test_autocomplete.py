@@ -0,0 +1,56 @@
+"""Tests for the medication and condition autocomplete index."""
+
+from fastapi.testclient import TestClient
+
+from src.ai.autocomplete import AutocompleteIndex, trigrams
+from src.app import app
+
+client = TestClient(app)
+
+TERMS = [
+    ("Metformin", "medication"),
+    ("Metoprolol", "medication"),
+    ("Lisinopril", "medication"),
+    ("Diabetes Mellitus", "condition"),
+    ("Controlled diabetes (Type 2)", "accepted"),
+]
+
+
+def test_prefix_matches_any_word_in_rank_order():
+    """Prefixes match word starts; medications rank ahead of other kinds."""
+    index = AutocompleteIndex(TERMS)
+
+    assert [s.term for s in index.suggest("met")] == ["Metformin", "Metoprolol"]
+    assert [s.term for s in index.suggest("diab")] == [
+        "Diabetes Mellitus",
+        "Controlled diabetes (Type 2)",
+    ]
+    accepted = index.suggest("diab", kind="accepted")
+    assert [s.term for s in accepted] == ["Controlled diabetes (Type 2)"]
+    assert index.suggest("  ") == []
+
+
+def test_typos_fall_back_to_trigram_matches():
+    """Misspellings are matched by shared trigrams."""
+    index = AutocompleteIndex(TERMS)
+
+    suggestions = index.suggest("lisinipril")
+    assert [s.term for s in suggestions] == ["Lisinopril"]
+    assert suggestions[0].match == "fuzzy"
+    assert 0.5 <= suggestions[0].score < 1.0
+
+    assert [s.term for s in index.suggest("metforman", limit=1)] == ["Metformin"]
+    assert trigrams("ab cd") == ["  a", " ab", "  c", " cd"]
+
+
+def test_autocomplete_endpoint():
+    """The endpoint serves reference-guide and carrier accepted-list terms."""
+    response = client.get("/autocomplete", params={"q": "Eliq"})
+    assert response.status_code == 200
+    assert response.json()["suggestions"][0]["term"] == "Eliquis"
+
+    fuzzy = client.get("/autocomplete", params={"q": "metforman", "limit": 3}).json()
+    assert fuzzy["suggestions"][0]["term"] == "Metformin"
+
+    accepted = client.get("/autocomplete", params={"q": "controlled", "kind": "accepted"}).json()
+    assert accepted["suggestions"] and all(s["kind"] == "accepted" for s in accepted["suggestions"])
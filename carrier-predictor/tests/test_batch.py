@@ -0,0 +1,36 @@
+"""Tests for batch upload parsing."""
+
+import io
+
+from src.ai.batch import iter_profiles
+
+
+def test_jsonl_records_and_errors():
+    """JSONL lines become profiles; bad lines become per-line errors."""
+    upload = io.BytesIO(b'{"age": 65, "state": "TX"}\n\n[1, 2]\n{"age": 40}\n')
+
+    records = list(iter_profiles(upload, "jsonl"))
+
+    assert records[0] == (1, {"age": 65, "state": "TX"}, None)
+    assert records[1][0] == 3 and records[1][1] is None
+    assert records[2] == (4, {"age": 40}, None)
+
+
+def test_csv_coercion_and_quoted_newlines():
+    """CSV cells are typed, lists split on ';' and quoted fields may span lines."""
+    upload = io.BytesIO(
+        b"first_name,age,smoker,medications,medical_conditions.diabetes,state\n"
+        b'"Pat\nJr",65,no,Metformin; Lisinopril,true,TX\n'
+    )
+
+    [(line_number, profile, error)] = list(iter_profiles(upload, "csv"))
+
+    assert error is None
+    assert profile == {
+        "first_name": "Pat\nJr",
+        "age": 65,
+        "smoker": False,
+        "medications": ["Metformin", "Lisinopril"],
+        "medical_conditions": {"diabetes": True},
+        "state": "TX",
+    }
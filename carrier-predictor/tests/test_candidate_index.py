@@ -0,0 +1,126 @@
+"""Tests for the eligibility decision-tree index."""
+
+import pickle
+import random
+
+import numpy as np
+
+from src.ai import candidate_index
+from src.ai.assigner import rule_from_dict
+from src.ai.catalog import CompiledCatalog
+from src.ai.profile import ProfileContext
+from src.ai.ruleset import RuleSet
+
+
+def test_memoized_leaves_match_interpreted_rules(random_profile, interpreted_mask):
+    """Profiles answered from a warm leaf get the same mask as the rule predicates."""
+    rules = RuleSet.load().rules
+    catalog = CompiledCatalog(rules)
+    rng = random.Random(7)
+    profiles = [random_profile(rng) for _ in range(1000)]
+
+    for _ in range(2):
+        for profile in profiles:
+            expected = interpreted_mask(rules, profile)
+            assert np.array_equal(catalog.eligibility_mask(profile), expected)
+    assert 0 < len(catalog.candidate_index) < len(profiles)
+
+
+def test_leaves_hold_only_candidate_indices(rule_set, random_profile):
+    """A leaf lists its surviving products, however many others the catalog holds."""
+    elsewhere = [
+        rule_from_dict({
+            "carrier": "Hawaii Mutual",
+            "product": f"Island Term {i}",
+            "face_amount": {"min": 1000, "max": 1_000_000},
+            "issue_ages": {"min": 0, "max": 120},
+            "state_availability": {"states": ["HI"], "except": []},
+        })
+        for i in range(500)
+    ]
+    catalog = CompiledCatalog(list(rule_set) + elsewhere)
+    profile = {"age": 60, "desired_coverage": 25000, "state": "TX"}
+
+    leaf = catalog.candidate_index.candidates(ProfileContext.ensure(profile))
+    assert leaf.dtype.kind == "i" and not leaf.flags.writeable
+    assert leaf.max() < len(rule_set)
+
+    rng = random.Random(3)
+    for _ in range(200):
+        profile = random_profile(rng)
+        eligible = catalog.eligible_indices(profile)
+        assert np.array_equal(eligible, np.flatnonzero(catalog.eligibility_mask(profile)))
+
+
+def test_least_recently_used_leaves_are_evicted(rule_set, monkeypatch):
+    """The leaf memo keeps the most recently used leaves up to MAX_LEAVES."""
+    monkeypatch.setattr(candidate_index, "MAX_LEAVES", 2)
+    catalog = CompiledCatalog(rule_set.rules)
+    profiles = [
+        {"age": 60, "desired_coverage": 25000, "state": state} for state in ("TX", "NY", "FL")
+    ]
+
+    catalog.eligible_indices(profiles[0])
+    catalog.eligible_indices(profiles[1])
+    catalog.eligible_indices(profiles[0])
+    catalog.eligible_indices(profiles[2])
+
+    index = catalog.candidate_index
+    assert [key[0] for key in index._leaves] == ["TX", "FL"]
+
+
+def test_bands_split_at_product_limits():
+    """Face amounts on either side of a limit, and ages with different rules, get separate bands."""
+    catalog = CompiledCatalog([
+        rule_from_dict({
+            "carrier": "Test Carrier",
+            "product": "Small",
+            "face_amount": {"min": 5000, "max": 50000},
+            "issue_ages": {"min": 50, "max": 85},
+        }),
+        rule_from_dict({
+            "carrier": "Test Carrier",
+            "product": "Large",
+            "face_amount": {"min": 50000, "max": 500000},
+            "issue_ages": {"min": 18, "max": 65},
+        }),
+    ])
+    index = catalog.candidate_index
+
+    assert index.face_breakpoints == [5000, 50000, 500000]
+    bands = [index.face_band(face) for face in (1000, 5000, 20000, 49999, 50000, 50001)]
+    assert bands == [0, 1, 2, 2, 3, 4]
+    assert index.face_band(0) is None
+
+    assert index.age_band[20] == index.age_band[40] != index.age_band[60]
+    assert index.age_band[60] != index.age_band[70] == index.age_band[80]
+
+    assert list(catalog.eligibility_mask({"age": 60, "desired_coverage": 50000})) == [True, True]
+    assert list(catalog.eligibility_mask({"age": 60, "desired_coverage": 50001})) == [False, True]
+    assert list(catalog.eligibility_mask({"age": 70, "desired_coverage": 50000})) == [True, False]
+
+
+def test_survival_report_narrows_to_eligible_count(random_profile):
+    """Survivor counts never grow from one stage to the next and end at the eligible count."""
+    catalog = RuleSet.load().catalog
+    rng = random.Random(11)
+
+    for _ in range(300):
+        profile = random_profile(rng)
+        report = catalog.survival(profile)
+        counts = [count for _, count in report]
+
+        assert report[0] == ("catalog", catalog.size)
+        assert counts == sorted(counts, reverse=True)
+        assert counts[-1] == int(catalog.eligibility_mask(profile).sum())
+
+
+def test_leaves_stay_out_of_snapshots():
+    """The leaf cache is rebuilt on demand rather than pickled."""
+    catalog = CompiledCatalog(RuleSet.load().rules)
+    catalog.eligibility_mask({"age": 60, "desired_coverage": 25000, "state": "TX"})
+    assert len(catalog.candidate_index) == 1
+
+    restored = pickle.loads(pickle.dumps(catalog))
+    assert len(restored.candidate_index) == 0
+    assert restored.candidate_index.catalog is restored
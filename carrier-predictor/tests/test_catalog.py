@@ -0,0 +1,175 @@
+"""Tests for the vectorized compiled catalog."""
+
+import random
+
+import numpy as np
+
+from src.ai.assigner import rule_from_dict
+from src.ai.bitset import bits_to_mask, iter_bits, mask_to_bits
+from src.ai.catalog import CompiledCatalog
+
+
+def test_mask_matches_interpreted_rules(rule_set, random_profile, interpreted_mask):
+    """Vectorized eligibility is identical to the per-rule predicates."""
+    rng = random.Random(42)
+
+    for _ in range(2000):
+        profile = random_profile(rng)
+        assert np.array_equal(
+            rule_set.catalog.eligibility_mask(profile), interpreted_mask(rule_set, profile)
+        )
+
+
+def test_face_by_age_bands():
+    """Face limits that vary by issue age are compiled per age row."""
+    rule = rule_from_dict(
+        {
+            "carrier": "Test Carrier",
+            "product": "Banded Term",
+            "face_amount": {"by_age": {"18_45": [50000, 400000], "46_55": [50000, 300000]}},
+            "issue_ages": {"min": 18, "max": 55},
+        }
+    )
+    catalog = CompiledCatalog([rule])
+
+    assert catalog.age_face_mask(40, 400000)[0]
+    assert not catalog.age_face_mask(50, 400000)[0]
+    assert catalog.age_face_mask(50, 300000)[0]
+
+
+def test_scales_to_large_catalog(rule_set, random_profile, interpreted_mask):
+    """A catalog of thousands of products gives the same per-product answers."""
+    large = list(rule_set) * 100
+    catalog = CompiledCatalog(large)
+    rng = random.Random(7)
+
+    for _ in range(20):
+        profile = random_profile(rng)
+        assert np.array_equal(catalog.eligibility_mask(profile), interpreted_mask(large, profile))
+
+
+def test_knockout_bitsets():
+    """Knockout answers OR together per-condition product bitsets."""
+    rules = [
+        rule_from_dict(
+            {"carrier": "A", "product": "One", "knockouts": {"any": [{"dialysis": True}]}}
+        ),
+        rule_from_dict(
+            {"carrier": "B", "product": "Two", "knockouts": {"any": [{"hospice_care": True}]}}
+        ),
+        rule_from_dict(
+            {"carrier": "C", "product": "Three", "knockouts": {"any": [{"dialysis": True}]}}
+        ),
+    ]
+    catalog = CompiledCatalog(rules)
+
+    assert catalog.knockout_bits({"age": 50}) == 0
+    assert catalog.knockout_bits({"dialysis": True}) == 0b101
+    assert catalog.knockout_bits({"dialysis": True, "hospice_care": True}) == 0b111
+    assert list(iter_bits(0b101)) == [0, 2]
+    assert mask_to_bits(bits_to_mask(0b101, 3)) == 0b101
+
+
+def test_fingerprint_ignores_unread_fields(rule_set):
+    """Fields no rule reads don't change the fingerprint; read fields do."""
+    catalog = rule_set.catalog
+    profile = {"age": 65, "desired_coverage": 15000, "coverage_type": "Final Expense"}
+
+    assert catalog.fingerprint(profile) == catalog.fingerprint(
+        {**profile, "first_name": "Ana", "last_name": "Lee"}
+    )
+    assert catalog.fingerprint(profile) != catalog.fingerprint({**profile, "age": 66})
+    assert catalog.fingerprint(profile) != catalog.fingerprint({**profile, "dialysis": True})
+
+
+def test_state_availability():
+    """Products are filtered by their except lists and optional allowlists."""
+    rules = [
+        rule_from_dict({
+            "carrier": "A", "product": "All",
+            "state_availability": {"all_states": True, "except": []},
+        }),
+        rule_from_dict({
+            "carrier": "B", "product": "Not NY",
+            "state_availability": {"all_states": False, "except": ["NY", "CA"]},
+        }),
+        rule_from_dict({
+            "carrier": "C", "product": "TX only",
+            "state_availability": {"states": ["TX"], "except": []},
+        }),
+    ]
+    catalog = CompiledCatalog(rules)
+
+    assert catalog.state_mask("TX").tolist() == [True, True, True]
+    assert catalog.state_mask("NY").tolist() == [True, False, False]
+    assert catalog.state_mask("FL").tolist() == [True, True, False]
+    assert catalog.state_mask(None).tolist() == [True, True, True]
+    assert rules[1].available_in_state(" ca ") is False
+
+
+def test_uhl_final_expense_not_offered_in_new_york(rule_set):
+    """UHL Final Expense Series is eligible in Texas but filtered out in NY and CA."""
+    catalog = rule_set.catalog
+    index = next(i for i, r in enumerate(catalog.rules) if r.product == "Final Expense Series")
+    profile = {"age": 65, "desired_coverage": 15000, "coverage_type": "Final Expense"}
+
+    assert catalog.eligibility_mask({**profile, "state": "TX"})[index]
+    assert not catalog.eligibility_mask({**profile, "state": "NY"})[index]
+    assert not catalog.eligibility_mask({**profile, "state": "ca"})[index]
+
+
+def test_face_bands_by_age_make_products_eligible(rule_set):
+    """Products whose face limits vary by age are eligible inside their bands."""
+    catalog = rule_set.catalog
+    index = {rule.product: i for i, rule in enumerate(catalog.rules)}
+    kcl = index["Signature Term Express Level 20"]
+    uhl = index["Express Issue Premier (Immediate Benefit)"]
+
+    def eligible(age, face):
+        return catalog.eligibility_mask({"age": age, "desired_coverage": face, "state": "TX"})
+
+    assert eligible(40, 400000)[kcl]
+    assert eligible(50, 300000)[kcl]
+    assert not eligible(50, 400000)[kcl]
+    assert eligible(65, 75000)[uhl]
+    assert eligible(75, 50000)[uhl]
+    assert not eligible(75, 75000)[uhl]
+
+
+def test_build_chart_tables():
+    """Dense build tables agree with the rules, per profile and in bulk."""
+    charts = [
+        {"max_bmi": {"M": 40, "F": 38, "standard": 42}, "weight_by_height": {"5_10": [130, 250]}},
+        {"max_bmi": 35, "weight_by_height": {"5_6": [110, 200], "6_2": [150, 300]}},
+        {"max_bmi": {"F": 36}},
+    ]
+    build_rules = [
+        rule_from_dict(
+            {"carrier": "Test", "product": f"Build {i}", "eligibility": {"build": build}}
+        )
+        for i, build in enumerate(charts)
+    ]
+    catalog = CompiledCatalog(build_rules)
+    assert catalog.build_height_base == 66
+    assert catalog.build_weight_low.shape == (9, 3)
+
+    rng = random.Random(11)
+    builds = [
+        (rng.choice(["M", "F", "X"]), rng.choice([5, 6]), rng.randint(0, 11), rng.randint(90, 330))
+        for _ in range(300)
+    ]
+    matrix = catalog.build_fail_matrix(
+        [gender for gender, _, _, _ in builds],
+        [ft * 12 + inches for _, ft, inches, _ in builds],
+        [weight for _, _, _, weight in builds],
+    )
+    for (gender, ft, inches, weight), row in zip(builds, matrix):
+        profile = {"gender": gender, "height_ft": ft, "height_in": inches, "weight": weight}
+        expected = np.array([not rule.passes_health(profile) for rule in build_rules])
+        assert (catalog.health_fail_mask(profile) == expected).all(), profile
+        # height_in 0 leaves BMI unknown per profile; the bulk path still screens it
+        if inches:
+            assert (row == expected).all(), profile
+
+    # 5'10" at 260 lb exceeds the first product's weight range but not its BMI cap
+    assert list(catalog.build_fail_matrix(["M"], [70], [260])[0]) == [True, True, False]
@@ -0,0 +1,110 @@
+"""Tests for the memory-mapped chunk metadata store."""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from src.services.chunk_store import ChunkStore
+from src.services.embedder import EmbedderService
+
+CHUNKS = [
+    {"text": "Aetna accepts controlled diabetes", "source_path": "a.pdf", "carrier_guess": "Aetna",
+     "product_guess": "Final Expense", "page_num": 3},
+    None,  # Removed chunk
+    {"text": "Fóresters déclines insulin", "source_path": "f.txt", "carrier_guess": "Foresters",
+     "product_guess": "", "page_num": None},
+]
+
+
+def test_round_trip_and_removed_rows(tmp_path):
+    """Rows decode to the dicts that were written, removed chunks to None."""
+    assert ChunkStore.write(tmp_path, CHUNKS) == 3
+    store = ChunkStore(tmp_path)
+
+    assert len(store) == 3 and store.live_count == 2
+    assert list(store) == CHUNKS
+    assert store[-1] == CHUNKS[2]
+    assert isinstance(store.text_blob, np.memmap)
+
+
+def test_saved_index_is_memory_mapped_and_copied_before_changes(tmp_path):
+    """A loaded index serves from mmaps; changing it switches to private copies."""
+    vectors = np.random.default_rng(1).standard_normal((3, 8), dtype=np.float32)
+    embedder = EmbedderService()
+    embedder.index_dir = tmp_path
+    embedder.reset_index(8)
+    embedder.add_chunks([chunk or {"text": "gone"} for chunk in CHUNKS], vectors)
+    embedder.remove_chunks([1])
+    embedder.save_index()
+    assert not (tmp_path / "metadata.pkl").exists()
+
+    loaded = EmbedderService()
+    loaded.index_dir = tmp_path
+    assert loaded.load_index(mmap=True)
+    assert loaded.index_mmapped and isinstance(loaded.metadata, ChunkStore)
+    _, ids = loaded.search(vectors[2:], 1)
+    assert loaded.chunk_metadata(int(ids[0, 0])) == CHUNKS[2]
+    assert loaded.get_index_info()["num_metadata"] == 2
+
+    loaded.remove_chunks([0])
+    assert not loaded.index_mmapped and isinstance(loaded.metadata, list)
+    assert loaded.index.ntotal == 1
+    assert ChunkStore(loaded.generation_dir()).live_count == 2  # Saved files untouched
+
+
+def test_legacy_pickled_metadata_still_loads(tmp_path):
+    """An index saved as faiss.index + metadata.pkl loads, and saving it converts the layout."""
+    import faiss
+
+    embedder = EmbedderService()
+    embedder.reset_index(4)
+    embedder.add_chunks([CHUNKS[0]], np.ones((1, 4), dtype=np.float32))
+    faiss.write_index(embedder.index, str(tmp_path / "faiss.index"))
+    with open(tmp_path / "metadata.pkl", "wb") as f:
+        pickle.dump([CHUNKS[0]], f)
+
+    legacy = EmbedderService()
+    legacy.index_dir = tmp_path
+    assert legacy.index_exists() and legacy.load_index()
+    assert legacy.metadata == [CHUNKS[0]] and legacy.generation is None
+
+    legacy.save_index()
+    assert ChunkStore.exists(legacy.generation_dir())
+    assert not (tmp_path / "metadata.pkl").exists() and not (tmp_path / "faiss.index").exists()
+
+
+def test_saves_swap_whole_generations(tmp_path, monkeypatch):
+    """Readers open an index with the metadata saved alongside it; failed saves change nothing."""
+    vectors = np.eye(4, dtype=np.float32)
+    embedder = EmbedderService()
+    embedder.index_dir = tmp_path
+    embedder.reset_index(4)
+    embedder.add_chunks([CHUNKS[0]], vectors[:1])
+    embedder.save_index(extra_files={"note.txt": b"first"})
+    first = embedder.generation
+
+    reader = EmbedderService()
+    reader.index_dir = tmp_path
+    assert reader.load_index(mmap=True) and reader.generation == first
+
+    embedder.add_chunks([CHUNKS[2]], vectors[1:2])
+    embedder.save_index(extra_files={"note.txt": b"second"})
+    assert embedder.current_generation() == embedder.generation != first
+    # The reader keeps serving its own, complete generation
+    assert reader.index.ntotal == len(reader.metadata) == 1
+    assert (reader.generation_dir() / "note.txt").read_bytes() == b"first"
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    second = embedder.generation
+    monkeypatch.setattr(ChunkStore, "write", fail)
+    with pytest.raises(OSError):
+        embedder.save_index()
+    assert embedder.current_generation() == second
+    monkeypatch.undo()
+
+    embedder.save_index()  # Keeps the previous generation, prunes older ones
+    kept = sorted(path.name for path in (tmp_path / "generations").iterdir())
+    assert kept == [second, embedder.generation]
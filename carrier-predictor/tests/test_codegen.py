@@ -0,0 +1,86 @@
+"""Tests for rules compiled into generated Python predicates."""
+
+import pickle
+import random
+
+from src.ai import codegen
+from src.ai.assigner import rule_from_dict
+from src.ai.codegen import compile_predicate, differential_check, generate_predicate_source
+from src.ai.ruleset import RuleSet
+
+
+def test_compiled_predicates_match_interpreted_rules(random_profile):
+    """Differential mode: compiled and interpreted eligibility agree on random profiles."""
+    rng = random.Random(17)
+    profiles = []
+    for _ in range(1500):
+        profile = random_profile(rng)
+        profile["term_length"] = rng.choice([None, 10, 20, 30])
+        profile["prior_decline_carrier"] = rng.choice(["", "uhl", "mutual of omaha"])
+        profiles.append(profile)
+
+    assert differential_check(RuleSet.load().rules, profiles) == []
+
+
+def test_generated_source_drops_absent_sections():
+    """Only the sections a rule defines are emitted, with limits inlined."""
+    rule = rule_from_dict(
+        {
+            "carrier": "Test Carrier",
+            "product": "Simple",
+            "face_amount": {"min": 5000, "max": 100000},
+            "issue_ages": {"min": 50, "max": 85},
+            "eligibility": {"driving": {"max_major_violations": 2}},
+        }
+    )
+    source, namespace = generate_predicate_source(rule)
+
+    assert "5000 <= face <= 100000" in source
+    assert "50 <= age <= 85" in source
+    assert "ctx.major_violations > 2" in source
+    for absent in ("bmi", "state", "medications", "felony", "dui"):
+        assert absent not in source
+    assert namespace == {}
+
+    assert rule.is_eligible({"age": 60, "desired_coverage": 20000, "major_violations": 1})
+    assert not rule.is_eligible({"age": 60, "desired_coverage": 20000, "major_violations": 3})
+
+
+def test_predicates_cached_by_content_hash():
+    """Rules from the same YAML content share one compiled function."""
+    data = {
+        "carrier": "Test Carrier",
+        "product": "Cached",
+        "face_amount": {"min": 1000, "max": 2000},
+    }
+
+    first = compile_predicate(rule_from_dict(data, source_hash="abc123"))
+    assert compile_predicate(rule_from_dict(data, source_hash="abc123")) is first
+    assert compile_predicate(rule_from_dict(data, source_hash="def456")) is not first
+
+
+def test_predicate_cache_is_bounded(monkeypatch):
+    """Edited files add cache entries; the least recently used are evicted."""
+    monkeypatch.setattr(codegen, "PREDICATE_CACHE_SIZE", 2)
+    data = {"carrier": "Test Carrier", "product": "Edited", "face_amount": {"min": 1, "max": 2}}
+
+    first = compile_predicate(rule_from_dict(data, source_hash="v1"))
+    compile_predicate(rule_from_dict(data, source_hash="v2"))
+    assert compile_predicate(rule_from_dict(data, source_hash="v1")) is first
+    compile_predicate(rule_from_dict(data, source_hash="v3"))
+
+    version = codegen.CODEGEN_VERSION
+    assert list(codegen._cache) == [f"{version}:v1", f"{version}:v3"]
+    assert compile_predicate(rule_from_dict(data, source_hash="v1")) is first
+
+
+def test_rules_with_compiled_predicates_still_pickle():
+    """Compiled predicates stay out of rule set snapshots."""
+    rule = RuleSet.load().rules[0]
+    rule.is_eligible({"age": 65, "desired_coverage": 10000})
+
+    restored = pickle.loads(pickle.dumps(rule))
+    assert "_predicate" not in restored.__dict__
+    assert restored.is_eligible({"age": 65, "desired_coverage": 10000}) == rule.is_eligible(
+        {"age": 65, "desired_coverage": 10000}
+    )
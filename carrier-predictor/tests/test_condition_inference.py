@@ -0,0 +1,41 @@
+"""Tests for medication-to-condition inference."""
+
+from src.ai.condition_inference import apply_condition_inference, infer_conditions
+from src.ai.medication_reference import severity_range
+
+
+def test_infer_conditions_reports_source_drugs():
+    """Each inferred condition lists the medications that indicate it."""
+    inference = infer_conditions(["Lipitor", "Glucophage", "Vitamin D"])
+
+    assert inference.conditions == {
+        "heart_attack": ("Lipitor",),
+        "stroke": ("Lipitor",),
+        "diabetes": ("Glucophage",),
+        "high_cholesterol": ("Lipitor",),
+    }
+    assert inference.unmatched == ("Vitamin D",)
+    assert inference.severity == "Critical"
+
+
+def test_severity_range_parsing():
+    """SEVERITY_LEVEL text maps to a range on the mild..critical scale."""
+    assert severity_range("Mild") == (0, 0)
+    assert severity_range("Moderate to Critical (depends on type and control)") == (1, 3)
+    assert severity_range("Varies greatly by surgery type") is None
+    assert infer_conditions(["Synthroid"]).severity == "Mild"
+    assert infer_conditions([]).severity is None
+
+
+def test_explicit_conditions_are_not_overridden():
+    """Inferred flags fill gaps but never replace an explicit answer."""
+    profile = {"medications": ["Zoloft", "Lisinopril"], "medical_conditions": {"depression": False}}
+    expanded, inference = apply_condition_inference(profile)
+
+    assert expanded["medical_conditions"] == {
+        "depression": False,
+        "anxiety": True,
+        "high_blood_pressure": True,
+    }
+    assert profile["medical_conditions"] == {"depression": False}
+    assert set(inference.conditions) == {"anxiety", "depression", "high_blood_pressure"}
@@ -0,0 +1,67 @@
+"""Tests for the query embedding cache."""
+
+import numpy as np
+
+from src.schemas import ClientInput
+from src.services import embedder_service, query_embedding_cache, retriever_service
+from src.services.embedding_cache import QueryEmbeddingCache
+from src.services.kb_loader import DocumentChunk
+
+
+def test_lru_eviction_and_stats():
+    """Least recently used embeddings are evicted and lookups are counted."""
+    cache = QueryEmbeddingCache(max_size=2, model_name="test-model")
+    cache.put("a", np.ones(4))
+    cache.put("b", np.zeros(4))
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.put("c", np.ones(4))
+
+    assert cache.get("b") is None
+    assert cache.get("c").dtype == np.float32
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_persisted_cache_is_tied_to_its_model(tmp_path):
+    """Saved embeddings reload for the same model and are ignored for another."""
+    path = tmp_path / "query_embeddings.npz"
+    cache = QueryEmbeddingCache(max_size=10, model_name="model-a", path=path)
+    cache.put("Age: 62 State: TX", np.arange(4))
+    assert cache.save() == path
+
+    reloaded = QueryEmbeddingCache(max_size=10, model_name="model-a", path=path)
+    assert np.array_equal(reloaded.get("Age: 62 State: TX"), np.arange(4))
+    assert QueryEmbeddingCache(max_size=10, model_name="model-b", path=path).stats()["size"] == 0
+
+
+def test_equivalent_clients_share_one_embedding(monkeypatch):
+    """Reordered conditions and nearby face amounts reuse the cached query embedding."""
+    embedder_service.build_index([
+        DocumentChunk(
+            text="Final expense whole life for diabetes", source_path="a.txt", carrier_guess="A"
+        ),
+        DocumentChunk(text="Term life for healthy adults", source_path="b.txt", carrier_guess="B"),
+    ])
+    query_embedding_cache.clear()
+    calls = []
+    embed_texts = embedder_service.embed_texts
+    monkeypatch.setattr(
+        embedder_service, "embed_texts", lambda texts: calls.append(texts) or embed_texts(texts)
+    )
+
+    first = ClientInput(
+        age=62, state="TX", smoker=False, coverage_type="Whole Life",
+        desired_coverage=230000, health_conditions=["neuropathy", "diabetes"],
+    )
+    second = first.model_copy(
+        update={"desired_coverage": 240000, "health_conditions": ["diabetes", "neuropathy"]}
+    )
+
+    assert retriever_service.canonical_query(first) == retriever_service.canonical_query(second)
+    assert "Amount: $250000" in retriever_service.canonical_query(first)
+    assert retriever_service.retrieve(first, top_k=2) == retriever_service.retrieve(second, top_k=2)
+    assert len(calls) == 1
+    assert query_embedding_cache.stats()["hits"] == 1
+
+    embedder_service.index = None
+    embedder_service.metadata = []
@@ -0,0 +1,31 @@
+"""Tests for atomic file writes."""
+
+import pytest
+
+from src.services.fileio import write_atomic
+
+
+def test_write_atomic_replaces_target(tmp_path):
+    """The target gets the new content and no temporary file is left behind."""
+    target = tmp_path / "sub" / "data.bin"
+    write_atomic(target, lambda f: f.write(b"old"))
+    write_atomic(target, lambda f: f.write(b"new"))
+
+    assert target.read_bytes() == b"new"
+    assert [p.name for p in target.parent.iterdir()] == ["data.bin"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    """A writer that raises leaves the old file intact and cleans up."""
+    target = tmp_path / "data.bin"
+    target.write_bytes(b"old")
+
+    def fail(f):
+        f.write(b"partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        write_atomic(target, fail)
+
+    assert target.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["data.bin"]
@@ -0,0 +1,72 @@
+"""Tests for band-table interval indexes."""
+
+import pytest
+
+from src.ai.assigner import load_rules, rule_from_dict
+from src.ai.intervals import IntervalIndex, build_face_index
+
+
+@pytest.fixture(scope="module")
+def rules_by_product():
+    """Load the real product catalog keyed by product name."""
+    return {rule.product: rule for rule in load_rules()}
+
+
+def test_interval_index_lookup():
+    """Stabbing queries return every covering band, in priority order."""
+    index = IntervalIndex([(18, 60, 10), (18, 55, 20), (18, 50, 30)])
+
+    assert index.lookup(17) == ()
+    assert index.lookup(18) == (10, 20, 30)
+    assert index.lookup(52) == (10, 20)
+    assert index.lookup(55) == (10, 20)
+    assert index.lookup(55.5) == (10,)
+    assert index.lookup(61) == ()
+    assert index.first(52) == 10
+
+
+def test_face_limits_by_age_band():
+    """Face limits that vary by issue age come from the matching band."""
+    rule = rule_from_dict(
+        {
+            "carrier": "Test Carrier",
+            "product": "Banded Term",
+            "face_amount": {
+                "min": 50000,
+                "max": 400000,
+                "by_age": {
+                    "18_45": [50000, 400000],
+                    "46_55": [50000, 300000],
+                    "56_60": [50000, 200000],
+                },
+            },
+            "issue_ages": {"min": 18, "max": 60},
+        }
+    )
+
+    assert rule.face_limits(40) == (50000, 400000)
+    assert rule.face_limits(58) == (50000, 200000)
+    assert rule.face_limits(61) is None
+    assert rule.supports_face(400000, 40)
+    assert not rule.supports_face(400000, 50)
+
+
+def test_unparsed_age_band_is_reported(caplog):
+    """An unquoted band key (YAML reads 18_45 as 1845) is skipped with a warning."""
+    face_amount = {"by_age": {1845: [50000, 400000], "46_55": [50000, 300000]}}
+    index = build_face_index(face_amount, "Banded Term")
+
+    assert index.first(40) is None
+    assert index.first(50) == (50000, 300000)
+    assert "1845" in caplog.text and "Banded Term" in caplog.text
+
+
+def test_eligible_terms_by_duration(rules_by_product):
+    """Term durations are answered for an issue age in one lookup."""
+    rule = rules_by_product["Term Life Express"]
+
+    assert rule.eligible_terms(45) == (10, 15, 20, 30)
+    assert rule.eligible_terms(52) == (10, 15, 20)
+    assert rule.supports_term(20, 55)
+    assert not rule.supports_term(30, 55)
+    assert not rule.supports_age(61)
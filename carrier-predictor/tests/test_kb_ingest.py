@@ -0,0 +1,161 @@
+"""Tests for incremental knowledge base ingest."""
+
+import json
+import os
+
+import pytest
+
+from src.services import embedder_service
+from src.services.ann_index import IndexSpec
+from src.services.embedder import EmbedderService
+from src.services.kb_ingest import KBIngestor, text_hash
+from src.services.kb_loader import KBLoader
+
+
+@pytest.fixture
+def ingestor(tmp_path, monkeypatch):
+    """Ingestor with its own index directory, counting texts sent to the model."""
+    embedder = EmbedderService()
+    embedder.index_dir = tmp_path / "index"
+    embedded = []
+
+    def embed_texts(texts):
+        embedded.extend(texts)
+        return embedder_service.embed_texts(texts)
+
+    monkeypatch.setattr(embedder, "embed_texts", embed_texts)
+    ingestor = KBIngestor(embedder, KBLoader())
+    ingestor.embedded = embedded
+    return ingestor
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """Three small carrier documents."""
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    for name, text in [
+        ("aetna.txt", "Aetna final expense accepts controlled diabetes with oral medication."),
+        ("foresters.txt", "Foresters term life declines insulin use before age 50."),
+        ("mutual.txt", "Mutual of Omaha living promise covers ages 45 to 85."),
+    ]:
+        (directory / name).write_text(text)
+    return directory
+
+
+def test_changed_file_only_embeds_its_chunks(ingestor, docs):
+    """Re-ingesting after one edit embeds that file only; an untouched tree embeds nothing."""
+    first = ingestor.ingest(str(docs))
+    assert (first.files_added, first.full_rebuild) == (3, True)
+    assert first.total_chunks == ingestor.embedder.index.ntotal == 3
+
+    ingestor.embedded.clear()
+    edited = docs / "foresters.txt"
+    edited.write_text("Foresters term life accepts insulin use after age 50.")
+    report = ingestor.ingest(str(docs))
+    assert (report.files_changed, report.files_unchanged, report.full_rebuild) == (1, 2, False)
+    assert ingestor.embedded == [edited.read_text()]
+    assert (report.vectors_removed, report.vectors_added, report.total_chunks) == (1, 1, 3)
+
+    ingestor.embedded.clear()
+    report = ingestor.ingest(str(docs))
+    assert report.files_unchanged == 3 and ingestor.embedded == []
+
+
+def test_removed_file_drops_its_vectors(ingestor, docs):
+    """Deleting a document removes its vectors and metadata from the index."""
+    ingestor.ingest(str(docs))
+    (docs / "mutual.txt").unlink()
+
+    report = ingestor.ingest(str(docs))
+    embedder = ingestor.embedder
+    assert (report.files_removed, report.vectors_removed, report.total_chunks) == (1, 1, 2)
+    sources = {chunk["source_path"] for chunk in embedder.metadata if chunk is not None}
+    assert not any(source.endswith("mutual.txt") for source in sources)
+
+    query = embedder.embed_texts(["Mutual of Omaha living promise"])
+    _, ids = embedder.index.search(query, 3)
+    hits = [int(chunk_id) for chunk_id in ids[0] if chunk_id != -1]
+    assert all(embedder.chunk_metadata(chunk_id) is not None for chunk_id in hits)
+
+
+def test_state_survives_a_restart(ingestor, docs):
+    """A fresh process reuses the saved manifest and the vectors in the saved index."""
+    ingestor.ingest(str(docs))
+    os.utime(docs / "aetna.txt", ns=(0, 0))  # Touched but identical content
+
+    restarted = KBIngestor(EmbedderService(), ingestor.loader)
+    restarted.embedder.index_dir = ingestor.embedder.index_dir
+    restarted.embedder.embed_texts = ingestor.embedder.embed_texts
+    ingestor.embedded.clear()
+
+    report = restarted.ingest(str(docs))
+    assert (report.full_rebuild, report.files_unchanged, ingestor.embedded) == (False, 3, [])
+
+    # A forced rebuild re-indexes everything from vectors read back from the index
+    report = restarted.ingest(str(docs), rebuild=True)
+    assert (report.full_rebuild, report.chunks_reused, report.total_chunks) == (True, 3, 3)
+    assert ingestor.embedded == []
+
+
+def test_empty_directory_leaves_index_untouched(ingestor, docs, tmp_path):
+    """Ingesting an empty or textless directory fails without wiping the saved index."""
+    ingestor.ingest(str(docs))
+    empty = tmp_path / "empty"
+    empty.mkdir()
+
+    with pytest.raises(ValueError, match="No .pdf, .html or .txt documents"):
+        ingestor.ingest(str(empty))
+
+    (empty / "blank.txt").write_text("   ")
+    with pytest.raises(ValueError, match="No text could be extracted"):
+        ingestor.ingest(str(empty), rebuild=True)
+
+    restarted = EmbedderService()
+    restarted.index_dir = ingestor.embedder.index_dir
+    assert restarted.load_index() and restarted.index.ntotal == 3
+    assert ingestor.ingest(str(docs)).files_unchanged == 3
+
+
+def test_known_chunk_texts_are_read_back_not_embedded(ingestor, docs):
+    """Moved files and index setting changes reuse the indexed vectors."""
+    ingestor.ingest(str(docs))
+    (docs / "aetna.txt").rename(docs / "aetna-2024.txt")
+    ingestor.embedded.clear()
+
+    report = ingestor.ingest(str(docs))
+    assert (report.files_added, report.files_removed, report.chunks_reused) == (1, 1, 1)
+    assert ingestor.embedded == []
+    manifest = json.loads((ingestor.embedder.generation_dir() / "manifest.json").read_text())
+    entry = manifest["files"][str(docs / "aetna-2024.txt")]
+    assert entry["chunk_hashes"] == [text_hash((docs / "aetna-2024.txt").read_text())]
+
+    ingestor.embedder.index_spec = IndexSpec(type="hnsw")
+    report = ingestor.ingest(str(docs))
+    assert (report.full_rebuild, report.chunks_reused, ingestor.embedded) == (True, 3, [])
+    assert ingestor.embedder.get_index_info()["index"]["type"] == "hnsw"
+
+
+def test_ivf_lists_follow_the_whole_corpus(ingestor, tmp_path):
+    """IVF is trained on every new file at once, and retrained as the corpus grows."""
+    ingestor.embedder.index_spec = IndexSpec(type="ivf", ivf_nlist=64)
+    ingestor.loader.chunk_size, ingestor.loader.chunk_overlap = 10, 0
+    directory = tmp_path / "many"
+    directory.mkdir()
+
+    def add_files(names):
+        for name in names:
+            words = [f"{name}-{i}" for i in range(450)]  # 45 chunks of 10 words
+            (directory / f"{name}.txt").write_text(" ".join(words))
+
+    def nlist():
+        return ingestor.embedder.get_index_info()["index"]["ivf_nlist"]
+
+    add_files(["a", "b", "c"])
+    report = ingestor.ingest(str(directory))
+    assert report.total_chunks == 135 and nlist() == 135 // 39  # Not sized to a.txt alone
+
+    add_files(["d", "e", "f", "g", "h", "i"])
+    report = ingestor.ingest(str(directory))
+    assert (report.full_rebuild, report.total_chunks) == (False, 405)
+    assert nlist() == 405 // 39
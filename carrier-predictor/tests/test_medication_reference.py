@@ -0,0 +1,96 @@
+"""Tests for the structured medication reference index and its endpoints."""
+
+from fastapi.testclient import TestClient
+
+from src.ai.medication_reference import (
+    MedicationReference,
+    default_medication_reference,
+    parse_fields,
+)
+from src.ai.medications import default_medication_aliases
+from src.app import app
+
+client = TestClient(app)
+
+SAMPLE_REFERENCE = """\
+===CONDITION_1_ASTHMA_COPD===
+CONDITION_NAME: Asthma / COPD
+SEVERITY: Respiratory condition
+MEDICATIONS_PRESCRIBED:
+  MEDICATION_1:
+    GENERIC: Albuterol
+    BRAND: ProAir, Ventolin
+    PURPOSE: Rescue inhaler
+UNDERWRITING_IMPACT:
+  SEVERITY_LEVEL: Moderate
+CARRIER_POSITIONING:
+  BOX_2_CARRIERS:
+    MUTUAL_OF_OMAHA: Accepts mild asthma
+AGENT_GUIDANCE:
+  KEY_QUESTIONS:
+    - Oxygen use?
+    - Hospitalizations?
+
+===MEDICATION_LOOKUP_INDEX===
+MEDICATION_NAME: Salmeterol
+  SEE_CONDITION: Asthma/COPD
+"""
+
+
+def test_parse_fields_nesting():
+    """Indented keys nest into dicts and dash items into lists."""
+    fields = parse_fields(SAMPLE_REFERENCE.split("===\n", 1)[1].splitlines())
+
+    assert fields["CONDITION_NAME"] == "Asthma / COPD"
+    assert fields["MEDICATIONS_PRESCRIBED"]["MEDICATION_1"]["BRAND"] == "ProAir, Ventolin"
+    assert fields["CARRIER_POSITIONING"] == {
+        "BOX_2_CARRIERS": {"MUTUAL_OF_OMAHA": "Accepts mild asthma"}
+    }
+    assert fields["AGENT_GUIDANCE"]["KEY_QUESTIONS"] == ["Oxygen use?", "Hospitalizations?"]
+
+
+def test_lookup_brand_generic_and_index_entries():
+    """Brands, generics and lookup-index-only names resolve to their conditions."""
+    reference = MedicationReference.parse(SAMPLE_REFERENCE)
+
+    match = reference.lookup("ventolin")
+    assert match.medication == "albuterol"
+    assert match.brands == ("ProAir", "Ventolin")
+    assert [c.key for c in match.conditions] == ["ASTHMA_COPD"]
+    assert match.conditions[0].severity_level == "Moderate"
+    assert match.to_dict()["conditions"][0]["purpose"] == "Rescue inhaler"
+
+    assert [c.key for c in reference.lookup("Salmeterol").conditions] == ["ASTHMA_COPD"]
+    assert reference.lookup("Warfarin") is None
+
+
+def test_default_reference_file():
+    """The shipped guide maps brands to every condition the drug indicates."""
+    reference = default_medication_reference()
+
+    # One alias table for rule compilation and lookups
+    assert reference.aliases is default_medication_aliases()
+    assert reference.lookup("Coumadin").medication == "warfarin"
+    assert [c.key for c in reference.lookup("Lipitor").conditions] == [
+        "HEART_ATTACK",
+        "STROKE",
+        "HIGH_CHOLESTEROL",
+    ]
+    assert reference.lookup("Lithium").conditions[0].severity_level == "Severe"
+    assert "BOX_4_CARRIERS" in reference.conditions["DIABETES"].carrier_positioning
+
+
+def test_medication_endpoints():
+    """GET looks up one medication (404 if unknown); POST resolves a list."""
+    response = client.get("/medications/Glucophage")
+    assert response.status_code == 200
+    assert response.json()["medication"] == "metformin"
+    assert response.json()["conditions"][0]["condition"] == "DIABETES"
+
+    assert client.get("/medications/NotADrug").status_code == 404
+
+    medications = ["Lantus", "Zoloft", "NotADrug"]
+    resolved = client.post("/medications/resolve", json={"medications": medications}).json()
+    assert [r["found"] for r in resolved["results"]] == [True, True, False]
+    assert resolved["unmatched"] == ["NotADrug"]
+    assert {c["condition"] for c in resolved["conditions"]} >= {"DIABETES", "DEPRESSION"}
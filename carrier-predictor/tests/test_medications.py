@@ -0,0 +1,53 @@
+"""Tests for canonical medication names and compiled medication rules."""
+
+from src.ai.assigner import rule_from_dict
+from src.ai.catalog import CompiledCatalog
+from src.ai.medications import MedicationAliases, load_medication_aliases
+
+
+def test_reference_file_aliases():
+    """Brand and generic names from the reference file resolve to the generic."""
+    aliases = load_medication_aliases()
+
+    assert aliases.canonical("Coumadin") == "warfarin"
+    assert aliases.canonical("  WARFARIN ") == "warfarin"
+    assert aliases.canonical("Humalog") == "insulin"
+    assert aliases.canonical("Eliquis") == "apixaban"
+    assert aliases.canonical("Unknown Drug") == "unknown drug"
+    assert aliases.canonicalize(["Zestril", "Prinivil", "lisinopril"]) == {"lisinopril"}
+
+
+def test_alias_table_from_pairs():
+    """Unknown names keep their normalized spelling; aliases map to one canonical name."""
+    aliases = MedicationAliases([("Glucophage", "Metformin")])
+
+    assert aliases.canonical("glucophage") == "metformin"
+    assert aliases.canonical("Metformin") == "metformin"
+    assert len(aliases) == 2
+
+
+def test_rejected_medication_matches_brand_name():
+    """A product rejecting a generic also rejects its brand name, in both engines."""
+    rule = rule_from_dict(
+        {
+            "carrier": "Test Carrier",
+            "product": "No Blood Thinners",
+            "eligibility": {
+                "medications": {
+                    "rejected": ["Warfarin"],
+                    "required_for": {"diabetes": ["Metformin"]},
+                }
+            },
+        }
+    )
+    catalog = CompiledCatalog([rule])
+
+    assert rule.rejected_medications == {"warfarin"}
+    for profile, eligible in [
+        ({"medications": ["Coumadin"]}, False),
+        ({"medications": ["Lipitor"]}, True),
+        ({"diabetes": True, "medications": ["Glucophage"]}, True),
+        ({"diabetes": True, "medications": ["Lipitor"]}, False),
+    ]:
+        assert rule.passes_health(profile) is eligible
+        assert bool(catalog.health_fail_mask(profile)[0]) is not eligible
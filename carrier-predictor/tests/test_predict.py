@@ -1,10 +1,12 @@
 """Tests for prediction endpoint."""
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
 from src.app import app
-from src.services import embedder_service
+from src.services import embedder_service, result_cache
 from src.services.kb_loader import DocumentChunk
 
 # Create test client
@@ -58,6 +60,18 @@ def test_health_endpoint():
     assert data["status"] == "healthy"
 
 
+def test_ready_endpoint_separates_retrieval():
+    """/ready reports the rules engine and retrieval separately."""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rules_ready"] is True
+    assert set(data["retrieval"]) >= {"ready", "model_state", "index_loaded"}
+
+    retrieval = client.get("/ready?require_retrieval=true")
+    assert retrieval.status_code == (200 if data["retrieval"]["ready"] else 503)
+
+
 def test_root_endpoint():
     """Test root endpoint."""
     response = client.get("/")
@@ -140,5 +154,171 @@ def test_kb_status():
     assert data["index_exists"] is True  # We created an index in setup
 
 
+FINAL_EXPENSE_PROFILE = {
+    "age": 65,
+    "desired_coverage": 15000,
+    "coverage_type": "Final Expense",
+    "smoker": False,
+    "state": "TX",
+    "medical_conditions": {"diabetes": True},
+}
+
+
+def test_recommend_reports_rule_set_version():
+    """Rules-based endpoint reports the rule set version that served it."""
+    response = client.post("/recommend", json=FINAL_EXPENSE_PROFILE)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["recommendations"]
+    assert len(data["rule_set_version"]) == 12
+
+
+def test_recommend_batch_jsonl_matches_single_calls():
+    """Batch NDJSON results match /recommend for each uploaded profile."""
+    profiles = [
+        FINAL_EXPENSE_PROFILE,
+        {**FINAL_EXPENSE_PROFILE, "age": 30, "coverage_type": "Term"},
+    ]
+    body = "\n".join(json.dumps(p) for p in profiles) + "\nnot json\n"
+
+    response = client.post(
+        "/recommend/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert len(lines) == 4
+    for profile, line in zip(profiles, lines):
+        single = client.post("/recommend", json=profile).json()
+        assert line["recommendations"] == single["recommendations"]
+        assert line["explanation"] == single["explanation"]
+    assert "error" in lines[2]
+    assert lines[3]["done"] is True
+    assert lines[3]["processed"] == 2
+    assert lines[3]["errors"] == 1
+
+
+def test_recommend_batch_csv_without_explanation():
+    """CSV uploads are coerced to profiles and can skip explanation text."""
+    body = (
+        "age,desired_coverage,coverage_type,smoker,state,medical_conditions.diabetes\n"
+        "65,15000,Final Expense,false,TX,true\n"
+    )
+
+    response = client.post(
+        "/recommend/batch?format=csv&include_explanation=false",
+        content=body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    first, summary = [json.loads(line) for line in response.text.splitlines()]
+
+    single = client.post("/recommend", json=FINAL_EXPENSE_PROFILE).json()
+    assert first["recommendations"] == single["recommendations"]
+    assert "explanation" not in first
+    assert summary["processed"] == 1
+
+
+def test_recommend_cache_shares_results_across_names():
+    """Profiles differing only in name hit the cache but keep their own greeting."""
+    result_cache.clear()
+
+    first = client.post("/recommend", json={**FINAL_EXPENSE_PROFILE, "first_name": "Ana"}).json()
+    second = client.post("/recommend", json={**FINAL_EXPENSE_PROFILE, "first_name": "Ben"}).json()
+
+    assert second["recommendations"] == first["recommendations"]
+    assert first["explanation"].startswith("Based on Ana's profile")
+    assert second["explanation"].startswith("Based on Ben's profile")
+
+    stats = client.get("/recommend/cache").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_recommend_infers_conditions_from_medications():
+    """With infer_conditions the response reports conditions inferred per drug."""
+    profile = {**FINAL_EXPENSE_PROFILE, "medications": ["Metformin"]}
+
+    plain = client.post("/recommend", json=profile).json()
+    inferred = client.post("/recommend?infer_conditions=true", json=profile).json()
+
+    assert "condition_inference" not in plain
+    assert inferred["condition_inference"]["inferred_conditions"] == {"diabetes": ["Metformin"]}
+    assert inferred["condition_inference"]["severity_estimate"] == "Moderate to Critical"
+
+
+def test_inferred_conditions_change_scores_not_eligibility():
+    """Inferred flags feed the health-conditions score; the recommended products stay the same."""
+    profile = {**FINAL_EXPENSE_PROFILE, "medical_conditions": {}, "medications": ["Metformin"]}
+
+    plain = client.post("/recommend", json=profile).json()
+    inferred = client.post("/recommend?infer_conditions=true", json=profile).json()
+
+    def scores(data):
+        return {r["product"]: r["score"] for r in data["recommendations"]}
+
+    assert inferred["condition_inference"]["applies_to"] == "scoring"
+    assert scores(inferred).keys() == scores(plain).keys()
+    product = "Silver Eagle Final Expense"
+    assert scores(inferred)[product] > scores(plain)[product]
+
+
+def test_recommend_what_if_matches_single_calls():
+    """Each what-if cell ranks products as /recommend does for that scenario."""
+    response = client.post(
+        "/recommend/what-if",
+        json={
+            "profile": FINAL_EXPENSE_PROFILE,
+            "ages": {"start": 64, "stop": 66},
+            "face_amounts": [10000, 25000],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [(cell["age"], cell["desired_coverage"]) for cell in data["cells"]] == [
+        (64, 10000), (64, 25000), (65, 10000), (65, 25000), (66, 10000), (66, 25000)
+    ]
+
+    for cell in data["cells"]:
+        scenario = {
+            **FINAL_EXPENSE_PROFILE,
+            "age": cell["age"],
+            "desired_coverage": cell["desired_coverage"],
+        }
+        single = client.post("/recommend", json=scenario).json()
+        top = [data["products"][index] for index in cell["products"][:3]]
+        assert [(p["carrier"], p["product"]) for p in top] == [
+            (r["carrier"], r["product"]) for r in single["recommendations"]
+        ]
+        assert cell["scores"][:3] == [r["score"] for r in single["recommendations"]]
+
+    too_large = client.post(
+        "/recommend/what-if",
+        json={
+            "profile": FINAL_EXPENSE_PROFILE,
+            "ages": {"start": 0, "stop": 120},
+            "face_amounts": list(range(1, 200)),
+        },
+    )
+    assert too_large.status_code == 422
+
+
+def test_recommend_trace_reports_rejections():
+    """trace=true explains every rejected product and feeds the /recommend/trace counters."""
+    before = client.get("/recommend/trace").json()["traces"]
+
+    plain = client.post("/recommend", json=FINAL_EXPENSE_PROFILE).json()
+    traced = client.post("/recommend?trace=true", json=FINAL_EXPENSE_PROFILE).json()
+
+    assert "trace" not in plain
+    assert traced["recommendations"] == plain["recommendations"]
+    trace = traced["trace"]
+    assert trace["eligible"] == len(plain["recommendations"]) or trace["eligible"] > 3
+    assert len(trace["rejections"]) == sum(trace["rejected_by_stage"].values())
+    assert {"carrier", "product", "stage"} <= set(trace["rejections"][0])
+    assert client.get("/recommend/trace").json()["traces"] == before + 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,51 @@
+"""Tests for the per-request ProfileContext."""
+
+import dataclasses
+
+import pytest
+
+from src.ai.profile import ProfileContext, calculate_bmi
+
+
+def test_derived_values():
+    """BMI, tobacco status, condition flags and lowercased lists are derived once."""
+    context = ProfileContext.from_profile(
+        {
+            "height_ft": 5,
+            "height_in": 10,
+            "weight": 180,
+            "smoker": True,
+            "medical_conditions": {"diabetes": False, "copd": True},
+            "medications": ["Metformin", "LISINOPRIL"],
+            "coverage_type": "Final Expense",
+            "nicotine_use": True,
+        }
+    )
+
+    assert context.bmi == pytest.approx(25.83, abs=0.01)
+    assert context.tobacco_status == "tobacco"
+    assert context.has_conditions is True
+    assert context.medications_canonical == {"metformin", "lisinopril"}
+    assert context.coverage_type == "final expense"
+    assert context.nicotine_without_tobacco is True
+
+
+def test_missing_build_has_no_bmi():
+    """BMI is None unless height and weight are all provided."""
+    assert calculate_bmi(5, 0, 180) is None
+    assert ProfileContext.from_profile({"age": 40}).bmi is None
+
+
+def test_context_is_immutable():
+    """Neither derived values nor the raw fields can be changed after construction."""
+    profile = {"age": 40}
+    context = ProfileContext.from_profile(profile)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        context.age = 41
+    with pytest.raises(TypeError):
+        context.profile["age"] = 41
+
+    profile["age"] = 50
+    assert context.get("age") == 40
+    assert ProfileContext.ensure(context) is context
@@ -0,0 +1,39 @@
+"""Tests for the recommendation result cache."""
+
+import time
+
+from src.services.result_cache import ResultCache
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted once max_size is exceeded."""
+    cache = ResultCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """Expired entries are dropped and counted as misses."""
+    cache = ResultCache(max_size=10, ttl_seconds=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 0
+
+
+def test_zero_size_disables_cache():
+    """A cache with max_size 0 never stores anything."""
+    cache = ResultCache(max_size=0, ttl_seconds=60)
+    cache.put("a", 1)
+    assert cache.get("a") is None
@@ -4,6 +4,7 @@ import pytest
 
 from src.schemas import ClientInput
 from src.services import embedder_service, retriever_service
+from src.services.embedder import EmbedderService
 from src.services.kb_loader import DocumentChunk
 
 
@@ -30,6 +31,23 @@ def test_build_query():
     assert "neuropathy" in query.lower()
 
 
+def test_embedder_loads_model_lazily(tmp_path):
+    """Creating the service loads nothing; a warm-up thread loads the model."""
+    embedder = EmbedderService()
+    embedder.index_dir = tmp_path
+    assert embedder.model is None
+    assert embedder.readiness() == {
+        "ready": False,
+        "model_state": "not_loaded",
+        "index_loaded": False,
+    }
+
+    embedder.start_warmup().join(timeout=300)
+    assert embedder.model_state == "ready"
+    assert embedder.model is not None
+    assert not embedder.is_ready()  # no saved index to load
+
+
 def test_retrieval_with_mock_index():
     """Test retrieval with a small mock index."""
     # Create mock chunks
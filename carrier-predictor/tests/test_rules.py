@@ -2,8 +2,10 @@
 
 import pytest
 
+from src.ai.snapshot import read_config_snapshot, write_config_snapshot
 from src.schemas import ClientInput
-from src.services import rules_engine
+from src.services import rules_engine, settings
+from src.services.rules import RulesEngine
 
 
 def test_rules_load():
@@ -106,5 +108,22 @@ def test_product_type_matching():
     assert isinstance(whole_life_eligible, dict)
 
 
+def test_carriers_yaml_snapshot(tmp_path, monkeypatch):
+    """A snapshot of carriers.yaml is used only while the file content is unchanged."""
+    yaml_path = tmp_path / "carriers.yaml"
+    yaml_path.write_text("Acme:\n  states: [TX]\n  products: {}\n")
+    snapshot_path = write_config_snapshot(yaml_path.read_bytes(), tmp_path / "config.pkl")
+    monkeypatch.setattr(settings, "carriers_yaml_path", str(yaml_path))
+
+    engine = RulesEngine(snapshot_path)
+    assert engine.carriers["Acme"].is_state_eligible("TX")
+
+    # Edited file: the snapshot no longer matches, so the YAML is parsed again
+    yaml_path.write_text("Acme:\n  states: [FL]\n  products: {}\n")
+    assert read_config_snapshot(yaml_path.read_bytes(), snapshot_path) is None
+    engine.load_rules()
+    assert engine.carriers["Acme"].is_state_eligible("FL")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+"""Tests for the compiled, process-wide rule set."""
+
+import shutil
+
+import pytest
+
+from src.ai.assigner import assign, load_rules
+from src.ai.ruleset import DEFAULT_CARRIERS_DIR, RuleSet, RuleSetCache
+from src.ai.snapshot import read_snapshot, write_snapshot
+
+
+@pytest.fixture
+def carriers_dir(tmp_path):
+    """Copy a few product YAML files into an isolated carriers directory."""
+    for name in ["uhl/final_expense_series.yaml", "sbli/level_term.yaml"]:
+        target = tmp_path / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(DEFAULT_CARRIERS_DIR / name, target)
+    return tmp_path
+
+
+def test_rule_set_matches_load_rules():
+    """RuleSet parses the same catalog as load_rules()."""
+    rule_set = RuleSet.load()
+    loaded = {(r.carrier, r.product) for r in load_rules()}
+
+    assert {(r.carrier, r.product) for r in rule_set} == loaded
+    assert len(rule_set.version) == 12
+
+
+def test_version_is_content_hash(carriers_dir):
+    """Same content gives the same version; edited content gives a new one."""
+    first = RuleSet.load(carriers_dir)
+    assert RuleSet.load(carriers_dir).version == first.version
+
+    path = carriers_dir / "sbli" / "level_term.yaml"
+    path.write_text(path.read_text() + "\n# edited\n")
+    assert RuleSet.load(carriers_dir).version != first.version
+
+
+def test_cache_rebuilds_only_on_content_change(carriers_dir):
+    """The cache serves one shared RuleSet until a source file's content changes."""
+    cache = RuleSetCache(carriers_dir, check_interval=0)
+    first = cache.get()
+    assert cache.get() is first
+
+    # Touching a file without changing it must not rebuild
+    path = carriers_dir / "sbli" / "level_term.yaml"
+    path.write_bytes(path.read_bytes())
+    assert cache.get() is first
+
+    path.write_text(path.read_text() + "\n# edited\n")
+    second = cache.get()
+    assert second is not first
+    assert second.version != first.version
+
+
+def test_assign_accepts_rule_set():
+    """assign() gives identical results for a RuleSet and the equivalent list."""
+    rule_set = RuleSet.load()
+    profile = {
+        "age": 65,
+        "desired_coverage": 15000,
+        "coverage_type": "Final Expense",
+        "smoker": False,
+        "state": "TX",
+    }
+
+    assert assign(profile, rule_set) == assign(profile, list(rule_set))
+
+
+def test_snapshot_round_trip(carriers_dir, tmp_path):
+    """A matching snapshot is loaded instead of parsing, with identical results."""
+    snapshot_path = tmp_path / "rules_snapshot.pkl"
+    parsed = RuleSet.load(carriers_dir)
+    write_snapshot(parsed, snapshot_path)
+
+    loaded = RuleSet.load(carriers_dir, snapshot_path)
+    assert loaded.version == parsed.version
+    assert loaded.built_at == parsed.built_at  # came from the snapshot, not a rebuild
+
+    profile = {"age": 65, "desired_coverage": 15000, "coverage_type": "Final Expense"}
+    assert assign(profile, loaded) == assign(profile, parsed)
+
+
+def test_stale_snapshot_is_ignored(carriers_dir, tmp_path):
+    """Editing a source file makes the snapshot stale, so YAML is parsed again."""
+    snapshot_path = tmp_path / "rules_snapshot.pkl"
+    write_snapshot(RuleSet.load(carriers_dir), snapshot_path)
+
+    path = carriers_dir / "sbli" / "level_term.yaml"
+    path.write_text(path.read_text() + "\n# edited\n")
+    assert read_snapshot(snapshot_path, RuleSet.load(carriers_dir).version) is None
+
+    snapshot_path.write_bytes(b"not a pickle")
+    assert read_snapshot(snapshot_path, "anything") is None
+
+
+def test_malformed_product_file_is_skipped(carriers_dir):
+    """A product file that parses but isn't a valid product is skipped, at load and on reload."""
+    cache = RuleSetCache(carriers_dir, check_interval=0)
+    first = cache.get()
+
+    broken = carriers_dir / "broken" / "product.yaml"
+    broken.parent.mkdir()
+    broken.write_text("carrier: Broken\nproduct: Broken\nface_amount: null\neligibility: null\n")
+    second = cache.get()
+    assert second.version != first.version
+    assert {(r.carrier, r.product) for r in second} == {(r.carrier, r.product) for r in first}
+
+    broken.write_text("- not\n- a product\n")
+    assert len(RuleSet.load(carriers_dir)) == len(first)
+    assert len(cache.get()) == len(first)
@@ -0,0 +1,52 @@
+"""Tests for rejection tracing."""
+
+import random
+
+import numpy as np
+
+from src.ai.assigner import assign
+from src.ai.trace import STAGES, trace_counters, trace_eligibility
+
+
+def test_trace_matches_eligibility_mask(rule_set, random_profile):
+    """Tracing rejects exactly the products eligibility_mask() drops, and assign() is unchanged."""
+    rng = random.Random(31)
+    for _ in range(500):
+        profile = random_profile(rng)
+        trace = trace_eligibility(rule_set.catalog, profile)
+        assert np.array_equal(trace.eligible_mask, rule_set.catalog.eligibility_mask(profile))
+
+        traced = assign(profile, rule_set, trace=True)
+        untraced = assign(profile, rule_set)
+        assert traced.pop("trace")["eligible"] == int(trace.eligible_mask.sum())
+        assert traced == untraced
+
+
+def test_first_failure_follows_evaluation_order(rule_set):
+    """A product failing several predicates is charged to the first one checked."""
+    profile = {"age": 10, "desired_coverage": 0, "state": "TX", "dui_count_recent": 5}
+    trace = trace_eligibility(rule_set.catalog, profile).to_dict()
+
+    assert trace["eligible"] == 0
+    stages = {rejection["stage"] for rejection in trace["rejections"]}
+    assert stages <= {"state", "age", "face"}
+    assert sum(trace["rejected_by_stage"].values()) == len(rule_set)
+    assert set(trace["stage_ns"]) == set(STAGES)
+
+
+def test_counters_only_count_traced_calls(rule_set):
+    """Process-wide counters aggregate traced evaluations; untraced assign() adds nothing."""
+    trace_counters.reset()
+    profile = {"age": 65, "desired_coverage": 15000, "state": "TX", "hazardous_avocation": True}
+
+    assign(profile, rule_set)
+    assert trace_counters.stats()["traces"] == 0
+
+    first = assign(profile, rule_set, trace=True)["trace"]
+    assign(profile, rule_set, trace=True)
+    stats = trace_counters.stats()
+    assert stats["traces"] == 2
+    assert stats["rejections"] == {
+        stage: 2 * count for stage, count in first["rejected_by_stage"].items()
+    }
+    assert all(stats["stage_ns_total"][stage] > 0 for stage in STAGES)
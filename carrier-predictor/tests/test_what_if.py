@@ -0,0 +1,56 @@
+"""Tests for what-if grids over age, face amount and term length."""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.ai.assigner import assign
+from src.ai.what_if import MAX_GRID_CELLS, what_if_grid
+
+
+def test_grid_cells_match_assign(rule_set, random_profile):
+    """Every cell's top picks and scores equal assign() for that scenario."""
+    rng = random.Random(23)
+    for _ in range(25):
+        profile = random_profile(rng)
+        ages = sorted(rng.sample(range(121), 6))
+        faces = [2000, 10000, 25000, 50000, 250000, rng.randint(1000, 5_000_000)]
+        grid = what_if_grid(profile, rule_set, ages, faces, [None, 10, 20, 30])
+
+        for cell in grid["cells"]:
+            scenario = {
+                **profile,
+                "age": cell["age"],
+                "desired_coverage": cell["desired_coverage"],
+                "term_length": cell["term_length"],
+            }
+            expected = assign(scenario, rule_set)["recommendations"]
+            top = [grid["products"][index] for index in cell["products"][:3]]
+            assert [(p["carrier"], p["product"]) for p in top] == [
+                (r["carrier"], r["product"]) for r in expected
+            ]
+            assert cell["scores"][:3] == [r["score"] for r in expected]
+
+
+def test_grid_eligibility_matches_mask(rule_set):
+    """The broadcast grid mask equals eligibility_mask() cell by cell."""
+    catalog = rule_set.catalog
+    profile = {"state": "TX", "gender": "F", "height_ft": 5, "height_in": 6, "weight": 180}
+    ages, faces, terms = [18, 45, 65, 80], [5000, 50000, 100000], [None, 20]
+
+    grid = catalog.grid_eligibility_mask(profile, ages, faces, terms)
+    assert grid.shape == (4, 3, 2, catalog.size)
+    for a, age in enumerate(ages):
+        for f, face in enumerate(faces):
+            for t, term in enumerate(terms):
+                scenario = {**profile, "age": age, "desired_coverage": face, "term_length": term}
+                assert np.array_equal(grid[a, f, t], catalog.eligibility_mask(scenario))
+
+
+def test_grid_rejects_bad_axes(rule_set):
+    """Ages outside the table and oversized grids are refused."""
+    with pytest.raises(ValueError):
+        what_if_grid({}, rule_set, [130], [10000])
+    with pytest.raises(ValueError):
+        what_if_grid({}, rule_set, list(range(100)), list(range(1, MAX_GRID_CELLS // 50)))